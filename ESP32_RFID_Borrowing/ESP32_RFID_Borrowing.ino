@@ -9,6 +9,7 @@
 
 #include <WiFi.h>
 #include <WiFiClientSecure.h>
+#include <WiFiUdp.h>
 #include <ESPmDNS.h>
 #include <HTTPClient.h>
 #include <WebServer.h>
@@ -1763,6 +1764,26 @@ void postDeviceInstance() {
   http.end();
 }
 
+// Passive discovery: broadcast a small JSON datagram that the server's discovery
+// listener (manage.py discovery_listener) records, even before API_HOST is configured
+const uint16_t DISCOVERY_PORT = 41234;
+WiFiUDP discoveryUdp;
+
+void announceDevice() {
+  if (WiFi.status() != WL_CONNECTED) return;
+  // No pairing code: the datagram goes to the whole LAN, and the server keys on our IP
+  StaticJsonDocument<512> doc;
+  doc["type"] = "rfid-reader";
+  doc["ssid"] = WIFI_SSID;
+  doc["api_host"] = API_HOST;
+  doc["firmware"] = FIRMWARE_VER;
+  String payload;
+  serializeJson(doc, payload);
+  if (!discoveryUdp.beginPacket(IPAddress(255, 255, 255, 255), DISCOVERY_PORT)) return;
+  discoveryUdp.write((const uint8_t*)payload.c_str(), payload.length());
+  discoveryUdp.endPacket();
+}
+
 BorrowerCheckResult checkBorrower(const String& uid) {
   
   ensureWiFi();
@@ -2421,6 +2442,7 @@ void loop() {
         
       } else if (cmd.equalsIgnoreCase("hb") || cmd.equalsIgnoreCase("heartbeat")) {
         Serial.println("Posting device heartbeat now...");
+        announceDevice();
         postDeviceInstance();
       } else {
         Serial.println("Unknown command. Available commands:");
@@ -2434,6 +2456,7 @@ void loop() {
 
   // Periodically announce presence to device registry
   if (millis() - lastDevicePost > DEVICE_POST_INTERVAL_MS) {
+    announceDevice();
     postDeviceInstance();
     lastDevicePost = millis();
   }
@@ -33,8 +33,8 @@ class DeviceConfigAdmin(admin.ModelAdmin):
 
 @admin.register(DeviceInstance)
 class DeviceInstanceAdmin(admin.ModelAdmin):
-    list_display = ("ip", "firmware", "ssid", "api_host", "pairing_code", "claimed_by", "last_seen", "last_wifi_event", "last_rssi", "server_reachable")
-    readonly_fields = ("last_seen",)
+    list_display = ("ip", "firmware", "ssid", "api_host", "pairing_code", "claimed_by", "last_seen", "last_wifi_event", "last_rssi", "server_reachable", "config_version", "circuit_state", "health_score")
+    readonly_fields = ("last_seen", "health_score", "consecutive_failures", "circuit_opened_at")
     search_fields = ("ip", "firmware", "ssid", "pairing_code")
 
 
@@ -0,0 +1,204 @@
+"""Registered RFID UIDs published to readers for local card checks.
+
+Readers keep a copy of the allow-list and reject unknown cards without asking the
+server. Every borrower save that adds, changes or removes a UID appends an
+AllowListChange row (see core.signals). The newest row's id is the allow-list
+version. ``GET /api/rfid-allowlist`` has two formats (``?kind=``):
+
+* ``list``: the sorted UIDs, which a reader can binary-search. With ``?since=<version>``
+  the response holds only the UIDs added and removed since then, unless that version
+  is older than the kept changelog (``ALLOWLIST_CHANGELOG_SIZE`` rows); then a full
+  snapshot is sent.
+* ``bloom``: a Bloom filter over the UIDs, always sent in full. It holds ``bits`` bits
+  (byte ``j >> 3``, mask ``1 << (j & 7)``), and a UID sets bits
+  ``(h1 + i * h2) mod bits`` for ``i < hashes``, computed in 64 bits. ``h1`` is the 32-bit FNV-1a hash of
+  the UID's UTF-8 bytes and ``h2`` is the 32-bit FNV-1 hash of the same bytes with the
+  low bit set. A miss is definite. A hit may be a false positive
+  (``ALLOWLIST_BLOOM_FP_RATE``), so the reader confirms it with the server.
+
+Both formats carry ``digest``: the first 16 hex digits of the SHA-256 of the sorted
+UIDs joined by newlines. A reader that applied a delta can compare it against its own
+list and fetch a full snapshot if they differ.
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import math
+import threading
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db.models import Max, Min
+
+from .models import AllowListChange, Borrower
+
+FORMATS = ("list", "bloom")
+# Changelog ids are allocated before the writer commits, so a slow writer can commit a
+# change below a version a reader already has. Deltas re-send this many earlier changes;
+# applying a change twice is harmless.
+DELTA_LOOKBACK = 32
+# Old changes are pruned on every PRUNE_EVERY-th change rather than on every write
+PRUNE_EVERY = 100
+
+_FNV_OFFSET = 0x811C9DC5
+_FNV_PRIME = 0x01000193
+
+
+class Snapshot(NamedTuple):
+    version: int
+    uids: tuple[str, ...]
+    digest: str
+
+
+_lock = threading.Lock()
+_snapshot: Snapshot | None = None
+_bloom: dict | None = None
+
+
+def _changelog_size() -> int:
+    return int(getattr(settings, "ALLOWLIST_CHANGELOG_SIZE", 10000))
+
+
+def _fp_rate() -> float:
+    return float(getattr(settings, "ALLOWLIST_BLOOM_FP_RATE", 0.01))
+
+
+# --- recording changes (called from core.signals) ---
+
+def remember_previous(borrower: Borrower, update_fields=None) -> None:
+    """Before an update, note the UID stored in the database so a change can be logged."""
+    if borrower._state.adding or borrower.pk is None:
+        return
+    if update_fields is not None and "rfid_uid" not in update_fields:
+        return
+    borrower._allowlist_previous_uid = (
+        Borrower.objects.filter(pk=borrower.pk).values_list("rfid_uid", flat=True).first()
+    )
+
+
+def record_saved(borrower: Borrower, created: bool) -> None:
+    if created:
+        _append((borrower.rfid_uid, False))
+        return
+    previous = borrower.__dict__.pop("_allowlist_previous_uid", borrower.rfid_uid)
+    if previous != borrower.rfid_uid:
+        _append((previous, True), (borrower.rfid_uid, False))
+
+
+def record_deleted(borrower: Borrower) -> None:
+    _append((borrower.rfid_uid, True))
+
+
+def _append(*changes: tuple[str, bool]) -> None:
+    rows = AllowListChange.objects.bulk_create(
+        [AllowListChange(rfid_uid=uid, removed=removed) for uid, removed in changes if uid]
+    )
+    last = max((row.id for row in rows if row.id is not None), default=None)
+    if last is not None and last % PRUNE_EVERY < len(rows):
+        AllowListChange.objects.filter(id__lte=last - _changelog_size()).delete()
+
+
+# --- reading ---
+
+def bounds() -> tuple[int, int]:
+    """(current version, oldest version a delta can start from)."""
+    row = AllowListChange.objects.aggregate(newest=Max("id"), oldest=Min("id"))
+    newest = row["newest"] or 0
+    oldest = (row["oldest"] or 1) - 1
+    return newest, oldest
+
+
+def digest(uids) -> str:
+    return hashlib.sha256("\n".join(uids).encode("utf-8")).hexdigest()[:16]
+
+
+def snapshot(version: int) -> Snapshot:
+    """Sorted UIDs at ``version``, built once per version per process."""
+    global _snapshot, _bloom
+    current = _snapshot
+    if current is not None and current.version == version:
+        return current
+    uids = tuple(
+        Borrower.objects.exclude(rfid_uid="").order_by("rfid_uid").values_list("rfid_uid", flat=True)
+    )
+    built = Snapshot(version, uids, digest(uids))
+    # Only keep it if no change landed while the UIDs were read
+    if bounds()[0] == version:
+        with _lock:
+            _snapshot, _bloom = built, None
+    return built
+
+
+def delta(since: int, version: int) -> tuple[list[str], list[str]]:
+    """(added, removed) UIDs between ``since`` and ``version``."""
+    latest: dict[str, bool] = {}
+    changes = (
+        AllowListChange.objects.filter(id__gt=max(since - DELTA_LOOKBACK, 0), id__lte=version)
+        .order_by("id")
+        .values_list("rfid_uid", "removed")
+    )
+    for uid, removed in changes:
+        latest[uid] = removed
+    added = sorted(uid for uid, removed in latest.items() if not removed)
+    removed = sorted(uid for uid, removed in latest.items() if removed)
+    return added, removed
+
+
+def _fnv(data: bytes, xor_first: bool) -> int:
+    h = _FNV_OFFSET
+    for byte in data:
+        if xor_first:
+            h = ((h ^ byte) * _FNV_PRIME) & 0xFFFFFFFF
+        else:
+            h = ((h * _FNV_PRIME) & 0xFFFFFFFF) ^ byte
+    return h
+
+
+def build_bloom(uids, fp_rate: float) -> dict:
+    n = max(len(uids), 1)
+    bits = max(64, math.ceil(-n * math.log(fp_rate) / (math.log(2) ** 2)))
+    bits = (bits + 7) // 8 * 8
+    hashes = min(16, max(1, round(bits / n * math.log(2))))
+    data = bytearray(bits // 8)
+    for uid in uids:
+        raw = uid.encode("utf-8")
+        h1, h2 = _fnv(raw, xor_first=True), _fnv(raw, xor_first=False) | 1
+        for i in range(hashes):
+            j = (h1 + i * h2) % bits
+            data[j >> 3] |= 1 << (j & 7)
+    return {"bits": bits, "hashes": hashes, "data": base64.b64encode(bytes(data)).decode("ascii")}
+
+
+def bloom(snap: Snapshot) -> dict:
+    global _bloom
+    with _lock:
+        if _snapshot is snap and _bloom is not None:
+            return _bloom
+    built = build_bloom(snap.uids, _fp_rate())
+    with _lock:
+        if _snapshot is snap:
+            _bloom = built
+    return built
+
+
+def etag(version: int, fmt: str, since: int | None) -> str:
+    return f'W/"allowlist-{version}-{fmt}-{"" if since is None else since}"'
+
+
+def payload(fmt: str, version: int, oldest: int, since: int | None = None) -> dict:
+    """Response body for ``GET /api/rfid-allowlist``; ``version``/``oldest`` from ``bounds()``."""
+    snap = snapshot(version)
+    body = {"version": version, "count": len(snap.uids), "digest": snap.digest}
+    if fmt == "bloom":
+        return {**body, "full": True, "bloom": bloom(snap)}
+    if since is not None and oldest <= since <= version:
+        added, removed = delta(since, version)
+        return {**body, "full": False, "added": added, "removed": removed}
+    return {**body, "full": True, "uids": list(snap.uids)}
+
+
+def clear() -> None:
+    global _snapshot, _bloom
+    with _lock:
+        _snapshot, _bloom = None, None
@@ -5,14 +5,21 @@ from .views import (
     ReturnView,
     BorrowerView,
     BorrowerDetailView,
+    RFIDAllowListView,
     ItemView,
     ItemDetailView,
+    ItemAvailabilityView,
     BorrowTransactionDetailView,
     ScanIdView,
     BorrowerRegistrationView,
     ItemRegistrationView,
     ItemQRCodeView,
     RFIDScanView,
+    RFIDScanBatchView,
+    DeviceScanFeedView,
+    KioskTapView,
+    KioskScanView,
+    KioskSessionView,
     DeviceConfigView,
     DeviceInstanceView,
     ScanDevicesView,
@@ -25,6 +32,7 @@ from .views import (
     PushDeviceConfigAllView,
     TestApiHostView,
     PingView,
+    MetricsView,
 )
 
 
@@ -37,8 +45,12 @@ urlpatterns = [
     path("borrowers/", BorrowerView.as_view(), name="api-borrowers-slash"),
     path("borrowers/<int:borrower_id>", BorrowerDetailView.as_view(), name="api-borrowers-detail"),
     path("borrowers/<int:borrower_id>/", BorrowerDetailView.as_view(), name="api-borrowers-detail-slash"),
+    path("rfid-allowlist", RFIDAllowListView.as_view(), name="api-rfid-allowlist"),
+    path("rfid-allowlist/", RFIDAllowListView.as_view(), name="api-rfid-allowlist-slash"),
     path("items", ItemView.as_view(), name="api-items"),
     path("items/", ItemView.as_view(), name="api-items-slash"),
+    path("items/availability", ItemAvailabilityView.as_view(), name="api-items-availability"),
+    path("items/availability/", ItemAvailabilityView.as_view(), name="api-items-availability-slash"),
     path("items/<int:item_id>", ItemDetailView.as_view(), name="api-items-detail"),
     path("items/<int:item_id>/", ItemDetailView.as_view(), name="api-items-detail-slash"),
     path("transactions/<int:transaction_id>", BorrowTransactionDetailView.as_view(), name="api-transactions-detail"),
@@ -53,10 +65,20 @@ urlpatterns = [
     path("items/<int:item_id>/qr/", ItemQRCodeView.as_view(), name="api-item-qr-slash"),
     path("rfid-scans", RFIDScanView.as_view(), name="api-rfid-scans"),
     path("rfid-scans/", RFIDScanView.as_view(), name="api-rfid-scans-slash"),
+    path("rfid-scans/batch", RFIDScanBatchView.as_view(), name="api-rfid-scans-batch"),
+    path("rfid-scans/batch/", RFIDScanBatchView.as_view(), name="api-rfid-scans-batch-slash"),
+    path("kiosk/tap", KioskTapView.as_view(), name="api-kiosk-tap"),
+    path("kiosk/tap/", KioskTapView.as_view(), name="api-kiosk-tap-slash"),
+    path("kiosk/scan", KioskScanView.as_view(), name="api-kiosk-scan"),
+    path("kiosk/scan/", KioskScanView.as_view(), name="api-kiosk-scan-slash"),
+    path("kiosk/session", KioskSessionView.as_view(), name="api-kiosk-session"),
+    path("kiosk/session/", KioskSessionView.as_view(), name="api-kiosk-session-slash"),
     path("device-config", DeviceConfigView.as_view(), name="api-device-config"),
     path("device-config/", DeviceConfigView.as_view(), name="api-device-config-slash"),
     path("device-instances", DeviceInstanceView.as_view(), name="api-device-instances"),
     path("device-instances/", DeviceInstanceView.as_view(), name="api-device-instances-slash"),
+    path("device-instances/<int:device_id>/scans", DeviceScanFeedView.as_view(), name="api-device-scans"),
+    path("device-instances/<int:device_id>/scans/", DeviceScanFeedView.as_view(), name="api-device-scans-slash"),
     path("device-instances/scan", ScanDevicesView.as_view(), name="api-device-instances-scan"),
     path("device-instances/scan/", ScanDevicesView.as_view(), name="api-device-instances-scan-slash"),
     path("device-instances/claim", ClaimDeviceView.as_view(), name="api-device-instance-claim"),
@@ -74,6 +96,7 @@ urlpatterns = [
     path("device-config/test", TestApiHostView.as_view(), name="api-device-config-test"),
     path("ping", PingView.as_view(), name="api-ping"),
     path("ping/", PingView.as_view(), name="api-ping-slash"),
+    path("metrics", MetricsView.as_view(), name="api-metrics"),
 ]
 
 
@@ -0,0 +1,57 @@
+"""Compact response profile for ESP32 readers.
+
+Readers only look at a handful of keys (the status code, ``rfid_uid`` in borrower
+lookups) but the full serializers send nested borrower/item objects, timestamps and
+per-borrower open-loan counts, which cost bytes on the wire, serializer CPU and, for
+the counts, one query per borrower. Views using DeviceResponseMixin answer with flat
+payloads instead when the request carries an X-Device-Token or asks for
+``application/vnd.rfid.compact+json``.
+
+The payloads stay JSON: the firmware parses responses with jsonExtract/ArduinoJson,
+so a binary encoding would need firmware changes for no gain at these sizes.
+"""
+from __future__ import annotations
+
+from django.utils.cache import patch_vary_headers
+from rest_framework.renderers import JSONRenderer
+
+COMPACT_MEDIA_TYPE = "application/vnd.rfid.compact+json"
+
+
+class CompactJSONRenderer(JSONRenderer):
+    media_type = COMPACT_MEDIA_TYPE
+
+
+def wants_compact(request) -> bool:
+    if request.headers.get("X-Device-Token"):
+        return True
+    return COMPACT_MEDIA_TYPE in request.headers.get("Accept", "")
+
+
+class DeviceResponseMixin:
+    """APIView mixin: accept the compact media type and set ``self.compact`` per request."""
+
+    def get_renderers(self):
+        return super().get_renderers() + [CompactJSONRenderer()]
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.compact = wants_compact(request)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        patch_vary_headers(response, ("Accept", "X-Device-Token"))
+        return response
+
+
+def transaction_payload(tx) -> dict:
+    # Foreign keys as ids so no related rows are loaded
+    return {"id": tx.id, "status": tx.status, "borrower_id": tx.borrower_id, "item_id": tx.item_id}
+
+
+def borrower_payload(borrower) -> dict:
+    return {"id": borrower.id, "rfid_uid": borrower.rfid_uid, "name": borrower.name}
+
+
+def scan_payload(scan) -> dict:
+    return {"id": scan.id, "uid": scan.uid}
@@ -0,0 +1,78 @@
+"""Process-wide cache for the singleton DeviceConfig row.
+
+Devices poll ``/api/device-config`` and every push needs the same payload, so the row
+(and its decrypted device payload) is loaded once and kept until a save/delete signal
+invalidates it (see core.signals). ``DEVICE_CONFIG_CACHE_TTL`` bounds how long another
+worker process can serve a stale copy.
+
+Cached objects are shared between requests and must be treated as read-only.
+"""
+from __future__ import annotations
+
+import threading
+import time
+
+from django.conf import settings
+
+from .models import DeviceConfig
+
+_lock = threading.RLock()
+_config: DeviceConfig | None = None
+_device_payload: dict | None = None
+_expires_at = 0.0
+
+
+def _ttl() -> float:
+    return float(getattr(settings, "DEVICE_CONFIG_CACHE_TTL", 60))
+
+
+def get_config() -> DeviceConfig:
+    """Return the cached DeviceConfig, creating the row on first use."""
+    global _config, _device_payload, _expires_at
+    config = _config
+    if config is not None and time.monotonic() < _expires_at:
+        return config
+    with _lock:
+        if _config is not None and time.monotonic() < _expires_at:
+            return _config
+        config, _ = DeviceConfig.objects.get_or_create(id=1)
+        _config, _device_payload = config, None
+        _expires_at = time.monotonic() + _ttl()
+        return config
+
+
+def get_device_payload() -> dict:
+    """Return the plaintext payload sent to devices (decrypted once per version).
+
+    ``config_version`` lets a device report which config it has applied.
+    """
+    global _device_payload
+    config = get_config()
+    payload = _device_payload
+    if payload is None or payload["config_version"] != config.version:
+        payload = {
+            'ssid': config.ssid or '',
+            'password': config.get_password() or '',
+            'api_host': config.api_host or '',
+            'config_version': config.version,
+        }
+        _device_payload = payload
+    return dict(payload)
+
+
+def current_version() -> int:
+    return get_config().version
+
+
+def etag(for_device: bool = False) -> str:
+    """ETag for the config representation (devices see a different body)."""
+    suffix = "-device" if for_device else ""
+    return f'"cfg-{current_version()}{suffix}"'
+
+
+def invalidate() -> None:
+    global _config, _device_payload, _expires_at
+    with _lock:
+        _config = None
+        _device_payload = None
+        _expires_at = 0.0
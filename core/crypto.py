@@ -1,15 +1,20 @@
 """Simple encryption helpers for device secrets.
 
 Uses Fernet (cryptography) when available and falls back to Django signing if not.
+
+The cipher is built once per configured key set and reused. ``FERNET_KEYS`` may list
+several keys (newest first) so old ciphertexts stay readable while keys are rotated;
+``FERNET_KEY`` is still honoured as a single-key setting.
 """
 from __future__ import annotations
 
 import base64
 import logging
+import threading
 from django.conf import settings
 
 try:
-    from cryptography.fernet import Fernet, InvalidToken
+    from cryptography.fernet import Fernet, InvalidToken, MultiFernet
     HAS_FERNET = True
 except Exception:
     HAS_FERNET = False
@@ -18,22 +23,52 @@ from django.core import signing
 
 logger = logging.getLogger(__name__)
 
+# Cipher cache: rebuilt only when the configured keys change
+_cipher_lock = threading.Lock()
+_cipher_keys: tuple[str, ...] | None = None
+_cipher: "Fernet | MultiFernet | None" = None
+
+# Decrypted plaintext cache, keyed by ciphertext. Cleared when DeviceConfig is saved
+# (see core.signals) and whenever the key set changes.
+_plaintext_cache: dict[str, str] = {}
+_PLAINTEXT_CACHE_MAX = 64
+
+
+def _configured_keys() -> tuple[str, ...]:
+    keys = getattr(settings, "FERNET_KEYS", None) or []
+    if isinstance(keys, (str, bytes)):
+        keys = [keys]
+    single = getattr(settings, "FERNET_KEY", None)
+    if single and single not in keys:
+        keys = list(keys) + [single]
+    return tuple(k.decode("utf-8") if isinstance(k, bytes) else k for k in keys if k)
+
+
+def _get_fernet() -> "Fernet | MultiFernet | None":
+    global _cipher, _cipher_keys
+    keys = _configured_keys()
+    if keys == _cipher_keys:
+        return _cipher
+    with _cipher_lock:
+        if keys == _cipher_keys:
+            return _cipher
+        cipher = None
+        if keys:
+            try:
+                # Keys must be urlsafe base64 encoded 32-byte values
+                fernets = [Fernet(k.encode("utf-8")) for k in keys]
+                cipher = fernets[0] if len(fernets) == 1 else MultiFernet(fernets)
+            except Exception:
+                logger.exception("Invalid FERNET_KEY / FERNET_KEYS setting")
+                cipher = None
+        _plaintext_cache.clear()
+        _cipher, _cipher_keys = cipher, keys
+        return cipher
 
-def _get_fernet() -> "Fernet | None":
-    key = getattr(settings, "FERNET_KEY", None)
-    if not key:
-        return None
-    try:
-        if isinstance(key, str):
-            key_b = key.encode("utf-8")
-        else:
-            key_b = key
-        # Ensure key is urlsafe base64 32 bytes
-        # If user provided raw bytes, assume correct; else accept provided base64 key
-        return Fernet(key_b)
-    except Exception:
-        logger.exception("Invalid FERNET_KEY setting")
-        return None
+
+def clear_cache() -> None:
+    """Forget cached plaintexts (call after secrets are rewritten)."""
+    _plaintext_cache.clear()
 
 
 def encrypt_text(plaintext: str) -> str:
@@ -70,3 +105,37 @@ def decrypt_text(ciphertext: str) -> str:
     except Exception:
         logger.exception("Django signing loads failed for ciphertext")
         return ""
+
+
+def decrypt_text_cached(ciphertext: str) -> str:
+    """Like `decrypt_text`, but remembers the result so hot paths decrypt only once."""
+    if not ciphertext:
+        return ""
+    _get_fernet()  # drops the cache if the key set changed
+    try:
+        return _plaintext_cache[ciphertext]
+    except KeyError:
+        pass
+    plaintext = decrypt_text(ciphertext)
+    if plaintext:
+        if len(_plaintext_cache) >= _PLAINTEXT_CACHE_MAX:
+            _plaintext_cache.clear()
+        _plaintext_cache[ciphertext] = plaintext
+    return plaintext
+
+
+def rotate_text(ciphertext: str) -> str:
+    """Re-encrypt a ciphertext under the primary (first) key.
+
+    Returns the input unchanged when no MultiFernet key set is configured.
+    """
+    if not ciphertext or not HAS_FERNET:
+        return ciphertext
+    f = _get_fernet()
+    if not isinstance(f, MultiFernet):
+        return ciphertext
+    try:
+        return f.rotate(ciphertext.encode("utf-8")).decode("utf-8")
+    except InvalidToken:
+        logger.exception("Cannot rotate ciphertext: no configured key matches")
+        return ciphertext
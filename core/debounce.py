@@ -0,0 +1,110 @@
+"""Server-side debounce of repeated card taps.
+
+While a card rests on a reader the firmware posts the same tap again and again; each
+post would insert an RFIDScan, trim the scan table and resolve the borrower again.
+Views decorated with ``suppress_repeats(*fields)`` answer a repeated tap from the same
+device (same X-Device-Token, same values of ``fields`` in the body, e.g. the card UID)
+within ``SCAN_DEBOUNCE_SECONDS`` of the previous one with the stored response and an
+``X-Debounced: true`` header, without touching the database. Other body fields (the
+name and email the firmware may add) do not matter. The window slides: a card held on
+the reader stays debounced until it is lifted for a full window.
+
+A response that describes state with its own expiry (a kiosk session) is replayed no
+longer than ``lifetime(data)`` seconds after it was produced, and ``forget()`` drops a
+device's stored responses when that state ends early.
+
+State is per worker process (a repeat landing on another worker is processed
+normally), and requests without a device token are never debounced. Suppressed taps
+are counted in ``rfid_scan_debounced_total{view}``.
+"""
+from __future__ import annotations
+
+import functools
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework.response import Response
+
+from . import metrics
+
+MAX_ENTRIES = 1024
+HEADER = "X-Debounced"
+
+_lock = threading.Lock()
+# (view, device, compact, field values) -> (expires_at, deadline, status_code, data)
+_recent: OrderedDict[tuple, tuple[float, float, int, object]] = OrderedDict()
+
+
+def _window() -> float:
+    return float(getattr(settings, "SCAN_DEBOUNCE_SECONDS", 2.0))
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:32]
+
+
+def _remember(key: tuple, expires_at: float, deadline: float, status_code: int, data) -> None:
+    with _lock:
+        _recent[key] = (min(expires_at, deadline), deadline, status_code, data)
+        _recent.move_to_end(key)
+        now = time.monotonic()
+        # Oldest-touched entries are first; entries cut short by a deadline further in
+        # are skipped on lookup and dropped when they reach the front
+        while _recent and (len(_recent) > MAX_ENTRIES or next(iter(_recent.values()))[0] <= now):
+            _recent.popitem(last=False)
+
+
+def suppress_repeats(*fields: str, lifetime=None):
+    """Decorator for APIView.post: replay the response to a repeated tap.
+
+    Taps are the same when the device token and the body's ``fields`` match.
+    ``lifetime(data)``, if given, returns how many seconds a response stays valid
+    (None: no limit).
+    """
+    def decorator(view_method):
+        @functools.wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            token = request.headers.get("X-Device-Token")
+            window = _window()
+            if not token or window <= 0 or not isinstance(request.data, dict):
+                return view_method(self, request, *args, **kwargs)
+
+            view = type(self).__name__
+            values = tuple(str(request.data.get(field) or "").strip() for field in fields)
+            key = (view, _digest(token.encode("utf-8")), getattr(self, "compact", False), values)
+            now = time.monotonic()
+            with _lock:
+                entry = _recent.get(key)
+                if entry is not None and entry[0] <= now:
+                    entry = None
+            if entry is not None:
+                _remember(key, now + window, entry[1], entry[2], entry[3])
+                metrics.inc("rfid_scan_debounced_total", 1, "Repeated taps answered from the debounce window", view=view)
+                return Response(entry[3], status=entry[2], headers={HEADER: "true"})
+
+            response = view_method(self, request, *args, **kwargs)
+            # Successes and "not registered" are stable answers; other errors may be retried
+            if hasattr(response, "data") and (response.status_code < 400 or response.status_code == 404):
+                now = time.monotonic()
+                seconds = lifetime(response.data) if lifetime is not None and response.status_code < 400 else None
+                deadline = now + seconds if seconds is not None else float("inf")
+                _remember(key, now + window, deadline, response.status_code, response.data)
+            return response
+        return wrapper
+    return decorator
+
+
+def forget(token: str) -> None:
+    """Drop the stored responses of the device with this token."""
+    device = _digest(token.encode("utf-8"))
+    with _lock:
+        for key in [key for key in _recent if key[1] == device]:
+            del _recent[key]
+
+
+def clear() -> None:
+    with _lock:
+        _recent.clear()
@@ -0,0 +1,137 @@
+"""Passive discovery of readers from UDP announcements.
+
+``GET /api/device-instances/scan`` used to find readers by opening a TCP connection to
+all 254 addresses of the server's /24 on every call. Instead, readers broadcast a small
+JSON datagram to ``DEVICE_DISCOVERY_PORT`` at boot and every few minutes::
+
+    {"type": "rfid-reader", "firmware": "1.4.0", "ssid": "lab",
+     "api_host": "http://10.0.0.2:8000"}
+
+``python manage.py discovery_listener`` receives them and records each sender in
+DeviceInstance (keyed by the datagram's source address, as heartbeats are), stamping
+``announced_at``. The scan endpoint then answers from the devices announced within
+``DEVICE_DISCOVERY_MAX_AGE`` seconds and only sweeps the subnet when there are none or
+``?sweep=1`` is given.
+
+Announcements are trusted as much as heartbeats (``POST /api/device-instances``),
+which are unauthenticated too. They reach every host on the LAN, so secrets such as
+the pairing code are neither sent nor accepted. A repeated, unchanged announcement is written at most
+once per ``DEVICE_DISCOVERY_MIN_INTERVAL`` seconds.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import socket
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .models import DeviceInstance
+
+logger = logging.getLogger(__name__)
+
+ANNOUNCEMENT_TYPE = "rfid-reader"
+MAX_DATAGRAM = 1024
+# Announcement keys copied to DeviceInstance, with the field lengths
+FIELDS = {"firmware": 64, "ssid": 128, "api_host": 256}
+
+
+def _max_age() -> int:
+    return int(getattr(settings, "DEVICE_DISCOVERY_MAX_AGE", 600))
+
+
+def _min_interval() -> float:
+    return float(getattr(settings, "DEVICE_DISCOVERY_MIN_INTERVAL", 60))
+
+
+def parse_announcement(data: bytes) -> dict | None:
+    """The DeviceInstance fields in an announcement datagram, or None if it is not one."""
+    if len(data) > MAX_DATAGRAM:
+        return None
+    try:
+        message = json.loads(data.decode("utf-8"))
+    except (UnicodeDecodeError, ValueError):
+        return None
+    if not isinstance(message, dict) or message.get("type") != ANNOUNCEMENT_TYPE:
+        return None
+    return {
+        field: str(message[field])[:length]
+        for field, length in FIELDS.items()
+        if isinstance(message.get(field), (str, int, float))
+    }
+
+
+def ingest(ip: str, fields: dict, now=None) -> DeviceInstance:
+    """Record an announcement from ``ip``."""
+    defaults = {**fields, "announced_at": now or timezone.now()}
+    device, _ = DeviceInstance.objects.update_or_create(ip=ip, defaults=defaults)
+    return device
+
+
+def announced(now=None):
+    """Devices heard from within DEVICE_DISCOVERY_MAX_AGE seconds, newest first."""
+    since = (now or timezone.now()) - timedelta(seconds=_max_age())
+    return DeviceInstance.objects.filter(announced_at__gte=since).order_by("-announced_at")
+
+
+class Listener:
+    """Receive announcements on a UDP socket and ingest them."""
+
+    def __init__(self, host: str = "", port: int | None = None):
+        self.host = host
+        self.port = int(getattr(settings, "DEVICE_DISCOVERY_PORT", 41234)) if port is None else port
+        self.stopped = threading.Event()
+        self.sock: socket.socket | None = None
+        # (ip, fields) -> monotonic time of the last write
+        self._written: dict[tuple, float] = {}
+
+    def bind(self) -> socket.socket:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        # Wake up regularly to notice stop()
+        sock.settimeout(1.0)
+        self.sock = sock
+        self.port = sock.getsockname()[1]
+        return sock
+
+    def handle(self, data: bytes, ip: str) -> bool:
+        """Ingest one datagram; True if it was written to the database."""
+        fields = parse_announcement(data)
+        if fields is None:
+            logger.debug("Ignoring datagram from %s", ip)
+            return False
+        key = (ip, tuple(sorted(fields.items())))
+        now = time.monotonic()
+        if now - self._written.get(key, float("-inf")) < _min_interval():
+            return False
+        close_old_connections()
+        ingest(ip, fields)
+        self._written = {k: t for k, t in self._written.items() if now - t < _min_interval() and k[0] != ip}
+        self._written[key] = now
+        logger.info("Announcement from %s (%s)", ip, fields.get("firmware", ""))
+        return True
+
+    def serve_forever(self) -> None:
+        sock = self.sock or self.bind()
+        try:
+            while not self.stopped.is_set():
+                try:
+                    data, (ip, _port) = sock.recvfrom(MAX_DATAGRAM + 1)
+                except socket.timeout:
+                    continue
+                try:
+                    self.handle(data, ip)
+                except Exception:
+                    logger.exception("Failed to ingest announcement from %s", ip)
+        finally:
+            sock.close()
+            self.sock = None
+
+    def stop(self) -> None:
+        self.stopped.set()
@@ -0,0 +1,136 @@
+"""Read-through LRU cache resolving RFID UIDs and QR codes to Borrower/Item rows.
+
+Every tap resolves a borrower by ``rfid_uid`` and every borrow or return an item by
+``qr_code``; those mappings almost never change. ``borrower_by_uid`` and
+``item_by_qr`` keep the row's column values for up to ``ENTITY_CACHE_SIZE`` lookups
+(least recently used evicted first) and build a fresh instance from them on a hit,
+so callers may modify and save what they get. Unknown codes are cached too, for
+``ENTITY_CACHE_MISS_TTL`` seconds, so repeated taps of an unregistered card do not
+query either.
+
+Rows are only cached once the transaction that read them commits, so a rolled-back
+read never leaves an entry behind. Save/delete signals evict entries (see
+core.signals); ``ENTITY_CACHE_TTL`` bounds how long another worker process, or a
+queryset ``update()`` that sends no signal, can leave a stale entry. Lookups are
+counted in ``rfid_entity_cache_lookups_total{entity,result}``.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from . import metrics
+from .models import Borrower, Item
+
+_LOOKUP_FIELDS = {Borrower: "rfid_uid", Item: "qr_code"}
+
+_lock = threading.Lock()
+# (model label, normalized code, iexact) -> (expires_at, column values or None if missing)
+_entries: OrderedDict[tuple, tuple[float, tuple | None]] = OrderedDict()
+
+
+def _size() -> int:
+    return int(getattr(settings, "ENTITY_CACHE_SIZE", 4096))
+
+
+def _ttl(found: bool) -> float:
+    if found:
+        return float(getattr(settings, "ENTITY_CACHE_TTL", 300))
+    return float(getattr(settings, "ENTITY_CACHE_MISS_TTL", 5))
+
+
+def _key(model, value: str, iexact: bool) -> tuple:
+    return (model._meta.label, value.casefold() if iexact else value, iexact)
+
+
+def _attnames(model) -> list[str]:
+    return [f.attname for f in model._meta.concrete_fields]
+
+
+def _store(key: tuple, values: tuple | None) -> None:
+    expires_at = time.monotonic() + _ttl(values is not None)
+    with _lock:
+        _entries[key] = (expires_at, values)
+        _entries.move_to_end(key)
+        while len(_entries) > _size():
+            _entries.popitem(last=False)
+
+
+def _resolve(model, value: str, iexact: bool):
+    value = value.strip()
+    key = _key(model, value, iexact)
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                _entries.move_to_end(key)
+            else:
+                del _entries[key]
+                entry = None
+
+    entity = model._meta.model_name
+    if entry is not None:
+        metrics.inc("rfid_entity_cache_lookups_total", 1, "UID/QR resolutions by cache result", entity=entity, result="hit")
+        if entry[1] is None:
+            raise model.DoesNotExist(f"{model._meta.object_name} matching query does not exist.")
+        return model.from_db(DEFAULT_DB_ALIAS, _attnames(model), entry[1])
+
+    metrics.inc("rfid_entity_cache_lookups_total", 1, "UID/QR resolutions by cache result", entity=entity, result="miss")
+    field = _LOOKUP_FIELDS[model]
+    try:
+        obj = model.objects.get(**{f"{field}__iexact" if iexact else field: value})
+    except model.DoesNotExist:
+        transaction.on_commit(lambda: _store(key, None))
+        raise
+    values = tuple(getattr(obj, name) for name in _attnames(model))
+    transaction.on_commit(lambda: _store(key, values))
+    return obj
+
+
+def borrower_by_uid(uid: str, *, iexact: bool = False) -> Borrower:
+    """Borrower with this RFID UID; raises Borrower.DoesNotExist like ``objects.get``."""
+    return _resolve(Borrower, uid, iexact)
+
+
+def item_by_qr(qr_code: str, *, iexact: bool = False) -> Item:
+    """Item with this QR code; raises Item.DoesNotExist like ``objects.get``."""
+    return _resolve(Item, qr_code, iexact)
+
+
+def _evict(label: str, pk, value: str | None) -> None:
+    with _lock:
+        # The primary key is the first column of both models
+        stale = [
+            key for key, (_, values) in _entries.items()
+            if key[0] == label and (
+                (values is not None and values[0] == pk)
+                or (value is not None and key[1] == (value.casefold() if key[2] else value))
+            )
+        ]
+        for key in stale:
+            del _entries[key]
+
+
+def invalidate(instance) -> None:
+    """Drop entries for ``instance`` (by pk, and its current code for cached misses).
+
+    Runs now and again on commit, so a lookup racing the write cannot re-cache the
+    old row.
+    """
+    model = type(instance)
+    if model not in _LOOKUP_FIELDS:
+        return
+    label, pk = model._meta.label, instance.pk
+    value = getattr(instance, _LOOKUP_FIELDS[model], None)
+    value = value.strip() if isinstance(value, str) else None
+    _evict(label, pk, value)
+    transaction.on_commit(lambda: _evict(label, pk, value))
+
+
+def clear() -> None:
+    with _lock:
+        _entries.clear()
@@ -0,0 +1,126 @@
+"""Device health scoring and a per-device circuit breaker for server-to-device calls.
+
+A device's ``health_score`` is an exponentially weighted average of call outcomes
+(1 = answered, 0 = unreachable) and heartbeats (1 when the device also reports the
+server reachable, 0.5 otherwise). After ``DEVICE_CIRCUIT_FAILURES`` consecutive
+network failures the circuit opens and push helpers fail fast instead of spending the
+TCP probe and retries. The next heartbeat moves it to half-open; one trial call then
+closes it again or re-opens it. ``DEVICE_CIRCUIT_COOLDOWN`` seconds after opening a
+trial is allowed even without a heartbeat.
+
+Only bulk and background pushes fail fast: an admin's push, provision or control call
+for one device passes ``force=True`` and always reaches the network.
+
+``score()`` also discounts devices that stopped sending heartbeats: the stored score
+halves for every ``DEVICE_OFFLINE_AFTER`` seconds since ``last_seen``.
+"""
+from __future__ import annotations
+
+import functools
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from . import metrics
+from .models import DeviceInstance
+
+Circuit = DeviceInstance.Circuit
+
+# Weight of the newest sample in health_score
+ALPHA = 0.3
+# Helper result codes that mean the device did not answer at all
+NETWORK_FAILURE_CODES = (502, 503, 504)
+HEALTH_FIELDS = ["health_score", "consecutive_failures", "circuit_state", "circuit_opened_at"]
+
+
+def _threshold() -> int:
+    return int(getattr(settings, "DEVICE_CIRCUIT_FAILURES", 3))
+
+
+def _cooldown() -> timedelta:
+    return timedelta(seconds=int(getattr(settings, "DEVICE_CIRCUIT_COOLDOWN", 900)))
+
+
+def _offline_after() -> timedelta:
+    return timedelta(seconds=int(getattr(settings, "DEVICE_OFFLINE_AFTER", 300)))
+
+
+def _blend(score: float, sample: float) -> float:
+    return round(score * (1 - ALPHA) + sample * ALPHA, 4)
+
+
+def score(device: DeviceInstance, now=None) -> float:
+    """Health in [0, 1]: call/heartbeat history discounted by heartbeat silence."""
+    if device.last_seen is None:
+        return device.health_score
+    silent_periods = ((now or timezone.now()) - device.last_seen) // _offline_after()
+    return round(device.health_score * 0.5 ** max(silent_periods, 0), 4)
+
+
+def allows_call(device: DeviceInstance, now=None) -> bool:
+    """False while the circuit is open and the cooldown has not elapsed."""
+    if device.circuit_state != Circuit.OPEN:
+        return True
+    opened = device.circuit_opened_at
+    return opened is None or (now or timezone.now()) - opened >= _cooldown()
+
+
+def record_call(device: DeviceInstance, ok: bool, now=None) -> None:
+    """Feed one call outcome into the score and circuit state and save them."""
+    if ok:
+        device.consecutive_failures = 0
+        device.circuit_state = Circuit.CLOSED
+        device.circuit_opened_at = None
+    else:
+        device.consecutive_failures += 1
+        if device.circuit_state == Circuit.HALF_OPEN or device.consecutive_failures >= _threshold():
+            if device.circuit_state != Circuit.OPEN:
+                metrics.inc("rfid_device_circuit_opened_total", 1, "Circuits opened", target=device.ip)
+            device.circuit_state = Circuit.OPEN
+            device.circuit_opened_at = now or timezone.now()
+    device.health_score = _blend(device.health_score, 1.0 if ok else 0.0)
+    device.save(update_fields=HEALTH_FIELDS)
+
+
+def heartbeat_changes(device: DeviceInstance, server_reachable: bool) -> list[str]:
+    """Apply a heartbeat to ``device`` in memory; return the fields that changed.
+
+    A healthy device with a closed circuit returns no fields, so regular heartbeats
+    cost no extra write.
+    """
+    changed = []
+    new_score = _blend(device.health_score, 1.0 if server_reachable else 0.5)
+    if new_score != device.health_score:
+        device.health_score = new_score
+        changed.append("health_score")
+    if device.circuit_state == Circuit.OPEN:
+        device.circuit_state = Circuit.HALF_OPEN
+        changed.append("circuit_state")
+    return changed
+
+
+def circuit_breaker(func):
+    """Decorator for push helpers taking (target_ip, ...) and returning (ok, detail, code).
+
+    Calls to a known device with an open circuit return (False, detail, 503) without
+    touching the network unless ``force=True`` is passed. Outcomes of real calls are
+    recorded on every DeviceInstance with that ip; a device that answered with an HTTP
+    error still counts as reachable.
+    """
+    @functools.wraps(func)
+    def wrapper(target_ip, *args, force: bool = False, **kwargs):
+        devices = list(DeviceInstance.objects.filter(ip=target_ip))
+        now = timezone.now()
+        if not force:
+            blocked = [d for d in devices if not allows_call(d, now)]
+            if blocked:
+                metrics.inc("rfid_device_circuit_rejected_total", 1, "Calls skipped by an open circuit", target=str(target_ip))
+                since = timezone.localtime(blocked[0].circuit_opened_at).isoformat(timespec="seconds")
+                return False, f"Circuit open: device unreachable since {since}", 503
+        result = func(target_ip, *args, **kwargs)
+        reached = bool(result[0]) or result[2] not in NETWORK_FAILURE_CODES
+        for device in devices:
+            record_call(device, reached)
+        return result
+    return wrapper
@@ -0,0 +1,131 @@
+"""Idempotency-Key support for device-facing POST endpoints.
+
+Readers retry a POST when the response is lost (timeouts on flaky Wi-Fi). When the
+request carries an ``Idempotency-Key`` header, the first response is stored in
+IdempotencyKey and replayed for repeats of the same key, with an
+``Idempotent-Replayed: true`` header, instead of running the view again. So a
+retried borrow returns the original 201 rather than "Item already borrowed".
+
+Keys are scoped to the view and the caller (device token, user, or client address)
+and kept for ``IDEMPOTENCY_TTL`` seconds. Reusing a key with a different body gets a
+422 (bodies are compared as parsed data, so the decorator works under others that
+read ``request.data`` first); a repeat that arrives while the first request is still running gets a 409. A
+claim still pending after ``IDEMPOTENCY_PROCESSING_TIMEOUT`` seconds was abandoned
+(the worker died before storing the response) and the next repeat takes it over.
+Server errors and exceptions are not stored, so they can be retried. Expired keys are
+purged on every ``PURGE_EVERY``-th stored response.
+"""
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 128
+PURGE_EVERY = 100
+
+
+def _ttl() -> timedelta:
+    return timedelta(seconds=int(getattr(settings, "IDEMPOTENCY_TTL", 24 * 3600)))
+
+
+def _processing_timeout() -> timedelta:
+    return timedelta(seconds=int(getattr(settings, "IDEMPOTENCY_PROCESSING_TIMEOUT", 60)))
+
+
+def _caller(request) -> str:
+    token = request.headers.get("X-Device-Token")
+    if token:
+        return "dev:" + hashlib.sha256(token.encode("utf-8")).hexdigest()[:16]
+    user = getattr(request, "user", None)
+    if getattr(user, "is_authenticated", False):
+        return f"user:{user.pk}"
+    return "ip:" + request.META.get("REMOTE_ADDR", "")
+
+
+def _fingerprint(data) -> str:
+    body = json.dumps(data, sort_keys=True, default=str)
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+def _claim(scope: str, key: str, fingerprint: str):
+    """Return (record, created): the live record for this key, or a new pending one.
+
+    Looks up first so a replay costs a single query; expired and abandoned records
+    are replaced.
+    """
+    now = timezone.now()
+    cutoff = now - _ttl()
+    abandoned = now - _processing_timeout()
+    for _ in range(2):
+        existing = IdempotencyKey.objects.filter(scope=scope, key=key).first()
+        if existing is not None:
+            stale = existing.created_at < (abandoned if existing.status_code is None else cutoff)
+            if not stale:
+                return existing, False
+            # Conditional, so only one of several concurrent retries takes it over
+            IdempotencyKey.objects.filter(pk=existing.pk, status_code=existing.status_code).delete()
+        try:
+            with transaction.atomic():
+                return IdempotencyKey.objects.create(scope=scope, key=key, fingerprint=fingerprint), True
+        except IntegrityError:
+            # A concurrent first attempt claimed the key; report that record
+            continue
+    raise IntegrityError(f"Could not claim idempotency key {key!r}")
+
+
+def idempotent(view_method):
+    """Decorator for APIView.post honouring the Idempotency-Key header."""
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER, "").strip()
+        if not key:
+            return view_method(self, request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return Response(
+                {"detail": f"{HEADER} must be at most {MAX_KEY_LENGTH} characters."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        scope = f"{type(self).__name__}:{_caller(request)}"
+        fingerprint = _fingerprint(request.data)
+        record, created = _claim(scope, key, fingerprint)
+        if not created:
+            if record.fingerprint != fingerprint:
+                return Response(
+                    {"detail": f"{HEADER} was already used for a different request."},
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                )
+            if record.status_code is None:
+                return Response(
+                    {"detail": "A request with this Idempotency-Key is still being processed."},
+                    status=status.HTTP_409_CONFLICT,
+                    headers={"Retry-After": "1"},
+                )
+            return Response(record.response_body, status=record.status_code, headers={"Idempotent-Replayed": "true"})
+
+        try:
+            response = view_method(self, request, *args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+        if response.status_code >= 500 or not hasattr(response, "data"):
+            record.delete()
+            return response
+        record.status_code = response.status_code
+        record.response_body = response.data
+        record.save(update_fields=["status_code", "response_body"])
+        if record.pk % PURGE_EVERY == 0:
+            IdempotencyKey.objects.filter(created_at__lt=timezone.now() - _ttl()).delete()
+        return response
+    return wrapper
@@ -0,0 +1,66 @@
+"""Kiosk sessions: one card tap, then any number of QR scans, per reader.
+
+Without a session a borrow at a reader is four HTTPS round trips from the ESP32
+(borrower lookup, rfid-scans, scan-id, borrow). ``POST /api/kiosk/tap`` logs the tap,
+resolves the borrower and stores a KioskSession for the device; each
+``POST /api/kiosk/scan`` then borrows (or returns) the scanned item for that borrower
+and answers with everything the display shows. Sessions live in the database, so
+every worker process sees them, and expire ``KIOSK_SESSION_TTL`` seconds after the
+tap or the last scan.
+"""
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import KioskSession
+
+
+def _ttl() -> timedelta:
+    return timedelta(seconds=int(getattr(settings, "KIOSK_SESSION_TTL", 60)))
+
+
+def open_session(device, borrower, action: str = KioskSession.Action.BORROW, now=None) -> KioskSession:
+    """Start (or replace) the device's session for ``borrower``."""
+    now = now or timezone.now()
+    session = KioskSession(device=device, borrower=borrower, action=action, opened_at=now, expires_at=now + _ttl())
+    # UPDATE of the device's row, INSERT only for its first session
+    session.save()
+    return session
+
+
+def active_session(device, now=None) -> KioskSession | None:
+    return (
+        KioskSession.objects.select_related("borrower")
+        .filter(device=device, expires_at__gt=now or timezone.now())
+        .first()
+    )
+
+
+def extend(session: KioskSession, now=None) -> None:
+    """Restart the expiry timer after a scan."""
+    session.expires_at = (now or timezone.now()) + _ttl()
+    KioskSession.objects.filter(pk=session.pk).update(expires_at=session.expires_at)
+
+
+def close(device) -> bool:
+    deleted, _ = KioskSession.objects.filter(device=device).delete()
+    return bool(deleted)
+
+
+def session_payload(session: KioskSession, now=None) -> dict:
+    borrower = session.borrower
+    remaining = (session.expires_at - (now or timezone.now())).total_seconds()
+    return {
+        "borrower": {"id": borrower.id, "name": borrower.name, "rfid_uid": borrower.rfid_uid},
+        "action": session.action,
+        "expires_in": max(int(remaining), 0),
+    }
+
+
+def tap_lifetime(data) -> int | None:
+    """Seconds a kiosk tap response stays true: until its session expires."""
+    session = data.get("session") if isinstance(data, dict) else None
+    return session["expires_in"] if session else None
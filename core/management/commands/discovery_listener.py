@@ -0,0 +1,21 @@
+"""Run the UDP listener that records reader announcements (see core.discovery)."""
+from django.core.management.base import BaseCommand
+
+from core.discovery import Listener
+
+
+class Command(BaseCommand):
+    help = "Listen for RFID reader announcements and record them as DeviceInstances."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--bind", default="", help="Address to listen on (default: all interfaces)")
+        parser.add_argument("--port", type=int, default=None, help="UDP port (default: DEVICE_DISCOVERY_PORT)")
+
+    def handle(self, *args, **options):
+        listener = Listener(options["bind"], options["port"])
+        listener.bind()
+        self.stdout.write(f"Listening for reader announcements on UDP {options['bind'] or '*'}:{listener.port}")
+        try:
+            listener.serve_forever()
+        except KeyboardInterrupt:
+            listener.stop()
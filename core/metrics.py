@@ -0,0 +1,296 @@
+"""In-process request metrics, exposed in the Prometheus text format at /api/metrics.
+
+Request metrics are opt-in (``REQUEST_METRICS``, see core.middleware). Values live in this
+process only, so with several worker processes each scrape sees one worker; run a
+single worker (or scrape each one) when comparing numbers.
+
+Per-request timings (DB time, query count, time spent talking to devices) are kept in a
+thread-local while the middleware handles a request; code that calls out to a reader
+wraps the call in ``device_call()`` so it is attributed to the request.
+
+Calls to readers are also traced step by step (``device_span``) and per operation
+(``device_operation``): per-device success counts and latency histograms are recorded
+like every other metric, and each operation logs one structured record
+(``extra["device_trace"]``) on the ``core.device_calls`` logger whether or not metrics
+are enabled.
+
+While ``REQUEST_METRICS`` is off nothing is recorded: ``inc`` and ``observe`` return
+at once, so per-device label sets cannot pile up in a process nobody scrapes.
+"""
+from __future__ import annotations
+
+import functools
+import logging
+import socket
+import threading
+import time
+import urllib.error
+from contextlib import contextmanager
+
+from django.conf import settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+_lock = threading.Lock()
+_families: dict[str, "_Family"] = {}
+_local = threading.local()
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _Family:
+    """One metric name with its HELP text and a value per label set."""
+
+    def __init__(self, name: str, kind: str, help_text: str, buckets=None):
+        self.name = name
+        self.kind = kind
+        self.help = help_text
+        self.buckets = buckets
+        self.values: dict[tuple, object] = {}
+
+    def lines(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for labels, value in sorted(self.values.items()):
+            if self.kind == "counter":
+                yield f"{self.name}{_labels(labels)} {_num(value)}"
+                continue
+            for bound, n in zip(value.buckets, value.counts):
+                yield f"{self.name}_bucket{_labels(labels + (('le', _num(bound)),))} {n}"
+            yield f"{self.name}_bucket{_labels(labels + (('le', '+Inf'),))} {value.count}"
+            yield f"{self.name}_sum{_labels(labels)} {_num(value.sum)}"
+            yield f"{self.name}_count{_labels(labels)} {value.count}"
+
+
+def _num(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def _family(name: str, kind: str, help_text: str, buckets=None) -> _Family:
+    family = _families.get(name)
+    if family is None:
+        family = _families.setdefault(name, _Family(name, kind, help_text, buckets))
+    return family
+
+
+def enabled() -> bool:
+    return bool(getattr(settings, "REQUEST_METRICS", False))
+
+
+def observe(name: str, value: float, help_text: str = "", buckets=LATENCY_BUCKETS, **labels) -> None:
+    """Add ``value`` to the histogram ``name`` for the given labels."""
+    if not enabled():
+        return
+    key = tuple(sorted(labels.items()))
+    with _lock:
+        family = _family(name, "histogram", help_text, buckets)
+        hist = family.values.get(key)
+        if hist is None:
+            hist = family.values[key] = _Histogram(family.buckets)
+        hist.observe(value)
+
+
+def inc(name: str, amount: float = 1, help_text: str = "", **labels) -> None:
+    """Increment the counter ``name`` for the given labels."""
+    if not enabled():
+        return
+    key = tuple(sorted(labels.items()))
+    with _lock:
+        family = _family(name, "counter", help_text)
+        family.values[key] = family.values.get(key, 0) + amount
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+    with _lock:
+        lines = [line for name in sorted(_families) for line in _families[name].lines()]
+    return "\n".join(lines) + "\n"
+
+
+def reset() -> None:
+    with _lock:
+        _families.clear()
+
+
+class RequestTimings:
+    """Accumulated costs of the request being handled on this thread."""
+
+    __slots__ = ("db_seconds", "queries", "device_seconds", "_device_depth")
+
+    def __init__(self):
+        self.db_seconds = 0.0
+        self.queries = 0
+        self.device_seconds = 0.0
+        self._device_depth = 0
+
+    def db_wrapper(self, execute, sql, params, many, context):
+        """connection.execute_wrapper() hook timing every query."""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - start
+            self.queries += 1
+
+
+def begin_request() -> RequestTimings:
+    timings = RequestTimings()
+    _local.timings = timings
+    return timings
+
+
+def end_request() -> None:
+    _local.timings = None
+
+
+def current() -> RequestTimings | None:
+    return getattr(_local, "timings", None)
+
+
+@contextmanager
+def device_call():
+    """Attribute the enclosed block to the current request's device time.
+
+    Nested blocks (a config push that falls back to a reboot command) count once.
+    """
+    timings = current()
+    if timings is None:
+        yield
+        return
+    timings._device_depth += 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings._device_depth -= 1
+        if timings._device_depth == 0:
+            timings.device_seconds += time.perf_counter() - start
+
+
+_span_log = logging.getLogger("core.device_calls")
+
+
+def classify(exc: BaseException) -> str:
+    """Short outcome label for a failed device call."""
+    reason = getattr(exc, "reason", None)
+    if isinstance(exc, urllib.error.HTTPError):
+        return f"http_{exc.code}"
+    for err in (exc, reason):
+        if isinstance(err, (socket.timeout, TimeoutError)):
+            return "timeout"
+        if isinstance(err, ConnectionResetError):
+            return "reset"
+        if isinstance(err, ConnectionRefusedError):
+            return "refused"
+    return "error"
+
+
+class Span:
+    """One timed step of a device call; set ``outcome`` to override "ok"."""
+
+    __slots__ = ("step", "target", "outcome", "fields", "seconds")
+
+    def __init__(self, step: str, target, fields: dict):
+        self.step = step
+        self.target = target
+        self.outcome = None
+        self.fields = fields
+        self.seconds = 0.0
+
+    def as_dict(self) -> dict:
+        return {"step": self.step, "outcome": self.outcome, "ms": round(self.seconds * 1000, 2), **self.fields}
+
+
+@contextmanager
+def device_span(step: str, target=None, **fields):
+    """Time one step (tcp_connect, probe, post, fallback, ...) of a call to a reader.
+
+    Exceptions propagate unchanged; their outcome is derived with classify(). Spans
+    without a target (e.g. LAN sweep probes of unused addresses) are aggregated.
+    """
+    span = Span(step, target, fields)
+    start = time.perf_counter()
+    try:
+        yield span
+    except BaseException as exc:
+        if span.outcome is None:
+            span.outcome = classify(exc)
+        raise
+    finally:
+        span.seconds = time.perf_counter() - start
+        span.outcome = span.outcome or "ok"
+        labels = {"step": step, "outcome": span.outcome}
+        if target:
+            labels["target"] = str(target)
+        observe("rfid_device_span_seconds", span.seconds, "Duration of each step of a device call", **labels)
+        trace = getattr(_local, "trace", None)
+        if trace is not None:
+            trace.append(span)
+
+
+def device_operation(op: str):
+    """Decorator for helpers returning (ok, detail, http_code) for a target reader.
+
+    Records per-device success/failure counts and latency, attributes the time to
+    the current request (device_call) and logs one structured trace of all spans.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(target, *args, **kwargs):
+            outer_trace = getattr(_local, "trace", None)
+            trace = _local.trace = []
+            start = time.perf_counter()
+            result = None
+            try:
+                with device_call():
+                    result = func(target, *args, **kwargs)
+                return result
+            finally:
+                _local.trace = outer_trace
+                seconds = time.perf_counter() - start
+                ok = bool(result and result[0])
+                code = result[2] if result else None
+                outcome = "ok" if ok else "error"
+                target_label = str(target)
+                inc("rfid_device_operations_total", 1, "Device operations by outcome", op=op, target=target_label, outcome=outcome)
+                observe("rfid_device_operation_seconds", seconds, "Device operation latency", op=op, target=target_label)
+                fallback = result[1].get("fallback") if ok and isinstance(result[1], dict) else None
+                if fallback:
+                    inc("rfid_device_fallback_total", 1, "Fallback strategies that succeeded", op=op, target=target_label, fallback=fallback)
+                if outer_trace is not None:
+                    outer_trace.extend(trace)
+                _span_log.info(
+                    "%s %s %s code=%s %.1fms", op, target_label, outcome, code, seconds * 1000,
+                    extra={"device_trace": {
+                        "op": op, "target": target_label, "ok": ok, "code": code, "fallback": fallback,
+                        "ms": round(seconds * 1000, 2), "spans": [s.as_dict() for s in trace],
+                    }},
+                )
+        return wrapper
+    return decorator
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+from . import metrics
+
+
+def _route(request) -> str:
+    """URL pattern the request resolved to, e.g. "api/borrowers/<int:borrower_id>".
+
+    Slash and no-slash variants share a label; unresolved paths are grouped together.
+    """
+    match = getattr(request, "resolver_match", None)
+    if match is None or not match.route:
+        return "unmatched"
+    return match.route.rstrip("/") or "/"
+
+
+class RequestMetricsMiddleware:
+    """Per-request wall, DB, query-count and device-call timing.
+
+    Enabled with REQUEST_METRICS = True. Adds a ``Server-Timing`` header
+    (total, db, device and app = the remainder: views, DRF serialization, rendering)
+    and feeds the histograms served by /api/metrics.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "REQUEST_METRICS", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = metrics.begin_request()
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(timings.db_wrapper):
+                response = self.get_response(request)
+        finally:
+            metrics.end_request()
+        total = time.perf_counter() - start
+
+        route = _route(request)
+        metrics.observe(
+            "rfid_http_request_duration_seconds", total,
+            "Wall time per request", route=route, method=request.method, status=response.status_code,
+        )
+        metrics.observe("rfid_http_request_db_seconds", timings.db_seconds, "Database time per request", route=route)
+        metrics.observe(
+            "rfid_http_request_queries", timings.queries, "Database queries per request",
+            buckets=metrics.QUERY_BUCKETS, route=route,
+        )
+        metrics.observe(
+            "rfid_http_request_device_seconds", timings.device_seconds,
+            "Time spent calling readers per request", route=route,
+        )
+
+        app = max(total - timings.db_seconds - timings.device_seconds, 0.0)
+        response["Server-Timing"] = ", ".join([
+            f"total;dur={total * 1000:.2f}",
+            f'db;dur={timings.db_seconds * 1000:.2f};desc="{timings.queries} queries"',
+            f"device;dur={timings.device_seconds * 1000:.2f}",
+            f"app;dur={app * 1000:.2f}",
+        ])
+        return response
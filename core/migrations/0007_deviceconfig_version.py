@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:05
+
+import core.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_add_api_token_and_encrypted_password'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deviceconfig',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='deviceinstance',
+            name='api_token',
+            field=models.CharField(default=core.models._default_api_token, max_length=64, unique=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_deviceconfig_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deviceinstance',
+            name='config_version',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
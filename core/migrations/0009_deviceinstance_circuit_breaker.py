@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_deviceinstance_config_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deviceinstance',
+            name='circuit_opened_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='deviceinstance',
+            name='circuit_state',
+            field=models.CharField(choices=[('closed', 'Closed'), ('open', 'Open'), ('half_open', 'Half-open')], default='closed', max_length=16),
+        ),
+        migrations.AddField(
+            model_name='deviceinstance',
+            name='consecutive_failures',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='deviceinstance',
+            name='health_score',
+            field=models.FloatField(default=1.0),
+        ),
+    ]
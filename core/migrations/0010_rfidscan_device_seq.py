@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_deviceinstance_circuit_breaker'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rfidscan',
+            name='device',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='scans', to='core.deviceinstance'),
+        ),
+        migrations.AddField(
+            model_name='rfidscan',
+            name='scanned_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='rfidscan',
+            name='seq',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='rfidscan',
+            constraint=models.UniqueConstraint(fields=('device', 'seq'), name='uniq_rfidscan_device_seq'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_idempotencykey'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='borrowtransaction',
+            index=models.Index(fields=['-borrowed_at'], name='core_tx_borrowed_desc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='borrowtransaction',
+            index=models.Index(fields=['status', '-borrowed_at'], name='core_tx_status_borrowed_idx'),
+        ),
+    ]
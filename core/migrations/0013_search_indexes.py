@@ -0,0 +1,91 @@
+"""Search indexes for borrowers and items (see core.search).
+
+SQLite: FTS5 tables with the trigram tokenizer over the searched columns, kept in
+sync with the base tables by triggers. PostgreSQL: pg_trgm GIN indexes on the
+upper-cased columns, which is what ``icontains``/``istartswith`` compare against.
+Other backends, and SQLite builds without FTS5 or its trigram tokenizer (SQLite
+< 3.34), get nothing.
+"""
+from django.db import DatabaseError, migrations
+
+SEARCHED = {
+    "core_borrower": ("name", "rfid_uid"),
+    "core_item": ("name", "qr_code"),
+}
+
+
+def _sqlite_forward(table, columns):
+    fts = f"{table}_fts"
+    cols = ", ".join(columns)
+    new = ", ".join(f"new.{c}" for c in columns)
+    old = ", ".join(f"old.{c}" for c in columns)
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({cols}, content='{table}', content_rowid='id', tokenize='trigram')",
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); END",
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def _sqlite_backward(table, columns):
+    fts = f"{table}_fts"
+    return [f"DROP TRIGGER IF EXISTS {fts}_{suffix}" for suffix in ("ai", "ad", "au")] + [f"DROP TABLE IF EXISTS {fts}"]
+
+
+def _postgres_forward(table, columns):
+    return ["CREATE EXTENSION IF NOT EXISTS pg_trgm"] + [
+        f"CREATE INDEX IF NOT EXISTS {table}_{c}_trgm ON {table} USING gin (UPPER({c}) gin_trgm_ops)" for c in columns
+    ]
+
+
+def _postgres_backward(table, columns):
+    return [f"DROP INDEX IF EXISTS {table}_{c}_trgm" for c in columns]
+
+
+def _fts5_trigram_available(connection) -> bool:
+    """Whether this SQLite build has FTS5 and the trigram tokenizer (3.34+)."""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        if not cursor.fetchone()[0]:
+            return False
+        try:
+            cursor.execute("CREATE VIRTUAL TABLE temp.core_trigram_probe USING fts5(x, tokenize='trigram')")
+        except DatabaseError:
+            return False
+        cursor.execute("DROP TABLE temp.core_trigram_probe")
+        return True
+
+
+def _run(schema_editor, builders):
+    connection = schema_editor.connection
+    build = builders.get(connection.vendor)
+    if build is None or (connection.vendor == "sqlite" and not _fts5_trigram_available(connection)):
+        # core.search falls back to LIKE scans
+        return
+    for table, columns in SEARCHED.items():
+        for sql in build(table, columns):
+            schema_editor.execute(sql)
+
+
+def forwards(apps, schema_editor):
+    _run(schema_editor, {"sqlite": _sqlite_forward, "postgresql": _postgres_forward})
+
+
+def backwards(apps, schema_editor):
+    _run(schema_editor, {"sqlite": _sqlite_backward, "postgresql": _postgres_backward})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_borrowtransaction_borrowed_at_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
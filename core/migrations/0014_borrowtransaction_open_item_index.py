@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='borrowtransaction',
+            index=models.Index(condition=models.Q(('status', 'OPEN')), fields=['item', 'borrower', 'borrowed_at'], name='core_tx_open_item_idx'),
+        ),
+    ]
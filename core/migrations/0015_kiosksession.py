@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_borrowtransaction_open_item_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KioskSession',
+            fields=[
+                ('device', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='kiosk_session', serialize=False, to='core.deviceinstance')),
+                ('action', models.CharField(choices=[('borrow', 'Borrow'), ('return', 'Return')], default='borrow', max_length=16)),
+                ('opened_at', models.DateTimeField()),
+                ('expires_at', models.DateTimeField()),
+                ('borrower', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.borrower')),
+            ],
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_kiosksession'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='rfidscan',
+            index=models.Index(fields=['device', '-created_at'], name='core_rfidscan_device_recent'),
+        ),
+    ]
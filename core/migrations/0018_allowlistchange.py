@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_tableversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AllowListChange',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('rfid_uid', models.CharField(max_length=64)),
+                ('removed', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_allowlistchange'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deviceinstance',
+            name='announced_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
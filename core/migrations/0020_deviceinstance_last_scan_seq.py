@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:46
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def seed_high_water(apps, schema_editor):
+    """Start from the highest batched seq already stored per device."""
+    DeviceInstance = apps.get_model('core', 'DeviceInstance')
+    RFIDScan = apps.get_model('core', 'RFIDScan')
+    rows = RFIDScan.objects.filter(device__isnull=False, seq__isnull=False).values('device').annotate(top=Max('seq'))
+    for row in rows:
+        DeviceInstance.objects.filter(pk=row['device']).update(last_scan_seq=row['top'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_deviceinstance_announced_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deviceinstance',
+            name='last_scan_seq',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(seed_high_water, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_deviceinstance_last_scan_seq'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deviceinstance',
+            name='scan_epoch',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
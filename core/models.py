@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from django.db import models
+from django.utils import timezone
 import secrets
 
 
@@ -44,6 +45,15 @@ class BorrowTransaction(models.Model):
         indexes = [
             models.Index(fields=["status", "item"]),
             models.Index(fields=["borrower", "status"]),
+            # Newest-first log book pages read these in order instead of sorting the table
+            models.Index(fields=["-borrowed_at"], name="core_tx_borrowed_desc_idx"),
+            models.Index(fields=["status", "-borrowed_at"], name="core_tx_status_borrowed_idx"),
+            # Open loans only: who has an item is answered from the index alone
+            models.Index(
+                fields=["item", "borrower", "borrowed_at"],
+                condition=models.Q(status="OPEN"),
+                name="core_tx_open_item_idx",
+            ),
         ]
         ordering = ["-borrowed_at"]
 
@@ -57,8 +67,23 @@ class RFIDScan(models.Model):
     email = models.EmailField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Reader that reported the scan (when it sent its device token)
+    device = models.ForeignKey(
+        'DeviceInstance', null=True, blank=True, on_delete=models.SET_NULL, related_name='scans'
+    )
+    # Set for scans uploaded in batches: the reader's own sequence number and scan time
+    seq = models.PositiveBigIntegerField(null=True, blank=True)
+    scanned_at = models.DateTimeField(null=True, blank=True)
+
     class Meta:
         ordering = ["-created_at"]
+        constraints = [
+            models.UniqueConstraint(fields=["device", "seq"], name="uniq_rfidscan_device_seq"),
+        ]
+        indexes = [
+            # Per-station feeds: a device's newest scans without scanning other readers' rows
+            models.Index(fields=["device", "-created_at"], name="core_rfidscan_device_recent"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.uid} @ {self.created_at}"
@@ -77,6 +102,8 @@ class DeviceConfig(models.Model):
     encrypted_password = models.TextField(blank=True, default='')
     api_host = models.CharField(max_length=256, blank=True, default='')
     updated_at = models.DateTimeField(auto_now=True)
+    # Bumped on every save; used for device ETags and cache invalidation
+    version = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         verbose_name = "Device Configuration"
@@ -85,6 +112,13 @@ class DeviceConfig(models.Model):
     def __str__(self) -> str:
         return f"DeviceConfig (api_host={self.api_host})"
 
+    def save(self, *args, **kwargs):
+        self.version = (self.version or 0) + 1
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "version" not in update_fields:
+            kwargs["update_fields"] = list(update_fields) + ["version"]
+        super().save(*args, **kwargs)
+
     def set_password(self, raw: str):
         """Encrypt and store a password, clearing legacy plaintext field."""
         from .crypto import encrypt_text
@@ -96,15 +130,23 @@ class DeviceConfig(models.Model):
             self.password = ''
 
     def get_password(self) -> str:
-        """Return decrypted password if available, else return legacy plaintext field or empty string."""
-        from .crypto import decrypt_text
+        """Return decrypted password if available, else return legacy plaintext field or empty string.
+
+        Decrypted values are cached in memory until the config is saved again.
+        """
+        from .crypto import decrypt_text_cached
         if self.encrypted_password:
-            return decrypt_text(self.encrypted_password) or ''
+            return decrypt_text_cached(self.encrypted_password) or ''
         return self.password or ''
 
 
 class DeviceInstance(models.Model):
     """Represents a discovered ESP device that periodically registers itself with the server."""
+    class Circuit(models.TextChoices):
+        CLOSED = "closed", "Closed"
+        OPEN = "open", "Open"
+        HALF_OPEN = "half_open", "Half-open"
+
     ip = models.CharField(max_length=64)
     api_host = models.CharField(max_length=256, blank=True, default='')
     ssid = models.CharField(max_length=128, blank=True, default='')
@@ -126,7 +168,22 @@ class DeviceInstance(models.Model):
     last_disconnect_reason = models.CharField(max_length=128, blank=True, default='')
     server_reachable = models.BooleanField(default=False)
 
+    # DeviceConfig.version last applied by the device (set on push, reported in heartbeats)
+    config_version = models.PositiveIntegerField(null=True, blank=True)
+    # Highest RFIDScan.seq stored from this device's batch uploads
+    last_scan_seq = models.PositiveBigIntegerField(null=True, blank=True)
+    # Reader-chosen id of the seq counter behind last_scan_seq; a new one restarts it
+    scan_epoch = models.CharField(max_length=64, blank=True, default="")
+
+    # Reachability from the server side (core.health): pushes skip devices with an open circuit
+    health_score = models.FloatField(default=1.0)
+    consecutive_failures = models.PositiveIntegerField(default=0)
+    circuit_state = models.CharField(max_length=16, choices=Circuit.choices, default=Circuit.CLOSED)
+    circuit_opened_at = models.DateTimeField(null=True, blank=True)
+
     last_seen = models.DateTimeField(auto_now=True)
+    # Last UDP announcement received by the discovery listener (core.discovery)
+    announced_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         ordering = ["-last_seen"]
@@ -143,3 +200,67 @@ class DeviceInstance(models.Model):
         return self.api_token
 
 
+class IdempotencyKey(models.Model):
+    """Stored first response for a POST sent with an Idempotency-Key header (core.idempotency).
+
+    ``status_code`` is null while the first request is still being processed.
+    """
+    scope = models.CharField(max_length=160)
+    key = models.CharField(max_length=128)
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["scope", "key"], name="uniq_idempotency_scope_key"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.scope} {self.key} -> {self.status_code}"
+
+
+class KioskSession(models.Model):
+    """The borrower selected by a reader's last card tap, until ``expires_at`` (core.kiosk).
+
+    One row per device; a new tap replaces it.
+    """
+    class Action(models.TextChoices):
+        BORROW = "borrow", "Borrow"
+        RETURN = "return", "Return"
+
+    device = models.OneToOneField(
+        DeviceInstance, on_delete=models.CASCADE, primary_key=True, related_name="kiosk_session"
+    )
+    borrower = models.ForeignKey(Borrower, on_delete=models.CASCADE, related_name="+")
+    action = models.CharField(max_length=16, choices=Action.choices, default=Action.BORROW)
+    opened_at = models.DateTimeField()
+    expires_at = models.DateTimeField()
+
+    def __str__(self) -> str:
+        return f"{self.device_id}: {self.borrower_id} ({self.action}) until {self.expires_at}"
+
+
+class TableVersion(models.Model):
+    """Write counter per table, for ETag/Last-Modified on list endpoints (core.versions)."""
+    table = models.CharField(max_length=64, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self) -> str:
+        return f"{self.table} v{self.version}"
+
+
+class AllowListChange(models.Model):
+    """One registered RFID UID added to or removed from the reader allow-list (core.allowlist).
+
+    The id is the allow-list version the change produced.
+    """
+    id = models.BigAutoField(primary_key=True)
+    rfid_uid = models.CharField(max_length=64)
+    removed = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return f"v{self.id} {'-' if self.removed else '+'}{self.rfid_uid}"
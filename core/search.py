@@ -0,0 +1,161 @@
+"""Indexed search for borrowers and items.
+
+``icontains`` OR chains compile to ``LIKE '%q%'`` and scan the whole table on every
+keystroke. Migration 0013 adds a trigram index per searched table and ``search()``
+uses it:
+
+* SQLite: an FTS5 table with the trigram tokenizer (``<table>_fts``), kept in sync by
+  triggers, so inserts, updates and bulk writes need no application code. A phrase
+  query matches the same case-insensitive substrings as ``icontains`` and is ranked
+  with bm25.
+* PostgreSQL: pg_trgm GIN indexes on ``UPPER(column)``, which ``icontains`` and
+  ``istartswith`` use directly; results are ranked by trigram similarity.
+
+Queries shorter than three characters have no trigrams to look up and, like other
+backends or a SQLite build without FTS5 or trigram support, fall back to the plain
+lookups. ``prefix`` matches codes and names that start with the query (autocomplete).
+
+Whether the FTS5 tables exist is looked up once per process. ``warm()`` does that
+lookup and runs after every ``migrate`` (see core.signals), so the first search of a
+process does not pay for it; ``clear()`` forgets the result. SQLite rebuilds a table
+when a migration alters it, which drops its triggers; ``warm()`` re-creates missing
+triggers and rebuilds that index, since it would otherwise go stale without error.
+"""
+from __future__ import annotations
+
+import logging
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, FloatField, Func, Q, QuerySet, Value
+from django.db.models.functions import Greatest, Upper
+
+from .models import Borrower, Item
+
+logger = logging.getLogger(__name__)
+
+MIN_INDEXED_LENGTH = 3
+
+
+class SearchSpec(NamedTuple):
+    model: type
+    fields: tuple[str, ...]
+
+    @property
+    def fts_table(self) -> str:
+        return f"{self.model._meta.db_table}_fts"
+
+
+BORROWERS = SearchSpec(Borrower, ("name", "rfid_uid"))
+ITEMS = SearchSpec(Item, ("name", "qr_code"))
+
+
+def max_results() -> int:
+    return int(getattr(settings, "SEARCH_MAX_RESULTS", 100))
+
+
+_fts_tables: frozenset[str] | None = None
+
+
+def _sqlite_triggers(spec: SearchSpec) -> dict[str, str]:
+    """The sync triggers of migration 0013, by name."""
+    fts, table = spec.fts_table, spec.model._meta.db_table
+    cols = ", ".join(spec.fields)
+    new = ", ".join(f"new.{c}" for c in spec.fields)
+    old = ", ".join(f"old.{c}" for c in spec.fields)
+    return {
+        f"{fts}_ai": f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+                     f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+        f"{fts}_ad": f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+                     f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); END",
+        f"{fts}_au": f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN "
+                     f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); "
+                     f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+    }
+
+
+def warm() -> None:
+    """Look up which FTS5 tables exist and restore any sync triggers they lost."""
+    global _fts_tables
+    if connection.vendor != "sqlite":
+        _fts_tables = frozenset()
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT type, name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+        rows = cursor.fetchall()
+        tables = {name for kind, name in rows if kind == "table"}
+        triggers = {name for kind, name in rows if kind == "trigger"}
+        specs = [spec for spec in (BORROWERS, ITEMS) if spec.fts_table in tables]
+        for spec in specs:
+            missing = {name: sql for name, sql in _sqlite_triggers(spec).items() if name not in triggers}
+            if not missing:
+                continue
+            logger.warning("Re-creating search triggers %s and rebuilding %s", ", ".join(missing), spec.fts_table)
+            for sql in missing.values():
+                cursor.execute(sql)
+            cursor.execute(f"INSERT INTO {spec.fts_table}({spec.fts_table}) VALUES ('rebuild')")
+    _fts_tables = frozenset(spec.fts_table for spec in specs)
+
+
+def clear() -> None:
+    global _fts_tables
+    _fts_tables = None
+
+
+def _has_fts_table(table: str) -> bool:
+    if _fts_tables is None:
+        warm()
+    return table in _fts_tables
+
+
+def _filter(spec: SearchSpec, q: str, prefix: bool) -> Q:
+    lookup = "istartswith" if prefix else "icontains"
+    condition = Q()
+    for field in spec.fields:
+        condition |= Q(**{f"{field}__{lookup}": q})
+    return condition
+
+
+def _sqlite(spec: SearchSpec, queryset: QuerySet, q: str, prefix: bool) -> QuerySet:
+    fts, table = spec.fts_table, spec.model._meta.db_table
+    phrase = '"' + q.replace('"', '""') + '"'
+    queryset = queryset.extra(
+        tables=[fts],
+        where=[f"{fts}.rowid = {table}.id", f"{fts} MATCH %s"],
+        params=[phrase],
+        select={"search_rank": f"{fts}.rank"},
+    )
+    if prefix:
+        # The index narrows to substring matches; keep the ones at the start
+        return queryset.filter(_filter(spec, q, prefix=True)).order_by(*spec.fields[:1], "pk")
+    return queryset.order_by("search_rank", "pk")
+
+
+def _postgres(spec: SearchSpec, queryset: QuerySet, q: str, prefix: bool) -> QuerySet:
+    queryset = queryset.filter(_filter(spec, q, prefix))
+    if prefix:
+        return queryset.order_by(*spec.fields[:1], "pk")
+    similarities = [
+        Func(Upper(F(field)), Value(q.upper()), function="similarity", output_field=FloatField())
+        for field in spec.fields
+    ]
+    return queryset.annotate(search_rank=Greatest(*similarities)).order_by("-search_rank", "pk")
+
+
+def search(spec: SearchSpec, q: str, *, prefix: bool = False, limit: int | None = None,
+           queryset: QuerySet | None = None) -> QuerySet:
+    """Rows of ``spec.model`` matching ``q``, best match first, at most ``limit``.
+
+    ``limit`` is capped at SEARCH_MAX_RESULTS.
+    """
+    q = q.strip()
+    queryset = spec.model.objects.all() if queryset is None else queryset
+    limit = max_results() if limit is None else max(0, min(limit, max_results()))
+    if len(q) >= MIN_INDEXED_LENGTH and connection.vendor == "sqlite" and _has_fts_table(spec.fts_table):
+        queryset = _sqlite(spec, queryset, q, prefix)
+    elif len(q) >= MIN_INDEXED_LENGTH and connection.vendor == "postgresql":
+        queryset = _postgres(spec, queryset, q, prefix)
+    else:
+        queryset = queryset.filter(_filter(spec, q, prefix))
+    return queryset[:limit]
@@ -1,7 +1,8 @@
 from rest_framework import serializers
 
 from .models import Borrower, Item, BorrowTransaction, RFIDScan
-from .models import DeviceConfig, DeviceInstance
+from .models import DeviceConfig, DeviceInstance, KioskSession
+from . import health
 
 
 class BorrowerSerializer(serializers.ModelSerializer):
@@ -74,7 +75,7 @@ class ItemRegistrationSerializer(serializers.Serializer):
 class RFIDScanSerializer(serializers.ModelSerializer):
     class Meta:
         model = RFIDScan
-        fields = ["id", "uid", "name", "email", "created_at"]
+        fields = ["id", "uid", "name", "email", "created_at", "device"]
 
 
 class RFIDScanCreateSerializer(serializers.Serializer):
@@ -83,6 +84,53 @@ class RFIDScanCreateSerializer(serializers.Serializer):
     email = serializers.EmailField(required=False, allow_blank=True)
 
 
+class RFIDScanBatchItemSerializer(serializers.Serializer):
+    seq = serializers.IntegerField(min_value=0)
+    uid = serializers.CharField(max_length=64)
+    name = serializers.CharField(max_length=120, required=False, allow_blank=True)
+    email = serializers.EmailField(required=False, allow_blank=True)
+    # Wall-clock scan time, or for readers without NTP the scan's age when sent
+    scanned_at = serializers.DateTimeField(required=False)
+    age_ms = serializers.IntegerField(min_value=0, required=False)
+
+
+class RFIDScanBatchSerializer(serializers.Serializer):
+    MAX_SCANS = 500
+
+    # Changes whenever the reader's seq counter restarts (new boot, NVS wipe)
+    epoch = serializers.CharField(max_length=64, required=False, allow_blank=True)
+    scans = RFIDScanBatchItemSerializer(many=True, allow_empty=False)
+
+    def validate_scans(self, scans):
+        if len(scans) > self.MAX_SCANS:
+            raise serializers.ValidationError(f"At most {self.MAX_SCANS} scans per batch.")
+        return scans
+
+
+class KioskTapSerializer(serializers.Serializer):
+    uid = serializers.CharField(max_length=64)
+    name = serializers.CharField(max_length=120, required=False, allow_blank=True)
+    email = serializers.EmailField(required=False, allow_blank=True)
+    action = serializers.ChoiceField(choices=KioskSession.Action.choices, default=KioskSession.Action.BORROW)
+
+
+class KioskScanSerializer(serializers.Serializer):
+    item_qr = serializers.CharField(max_length=128)
+
+
+class ItemAvailabilitySerializer(serializers.Serializer):
+    MAX_CODES = 500
+
+    qr_codes = serializers.ListField(
+        child=serializers.CharField(max_length=128), allow_empty=False, max_length=MAX_CODES
+    )
+
+
+class PushConfigAllSerializer(serializers.Serializer):
+    stale_only = serializers.BooleanField(default=False)
+    force = serializers.BooleanField(default=False)
+
+
 class DeviceConfigSerializer(serializers.ModelSerializer):
     # Accept plain password on write only; don't expose plaintext password in responses
     password = serializers.CharField(write_only=True, required=False, allow_blank=True)
@@ -115,6 +163,7 @@ class DeviceConfigForDeviceSerializer(serializers.ModelSerializer):
 
 class DeviceInstanceSerializer(serializers.ModelSerializer):
     claimed_by = serializers.SerializerMethodField()
+    health = serializers.SerializerMethodField()
     api_token = serializers.SerializerMethodField()
 
     class Meta:
@@ -133,12 +182,19 @@ class DeviceInstanceSerializer(serializers.ModelSerializer):
             "last_rssi",
             "last_disconnect_reason",
             "server_reachable",
+            "config_version",
+            "health",
+            "circuit_state",
+            "consecutive_failures",
             "api_token",
         ]
 
     def get_claimed_by(self, obj):
         return obj.claimed_by.username if obj.claimed_by else None
 
+    def get_health(self, obj):
+        return health.score(obj)
+
     def get_api_token(self, obj):
         # Only show API token to staff users or the device owner
         request = self.context.get('request') if self.context else None
@@ -153,6 +209,7 @@ class DeviceInstanceSerializer(serializers.ModelSerializer):
 
 class DeviceInstanceSerializer(serializers.ModelSerializer):
     claimed_by = serializers.SerializerMethodField()
+    health = serializers.SerializerMethodField()
 
     class Meta:
         model = DeviceInstance
@@ -170,8 +227,15 @@ class DeviceInstanceSerializer(serializers.ModelSerializer):
             "last_rssi",
             "last_disconnect_reason",
             "server_reachable",
+            "config_version",
+            "health",
+            "circuit_state",
+            "consecutive_failures",
         ]
 
     def get_claimed_by(self, obj):
         return obj.claimed_by.username if obj.claimed_by else None
 
+    def get_health(self, obj):
+        return health.score(obj)
+
@@ -0,0 +1,71 @@
+"""Signal receivers that keep in-process caches, table versions and the allow-list
+changelog in step with the database."""
+from __future__ import annotations
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_save
+from django.dispatch import receiver
+
+from . import allowlist, config_cache, crypto, entity_cache, search, versions
+from .models import Borrower, DeviceConfig, Item
+
+
+@receiver(post_save, sender=DeviceConfig)
+@receiver(post_delete, sender=DeviceConfig)
+def device_config_changed(sender, instance, **kwargs):
+    crypto.clear_cache()
+    config_cache.invalidate()
+
+
+@receiver(post_save, sender=Borrower)
+@receiver(post_delete, sender=Borrower)
+@receiver(post_save, sender=Item)
+@receiver(post_delete, sender=Item)
+def entity_changed(sender, instance, **kwargs):
+    entity_cache.invalidate(instance)
+
+
+@receiver(pre_save, sender=Borrower)
+def borrower_saving(sender, instance, update_fields=None, **kwargs):
+    allowlist.remember_previous(instance, update_fields)
+
+
+@receiver(post_save, sender=Borrower)
+def borrower_saved(sender, instance, created, **kwargs):
+    allowlist.record_saved(instance, created)
+
+
+@receiver(post_delete, sender=Borrower)
+def borrower_deleted(sender, instance, **kwargs):
+    allowlist.record_deleted(instance)
+
+
+def table_changed(sender, instance, **kwargs):
+    versions.bump(sender._meta.db_table)
+
+
+for _model in versions.TRACKED_MODELS:
+    post_save.connect(table_changed, sender=_model, dispatch_uid=f"versions.{_model._meta.label}")
+    post_delete.connect(table_changed, sender=_model, dispatch_uid=f"versions.{_model._meta.label}.delete")
+
+
+@receiver(post_migrate)
+def schema_migrated(sender, using=DEFAULT_DB_ALIAS, **kwargs):
+    """Migrations may add or drop the search index tables."""
+    if sender.name == "core" and using == DEFAULT_DB_ALIAS:
+        search.warm()
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Apply settings.SQLITE_PRAGMAS (WAL, synchronous, mmap...) to new SQLite connections."""
+    if connection.vendor != "sqlite":
+        return
+    pragmas = getattr(settings, "SQLITE_PRAGMAS", None) or {}
+    if not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
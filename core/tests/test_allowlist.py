@@ -0,0 +1,105 @@
+import base64
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core import allowlist
+from core.models import AllowListChange, Borrower
+
+
+def bloom_contains(bloom, uid):
+    """The reader-side check, written from the core.allowlist docstring."""
+    data = base64.b64decode(bloom['data'])
+    raw = uid.encode('utf-8')
+    h1 = 0x811C9DC5
+    for byte in raw:
+        h1 = ((h1 ^ byte) * 0x01000193) & 0xFFFFFFFF
+    h2 = 0x811C9DC5
+    for byte in raw:
+        h2 = ((h2 * 0x01000193) & 0xFFFFFFFF) ^ byte
+    h2 |= 1
+    for i in range(bloom['hashes']):
+        j = (h1 + i * h2) % bloom['bits']
+        if not data[j >> 3] & (1 << (j & 7)):
+            return False
+    return True
+
+
+class AllowListTests(TestCase):
+    def setUp(self):
+        allowlist.clear()
+        self.client = APIClient()
+        self.url = reverse('api-rfid-allowlist')
+        self.ana = Borrower.objects.create(name='Ana', rfid_uid='AABBCCDD')
+        self.ben = Borrower.objects.create(name='Ben', rfid_uid='11223344')
+
+    def get(self, **params):
+        res = self.client.get(self.url, params)
+        self.assertEqual(res.status_code, 200)
+        return res.json()
+
+    def test_full_snapshot_is_sorted(self):
+        body = self.get()
+        self.assertTrue(body['full'])
+        self.assertEqual(body['uids'], ['11223344', 'AABBCCDD'])
+        self.assertEqual(body['count'], 2)
+        self.assertEqual(body['digest'], allowlist.digest(['11223344', 'AABBCCDD']))
+
+    def test_delta_since_a_version(self):
+        version = self.get()['version']
+        Borrower.objects.create(name='Cy', rfid_uid='55667788')
+        self.ben.rfid_uid = '99999999'
+        self.ben.save()
+        self.ana.delete()
+        body = self.get(since=version)
+        self.assertFalse(body['full'])
+        self.assertEqual(body['added'], ['55667788', '99999999'])
+        self.assertEqual(body['removed'], ['11223344', 'AABBCCDD'])
+        self.assertEqual(body['digest'], allowlist.digest(['55667788', '99999999']))
+
+    def test_saves_that_keep_the_uid_log_nothing(self):
+        before = AllowListChange.objects.count()
+        self.ana.name = 'Ana Maria'
+        self.ana.save()
+        self.ana.save(update_fields=['name'])
+        self.assertEqual(AllowListChange.objects.count(), before)
+
+    def test_unchanged_poll_is_not_modified(self):
+        version = self.get()['version']
+        res = self.client.get(self.url, {'since': version})
+        with self.assertNumQueries(1):
+            res = self.client.get(self.url, {'since': version}, HTTP_IF_NONE_MATCH=res['ETag'])
+        self.assertEqual(res.status_code, 304)
+
+    def test_cached_snapshot_costs_one_query(self):
+        self.get()
+        with self.assertNumQueries(1):
+            self.get()
+
+    @override_settings(ALLOWLIST_CHANGELOG_SIZE=2)
+    def test_pruned_history_gets_a_full_snapshot(self):
+        first = self.get()['version']
+        for i in range(allowlist.PRUNE_EVERY):
+            Borrower.objects.create(name=f'B{i}', rfid_uid=f'UID{i:04d}')
+        self.assertLessEqual(AllowListChange.objects.count(), allowlist.PRUNE_EVERY)
+        body = self.get(since=first)
+        self.assertTrue(body['full'])
+        self.assertEqual(body['count'], allowlist.PRUNE_EVERY + 2)
+
+    def test_bloom_filter(self):
+        body = self.get(kind='bloom')
+        self.assertTrue(body['full'])
+        self.assertTrue(bloom_contains(body['bloom'], 'AABBCCDD'))
+        self.assertTrue(bloom_contains(body['bloom'], '11223344'))
+
+    def test_bloom_false_positive_rate(self):
+        uids = [f'{i:08X}' for i in range(2000)]
+        bloom = allowlist.build_bloom(uids, 0.01)
+        self.assertTrue(all(bloom_contains(bloom, uid) for uid in uids))
+        false_hits = sum(bloom_contains(bloom, f'Z{i:07X}') for i in range(5000))
+        self.assertLess(false_hits / 5000, 0.03)
+
+    def test_bad_parameters(self):
+        self.assertEqual(self.client.get(self.url, {'kind': 'xml'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'since': 'abc'}).status_code, 400)
@@ -0,0 +1,202 @@
+"""Hot-path benchmarks for the API.
+
+Query counts are always checked (assertNumQueries against the stored baseline; the
+small seed and the timing volume keep separate counts), so N+1 regressions fail the
+normal test run. Timing is opt-in because it needs realistic volumes:
+
+    RFID_BENCHMARK=1 python manage.py test core.tests.test_benchmarks
+
+seeds RFID_BENCH_ITEMS / RFID_BENCH_BORROWERS / RFID_BENCH_TRANSACTIONS rows
+(default 100k / 20k / 1M) and fails when a path's median is more than
+RFID_BENCHMARK_THRESHOLD (default 1.25) times its baseline. Set
+RFID_BENCHMARK_UPDATE=1 to rewrite benchmark_baselines.json from the current run;
+timing baselines are machine-specific, so refresh them on the machine you compare on.
+"""
+import json
+import os
+import statistics
+import time
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.models import Borrower, BorrowTransaction, DeviceInstance, Item
+
+
+BASELINES_PATH = Path(__file__).with_name('benchmark_baselines.json')
+TIMING = os.environ.get('RFID_BENCHMARK') == '1'
+UPDATE = os.environ.get('RFID_BENCHMARK_UPDATE') == '1'
+THRESHOLD = float(os.environ.get('RFID_BENCHMARK_THRESHOLD', '1.25'))
+ROUNDS = int(os.environ.get('RFID_BENCHMARK_ROUNDS', '30'))
+
+if TIMING:
+    N_ITEMS = int(os.environ.get('RFID_BENCH_ITEMS', '100000'))
+    N_BORROWERS = int(os.environ.get('RFID_BENCH_BORROWERS', '20000'))
+    N_TRANSACTIONS = int(os.environ.get('RFID_BENCH_TRANSACTIONS', '1000000'))
+else:
+    N_ITEMS, N_BORROWERS, N_TRANSACTIONS = 200, 40, 400
+
+
+def _uid(i: int) -> str:
+    return f'{0x10000000 + i:08X}'
+
+
+def _qr(i: int) -> str:
+    return f'ITEM-{i:016X}'
+
+
+def seed(n_items: int, n_borrowers: int, n_transactions: int, batch: int = 5000):
+    """Bulk-load borrowers, items and a loan history.
+
+    The last 10% of items are always free (benchmarks borrow those); the first
+    min(n_items // 10, n_transactions) items have one OPEN loan each; the remaining
+    transactions are RETURNED history spread over all items.
+    """
+    Borrower.objects.bulk_create(
+        (Borrower(name=f'Borrower {i:06d}', rfid_uid=_uid(i), email=f'b{i}@example.com') for i in range(n_borrowers)),
+        batch_size=batch,
+    )
+    Item.objects.bulk_create(
+        (Item(name=f'Item {i:06d}', qr_code=_qr(i)) for i in range(n_items)),
+        batch_size=batch,
+    )
+    borrower_ids = list(Borrower.objects.order_by('id').values_list('id', flat=True))
+    item_ids = list(Item.objects.order_by('id').values_list('id', flat=True))
+    n_open = min(n_items // 10, n_transactions)
+
+    def rows():
+        for i in range(n_transactions):
+            borrower_id = borrower_ids[i % len(borrower_ids)]
+            if i < n_open:
+                yield BorrowTransaction(borrower_id=borrower_id, item_id=item_ids[i], status=BorrowTransaction.Status.OPEN)
+            else:
+                yield BorrowTransaction(
+                    borrower_id=borrower_id,
+                    item_id=item_ids[i % (len(item_ids) * 9 // 10)],
+                    status=BorrowTransaction.Status.RETURNED,
+                )
+
+    BorrowTransaction.objects.bulk_create(rows(), batch_size=batch)
+    return n_open
+
+
+def _load_baselines() -> dict:
+    if BASELINES_PATH.exists():
+        return json.loads(BASELINES_PATH.read_text())
+    return {}
+
+
+_measured: dict = {}
+
+
+def _render_context(request, template_name, context=None, *args, **kwargs):
+    """Stand-in for render(): touch everything a list template would."""
+    from django.http import HttpResponse
+    for value in (context or {}).values():
+        if hasattr(value, '__iter__') and not isinstance(value, (str, bytes)):
+            for tx in value:
+                str(tx.borrower.name)
+                str(tx.item.name)
+    return HttpResponse(b'')
+
+
+class HotPathBenchmarks(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.n_open = seed(N_ITEMS, N_BORROWERS, N_TRANSACTIONS)
+        cls.free_items = [_qr(i) for i in range(N_ITEMS * 9 // 10, N_ITEMS)]
+        cls.open_items = [_qr(i) for i in range(cls.n_open)]
+        cls.user = User.objects.create_user('bench', password='x', is_staff=True)
+        DeviceInstance.objects.create(ip='10.9.0.1')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        if UPDATE and _measured:
+            baselines = _load_baselines()
+            for name, values in _measured.items():
+                baselines.setdefault(name, {}).update(values)
+            BASELINES_PATH.write_text(json.dumps(baselines, indent=2, sort_keys=True) + '\n')
+
+    def bench(self, name, call):
+        """Check the query count of `call(i)` and, when enabled, its median time."""
+        baseline = _load_baselines().get(name, {})
+        # Query counts can depend on volume (e.g. list pages), so each seed has its own key
+        queries_key = 'queries_at_volume' if TIMING else 'queries'
+        # Warm-up call: one-off per-process lookups (e.g. the search index probe) are not per request
+        call(0)
+        with CaptureQueriesContext(connection) as ctx:
+            response = call(1)
+        self.assertLess(response.status_code, 400, getattr(response, 'content', b'')[:300])
+        queries = len(ctx.captured_queries)
+        result = {queries_key: queries}
+        if not UPDATE:
+            self.assertIn(queries_key, baseline, f'no baseline for {name}; run with RFID_BENCHMARK_UPDATE=1')
+            self.assertEqual(
+                queries, baseline[queries_key],
+                f'{name}: {queries} queries, baseline {baseline[queries_key]}\n'
+                + '\n'.join(q['sql'] for q in ctx.captured_queries),
+            )
+
+        if TIMING:
+            samples = []
+            for i in range(2, ROUNDS + 2):
+                t0 = time.perf_counter()
+                call(i)
+                samples.append(time.perf_counter() - t0)
+            median_ms = statistics.median(samples) * 1000
+            result['median_ms'] = round(median_ms, 3)
+            print(f'\n{name:<24} {median_ms:8.2f} ms median  {queries} queries')
+            if not UPDATE and 'median_ms' in baseline:
+                limit = baseline['median_ms'] * THRESHOLD
+                self.assertLessEqual(
+                    median_ms, limit,
+                    f'{name} regressed: {median_ms:.2f} ms > {limit:.2f} ms ({THRESHOLD}x baseline)',
+                )
+        _measured[name] = result
+
+    def test_borrow_create(self):
+        self.bench('borrow_create', lambda i: self.client.post(
+            reverse('api-borrow'),
+            {'borrower_rfid': _uid(i % N_BORROWERS), 'item_qr': self.free_items[i]},
+            content_type='application/json',
+        ))
+
+    def test_return(self):
+        self.bench('return', lambda i: self.client.post(
+            reverse('api-return'), {'item_qr': self.open_items[i]}, content_type='application/json',
+        ))
+
+    def test_borrower_lookup_by_uid(self):
+        # Firmware checkBorrower(): GET /api/borrowers?q=<uid>
+        self.bench('borrower_lookup_uid', lambda i: self.client.get(
+            reverse('api-borrowers'), {'q': _uid(i % N_BORROWERS)},
+        ))
+
+    def test_borrower_search_by_name(self):
+        # Matches exactly ten borrowers (Borrower 000010 .. 000019)
+        self.bench('borrower_search_name', lambda i: self.client.get(
+            reverse('api-borrowers'), {'q': 'Borrower 00001'},
+        ))
+
+    def test_scan_id(self):
+        self.bench('scan_id', lambda i: self.client.post(
+            reverse('api-scan-id'), {'borrower_rfid': _uid(i % N_BORROWERS)}, content_type='application/json',
+        ))
+
+    def test_device_heartbeat(self):
+        self.bench('device_heartbeat', lambda i: self.client.post(
+            reverse('api-device-instances'),
+            {'ip': '10.9.0.1', 'firmware': '1.0.0', 'ssid': 'NET', 'server_reachable': True, 'rssi': -50},
+            content_type='application/json',
+        ))
+
+    def test_dashboard(self):
+        self.client.force_login(self.user)
+        with mock.patch('core.views.render', _render_context):
+            self.bench('dashboard', lambda i: self.client.get(reverse('core:dashboard')))
@@ -0,0 +1,55 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core import debounce
+from core.compact import COMPACT_MEDIA_TYPE
+from core.models import Borrower, BorrowTransaction, DeviceInstance, Item, RFIDScan
+
+
+class CompactDeviceResponseTests(TestCase):
+    def setUp(self):
+        debounce.clear()
+        self.borrower = Borrower.objects.create(name='Ana', rfid_uid='A1B2C3D4', email='ana@example.com')
+        self.item = Item.objects.create(name='Projector', qr_code='ITEM-COMPACT')
+        DeviceInstance.objects.create(ip='10.0.0.80', api_token='compacttoken')
+        self.device = APIClient()
+        self.device.credentials(HTTP_X_DEVICE_TOKEN='compacttoken')
+        self.browser = APIClient()
+
+    def test_borrow_and_return_are_flat(self):
+        body = {'borrower_rfid': 'A1B2C3D4', 'item_qr': 'ITEM-COMPACT'}
+        res = self.device.post(reverse('api-borrow'), body, format='json')
+        self.assertEqual(res.status_code, 201)
+        tx = BorrowTransaction.objects.get()
+        self.assertEqual(res.json(), {'id': tx.id, 'status': 'OPEN', 'borrower_id': self.borrower.id, 'item_id': self.item.id})
+        res = self.device.post(reverse('api-return'), {'item_qr': 'ITEM-COMPACT'}, format='json')
+        self.assertEqual(res.json()['status'], 'RETURNED')
+
+    def test_full_payload_without_device_profile(self):
+        res = self.browser.post(reverse('api-borrow'), {'borrower_rfid': 'A1B2C3D4', 'item_qr': 'ITEM-COMPACT'}, format='json')
+        self.assertEqual(res.json()['borrower']['name'], 'Ana')
+        self.assertIn('Accept', res['Vary'])
+
+    def test_borrower_lookup_keeps_rfid_uid_and_skips_counts(self):
+        Borrower.objects.create(name='Ben', rfid_uid='A1B2C3D5')
+        # One query for the list, none per borrower (the full profile counts open loans per row)
+        with self.assertNumQueries(1):
+            res = self.device.get(reverse('api-borrowers'), {'q': 'A1B2C3'})
+        self.assertEqual(res.status_code, 200)
+        self.assertIn('"rfid_uid":"A1B2C3D4"', res.content.decode())
+        self.assertEqual(set(res.json()[0]), {'id', 'rfid_uid', 'name'})
+
+    def test_accept_header_selects_profile(self):
+        res = self.browser.post(
+            reverse('api-scan-id'), {'borrower_rfid': 'A1B2C3D4'}, format='json', HTTP_ACCEPT=COMPACT_MEDIA_TYPE,
+        )
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res['Content-Type'].startswith(COMPACT_MEDIA_TYPE))
+        self.assertEqual(res.json(), {'id': self.borrower.id, 'rfid_uid': 'A1B2C3D4', 'name': 'Ana'})
+
+    def test_scan_post_is_flat_and_smaller(self):
+        full = self.browser.post(reverse('api-rfid-scans'), {'uid': 'DEADBEEF', 'name': 'x'}, format='json')
+        small = self.device.post(reverse('api-rfid-scans'), {'uid': 'DEADBEEF', 'name': 'x'}, format='json')
+        self.assertEqual(small.json(), {'id': RFIDScan.objects.order_by('-id').first().id, 'uid': 'DEADBEEF'})
+        self.assertLess(len(small.content), len(full.content) / 2)
@@ -0,0 +1,122 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework.test import APIClient
+
+from core import entity_cache, search, versions
+from core.models import Borrower, BorrowTransaction, DeviceInstance, Item, TableVersion
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        entity_cache.clear()
+        search.warm()
+        self.client = APIClient()
+        self.borrower = Borrower.objects.create(name='Ana', rfid_uid='AABBCCDD')
+        self.item = Item.objects.create(name='Laptop', qr_code='ITEM-1')
+
+    def etag(self, url, **headers):
+        res = self.client.get(url, **headers)
+        self.assertEqual(res.status_code, 200)
+        return res['ETag']
+
+    def test_writes_bump_the_table_version(self):
+        versions_before = dict(TableVersion.objects.values_list('table', 'version'))
+        Item.objects.create(name='Tablet', qr_code='ITEM-2')
+        self.assertEqual(TableVersion.objects.get(table='core_item').version, versions_before['core_item'] + 1)
+
+    def test_unchanged_list_is_not_modified_with_one_query(self):
+        url = reverse('api-items')
+        etag = self.etag(url)
+        # The version lookup only; the item queryset is never evaluated
+        with self.assertNumQueries(1):
+            res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(res['ETag'], etag)
+        self.assertFalse(res.content)
+
+    def test_etag_changes_after_a_write(self):
+        url = reverse('api-items')
+        etag = self.etag(url)
+        self.item.name = 'Laptop 2'
+        self.item.save()
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertNotEqual(res['ETag'], etag)
+        self.assertEqual(res.data[0]['name'], 'Laptop 2')
+
+    def test_borrower_list_changes_with_loans(self):
+        url = reverse('api-borrowers')
+        etag = self.etag(url)
+        self.client.post(reverse('api-borrow'), {'borrower_rfid': 'AABBCCDD', 'item_qr': 'ITEM-1'}, format='json')
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data[0]['open_transactions_count'], 1)
+
+        # Returns close the loan with an UPDATE that sends no post_save
+        etag = res['ETag']
+        res = self.client.post(reverse('api-return'), {'item_qr': 'ITEM-1'}, format='json')
+        self.assertEqual(res.status_code, 200)
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data[0]['open_transactions_count'], 0)
+
+    def test_query_string_and_profile_are_part_of_the_etag(self):
+        url = reverse('api-borrowers')
+        full = self.etag(url)
+        self.assertNotEqual(self.etag(url + '?page=2'), full)
+        self.assertNotEqual(self.etag(url, HTTP_X_DEVICE_TOKEN='t'), full)
+
+    def test_searches_are_not_versioned(self):
+        with self.assertNumQueries(1):
+            res = self.client.get(reverse('api-borrowers') + '?q=AABBCCDD', HTTP_X_DEVICE_TOKEN='t')
+        self.assertNotIn('ETag', res)
+
+    def settle(self):
+        """Move the last writes out of the current second."""
+        TableVersion.objects.update(changed_at=timezone.now() - timedelta(seconds=5))
+
+    def test_if_modified_since(self):
+        url = reverse('api-items')
+        self.settle()
+        res = self.client.get(url)
+        self.assertIn('Last-Modified', res)
+        res = self.client.get(url, HTTP_IF_MODIFIED_SINCE=res['Last-Modified'])
+        self.assertEqual(res.status_code, 304)
+        earlier = http_date((timezone.now() - timedelta(hours=1)).timestamp())
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=earlier).status_code, 200)
+
+    def test_no_last_modified_within_the_second_of_a_write(self):
+        url = reverse('api-items')
+        self.settle()
+        since = self.client.get(url)['Last-Modified']
+        Item.objects.create(name='Tablet', qr_code='ITEM-2')
+        res = self.client.get(url)
+        self.assertNotIn('Last-Modified', res)
+        # A date from earlier in the same second must not hide the write
+        res = self.client.get(url, HTTP_IF_MODIFIED_SINCE=http_date(timezone.now().timestamp()))
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=since).status_code, 200)
+
+    def test_if_none_match_takes_precedence(self):
+        url = reverse('api-items')
+        self.settle()
+        res = self.client.get(url)
+        res = self.client.get(url, HTTP_IF_NONE_MATCH='W/"stale"', HTTP_IF_MODIFIED_SINCE=res['Last-Modified'])
+        self.assertEqual(res.status_code, 200)
+
+    def test_device_list_changes_on_heartbeat(self):
+        DeviceInstance.objects.create(ip='10.0.0.90', api_token='tok')
+        url = reverse('api-device-instances')
+        etag = self.etag(url)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.client.post(url, {'ip': '10.0.0.90', 'rssi': -60}, format='json')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_bump_creates_missing_rows(self):
+        TableVersion.objects.all().delete()
+        versions.bump('core_item', 'core_item')
+        self.assertEqual(TableVersion.objects.get(table='core_item').version, 2)
@@ -0,0 +1,65 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core import config_cache, crypto
+from core.models import DeviceConfig, DeviceInstance
+
+
+class DeviceConfigCacheTests(TestCase):
+    def setUp(self):
+        config_cache.invalidate()
+        crypto.clear_cache()
+        self.cfg = DeviceConfig.objects.create(id=1, ssid='net', api_host='http://10.0.0.2:8000')
+        self.cfg.set_password('secret')
+        self.cfg.save()
+        self.device = DeviceInstance.objects.create(ip='10.0.0.50', api_token='cfgtoken')
+        self.client = APIClient()
+
+    def test_version_increments_on_save(self):
+        v = DeviceConfig.objects.get(id=1).version
+        self.cfg.ssid = 'other'
+        self.cfg.save(update_fields=['ssid'])
+        self.assertEqual(DeviceConfig.objects.get(id=1).version, v + 1)
+
+    def test_cached_config_costs_no_queries(self):
+        config_cache.get_device_payload()
+        with self.assertNumQueries(0):
+            payload = config_cache.get_device_payload()
+            config_cache.get_config()
+        self.assertEqual(payload['password'], 'secret')
+
+    def test_etag_round_trip_returns_304(self):
+        url = reverse('api-device-config')
+        res = self.client.get(url)
+        self.assertEqual(res.status_code, 200)
+        etag = res['ETag']
+        with self.assertNumQueries(0):
+            res2 = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res2.status_code, 304)
+        self.assertEqual(res2.content, b'')
+
+    def test_device_304_skips_decrypt(self):
+        url = reverse('api-device-config')
+        res = self.client.get(url, HTTP_X_DEVICE_TOKEN='cfgtoken')
+        self.assertEqual(res.json()['password'], 'secret')
+        etag = res['ETag']
+        with mock.patch('core.crypto.decrypt_text') as dec:
+            res2 = self.client.get(url, HTTP_X_DEVICE_TOKEN='cfgtoken', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res2.status_code, 304)
+        dec.assert_not_called()
+
+    def test_admin_update_changes_etag(self):
+        url = reverse('api-device-config')
+        etag = self.client.get(url)['ETag']
+        User.objects.create_user('admin', password='x', is_staff=True)
+        self.client.login(username='admin', password='x')
+        res = self.client.post(url, {'ssid': 'changed'}, format='json')
+        self.assertEqual(res.status_code, 200)
+        res2 = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res2.status_code, 200)
+        self.assertEqual(res2.json()['ssid'], 'changed')
+        self.assertNotEqual(res2['ETag'], etag)
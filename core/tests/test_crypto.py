@@ -0,0 +1,81 @@
+from unittest import mock
+
+from cryptography.fernet import Fernet
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import crypto
+from core.models import DeviceConfig, DeviceInstance
+
+
+OLD_KEY = Fernet.generate_key().decode()
+NEW_KEY = Fernet.generate_key().decode()
+
+
+class _Resp:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *a):
+        return False
+
+    def read(self):
+        return b'{"status":"ok"}'
+
+    def getcode(self):
+        return 200
+
+
+class _Sock:
+    def close(self):
+        pass
+
+
+@override_settings(FERNET_KEYS=[NEW_KEY], FERNET_KEY=None)
+class CryptoKeyManagerTests(TestCase):
+    def setUp(self):
+        crypto.clear_cache()
+
+    def test_cipher_built_once(self):
+        crypto.encrypt_text('warmup')
+        with mock.patch('core.crypto.Fernet') as fernet_cls:
+            for _ in range(5):
+                crypto.decrypt_text(crypto.encrypt_text('secret'))
+        fernet_cls.assert_not_called()
+
+    def test_rotation_reads_old_key_and_rotates(self):
+        with override_settings(FERNET_KEYS=[OLD_KEY]):
+            old_token = crypto.encrypt_text('secret')
+        with override_settings(FERNET_KEYS=[NEW_KEY, OLD_KEY]):
+            self.assertEqual(crypto.decrypt_text(old_token), 'secret')
+            rotated = crypto.rotate_text(old_token)
+        self.assertNotEqual(rotated, old_token)
+        # Rotated token is readable with only the new key
+        self.assertEqual(crypto.decrypt_text(rotated), 'secret')
+
+    def test_saving_config_invalidates_cached_password(self):
+        cfg = DeviceConfig.objects.create(id=1)
+        cfg.set_password('first')
+        cfg.save()
+        self.assertEqual(cfg.get_password(), 'first')
+        cfg.set_password('second')
+        cfg.save()
+        self.assertEqual(DeviceConfig.objects.get(id=1).get_password(), 'second')
+
+    def test_push_all_decrypts_once(self):
+        cfg = DeviceConfig.objects.create(id=1, ssid='net')
+        cfg.set_password('secret')
+        cfg.save()
+        for i in range(20):
+            DeviceInstance.objects.create(ip=f'10.1.0.{i + 1}')
+        User.objects.create_user('admin', password='x', is_staff=True)
+        self.client.login(username='admin', password='x')
+
+        with mock.patch('socket.create_connection', return_value=_Sock()), \
+                mock.patch('urllib.request.urlopen', return_value=_Resp()), \
+                mock.patch('core.crypto.decrypt_text', wraps=crypto.decrypt_text) as dec:
+            res = self.client.post(reverse('api-device-config-push-all'), content_type='application/json')
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(all(r['ok'] for r in res.json()['results']))
+        self.assertEqual(dec.call_count, 1)
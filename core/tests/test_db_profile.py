@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase
+
+
+class SQLiteProfileTests(TestCase):
+    def test_pragmas_applied_on_connect(self):
+        if connection.vendor != 'sqlite' or not settings.SQLITE_PRAGMAS:
+            self.skipTest('SQLite tuning disabled')
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+            cursor.execute('PRAGMA temp_store')
+            self.assertEqual(cursor.fetchone()[0], 2)  # MEMORY
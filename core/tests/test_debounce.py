@@ -0,0 +1,88 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core import debounce, metrics
+from core.models import Borrower, DeviceInstance, RFIDScan
+
+
+class ScanDebounceTests(TestCase):
+    def setUp(self):
+        debounce.clear()
+        metrics.reset()
+        DeviceInstance.objects.create(ip='10.0.0.90', api_token='reader-a')
+        DeviceInstance.objects.create(ip='10.0.0.91', api_token='reader-b')
+        Borrower.objects.create(name='Ana', rfid_uid='AABBCCDD')
+        self.reader = APIClient(HTTP_X_DEVICE_TOKEN='reader-a')
+
+    @override_settings(REQUEST_METRICS=True)
+    def test_held_card_is_answered_without_queries(self):
+        url = reverse('api-scan-id')
+        first = self.reader.post(url, {'borrower_rfid': 'AABBCCDD'}, format='json')
+        self.assertEqual(first.status_code, 200)
+        with self.assertNumQueries(0):
+            repeat = self.reader.post(url, {'borrower_rfid': 'AABBCCDD'}, format='json')
+        self.assertEqual(repeat.status_code, 200)
+        self.assertEqual(repeat.json(), first.json())
+        self.assertEqual(repeat['X-Debounced'], 'true')
+        self.assertEqual(RFIDScan.objects.count(), 1)
+        self.assertIn('rfid_scan_debounced_total{view="ScanIdView"} 1', metrics.render())
+
+    def test_other_card_or_reader_is_not_debounced(self):
+        url = reverse('api-rfid-scans')
+        self.reader.post(url, {'uid': 'AABBCCDD'}, format='json')
+        self.reader.post(url, {'uid': '11223344'}, format='json')
+        APIClient(HTTP_X_DEVICE_TOKEN='reader-b').post(url, {'uid': 'AABBCCDD'}, format='json')
+        self.assertEqual(RFIDScan.objects.count(), 3)
+
+    def test_repeats_are_matched_on_the_card_not_the_whole_body(self):
+        url = reverse('api-rfid-scans')
+        self.reader.post(url, {'uid': 'AABBCCDD', 'name': 'Ana'}, format='json')
+        res = self.reader.post(url, {'uid': 'AABBCCDD ', 'email': 'ana@example.com'}, format='json')
+        self.assertEqual(res['X-Debounced'], 'true')
+        self.assertEqual(RFIDScan.objects.count(), 1)
+
+    def test_forget_drops_only_that_device(self):
+        url = reverse('api-rfid-scans')
+        reader_b = APIClient(HTTP_X_DEVICE_TOKEN='reader-b')
+        self.reader.post(url, {'uid': 'AABBCCDD'}, format='json')
+        reader_b.post(url, {'uid': 'AABBCCDD'}, format='json')
+        debounce.forget('reader-a')
+        self.assertNotIn('X-Debounced', self.reader.post(url, {'uid': 'AABBCCDD'}, format='json'))
+        self.assertEqual(reader_b.post(url, {'uid': 'AABBCCDD'}, format='json')['X-Debounced'], 'true')
+
+    def test_stacks_with_idempotency_keys(self):
+        # Both decorators read the body; neither may break the other
+        for name, body in (
+            ('api-scan-id', {'borrower_rfid': 'AABBCCDD'}),
+            ('api-rfid-scans', {'uid': 'AABBCCDD'}),
+            ('api-kiosk-tap', {'uid': 'AABBCCDD'}),
+        ):
+            with self.subTest(name=name):
+                first = self.reader.post(reverse(name), body, format='json', HTTP_IDEMPOTENCY_KEY=f'{name}-1')
+                self.assertLess(first.status_code, 300)
+                repeat = self.reader.post(reverse(name), body, format='json', HTTP_IDEMPOTENCY_KEY=f'{name}-1')
+                self.assertEqual(repeat.status_code, first.status_code)
+                debounce.clear()
+                retry = self.reader.post(reverse(name), body, format='json', HTTP_IDEMPOTENCY_KEY=f'{name}-1')
+                self.assertEqual(retry['Idempotent-Replayed'], 'true')
+
+    def test_unregistered_card_is_debounced(self):
+        url = reverse('api-scan-id')
+        self.assertEqual(self.reader.post(url, {'borrower_rfid': '99999999'}, format='json').status_code, 404)
+        res = self.reader.post(url, {'borrower_rfid': '99999999'}, format='json')
+        self.assertEqual(res.status_code, 404)
+        self.assertEqual(res['X-Debounced'], 'true')
+
+    def test_requests_without_token_are_not_debounced(self):
+        url = reverse('api-rfid-scans')
+        for _ in range(2):
+            APIClient().post(url, {'uid': 'AABBCCDD'}, format='json')
+        self.assertEqual(RFIDScan.objects.count(), 2)
+
+    @override_settings(SCAN_DEBOUNCE_SECONDS=0)
+    def test_window_can_be_disabled(self):
+        url = reverse('api-rfid-scans')
+        for _ in range(2):
+            self.reader.post(url, {'uid': 'AABBCCDD'}, format='json')
+        self.assertEqual(RFIDScan.objects.count(), 2)
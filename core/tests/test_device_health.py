@@ -0,0 +1,146 @@
+import socket
+import urllib.error
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core import health
+from core.models import DeviceInstance
+from core.views import push_command_to_target, push_config_to_target
+
+
+class DummyResp:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def read(self):
+        return b'{"status":"ok"}'
+
+    def getcode(self):
+        return 200
+
+
+@override_settings(DEVICE_CIRCUIT_FAILURES=2, DEVICE_CIRCUIT_COOLDOWN=900)
+class CircuitBreakerTests(TestCase):
+    def setUp(self):
+        self.device = DeviceInstance.objects.create(ip='10.0.0.60')
+
+    @mock.patch('socket.create_connection', side_effect=socket.timeout('offline'))
+    def test_circuit_opens_and_fast_fails(self, mock_conn):
+        for _ in range(2):
+            ok, _, code = push_config_to_target('10.0.0.60', retries=0)
+            self.assertEqual(code, 502)
+        self.device.refresh_from_db()
+        self.assertEqual(self.device.circuit_state, DeviceInstance.Circuit.OPEN)
+        self.assertEqual(self.device.consecutive_failures, 2)
+        self.assertLess(self.device.health_score, 0.5)
+
+        mock_conn.reset_mock()
+        ok, detail, code = push_config_to_target('10.0.0.60')
+        self.assertFalse(ok)
+        self.assertEqual(code, 503)
+        self.assertIn('Circuit open', detail)
+        mock_conn.assert_not_called()
+
+    @mock.patch('socket.create_connection')
+    @mock.patch('urllib.request.urlopen')
+    def test_heartbeat_half_opens_and_success_closes(self, mock_urlopen, mock_conn):
+        DeviceInstance.objects.filter(pk=self.device.pk).update(
+            circuit_state=DeviceInstance.Circuit.OPEN, circuit_opened_at=timezone.now(), consecutive_failures=5,
+        )
+        res = APIClient().post(reverse('api-device-instances'), {'ip': '10.0.0.60', 'server_reachable': True}, format='json')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data['circuit_state'], DeviceInstance.Circuit.HALF_OPEN)
+
+        mock_urlopen.return_value = DummyResp()
+        ok, _, _ = push_config_to_target('10.0.0.60')
+        self.assertTrue(ok)
+        self.device.refresh_from_db()
+        self.assertEqual(self.device.circuit_state, DeviceInstance.Circuit.CLOSED)
+        self.assertEqual(self.device.consecutive_failures, 0)
+
+    @mock.patch('socket.create_connection', side_effect=ConnectionRefusedError())
+    def test_failed_half_open_trial_reopens(self, mock_conn):
+        DeviceInstance.objects.filter(pk=self.device.pk).update(circuit_state=DeviceInstance.Circuit.HALF_OPEN)
+        push_config_to_target('10.0.0.60', retries=0)
+        self.device.refresh_from_db()
+        self.assertEqual(self.device.circuit_state, DeviceInstance.Circuit.OPEN)
+
+    def test_cooldown_allows_trial_without_heartbeat(self):
+        now = timezone.now()
+        self.device.circuit_state = DeviceInstance.Circuit.OPEN
+        self.device.circuit_opened_at = now - timedelta(seconds=60)
+        self.assertFalse(health.allows_call(self.device, now))
+        self.assertTrue(health.allows_call(self.device, now + timedelta(seconds=900)))
+
+    @mock.patch('urllib.request.urlopen')
+    def test_http_error_counts_as_reachable(self, mock_urlopen):
+        mock_urlopen.side_effect = urllib.error.HTTPError('http://10.0.0.60/control', 400, 'Bad Request', {}, None)
+        for _ in range(3):
+            push_command_to_target('10.0.0.60', 'bogus')
+        self.device.refresh_from_db()
+        self.assertEqual(self.device.circuit_state, DeviceInstance.Circuit.CLOSED)
+
+    def test_healthy_heartbeat_costs_no_extra_write(self):
+        client = APIClient()
+        url = reverse('api-device-instances')
+        client.post(url, {'ip': '10.0.0.60', 'server_reachable': True}, format='json')
+        # update_or_create (3) and the device table's version bump
+        with self.assertNumQueries(5):
+            client.post(url, {'ip': '10.0.0.60', 'server_reachable': True}, format='json')
+
+    def test_score_decays_with_heartbeat_silence(self):
+        now = timezone.now()
+        self.device.last_seen = now - timedelta(seconds=601)
+        self.assertEqual(health.score(self.device, now), 0.25)
+
+
+class PushAllCircuitTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user('admin', password='x', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.up = DeviceInstance.objects.create(ip='10.0.0.61')
+        self.down = DeviceInstance.objects.create(
+            ip='10.0.0.62', circuit_state=DeviceInstance.Circuit.OPEN, circuit_opened_at=timezone.now(),
+        )
+
+    @mock.patch('socket.create_connection')
+    @mock.patch('urllib.request.urlopen')
+    def test_push_all_skips_open_circuits(self, mock_urlopen, mock_conn):
+        mock_urlopen.return_value = DummyResp()
+        res = self.client.post(reverse('api-device-config-push-all'), {}, format='json')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data['circuit_open'], [self.down.id])
+        self.assertEqual([r['ip'] for r in res.data['results']], ['10.0.0.61'])
+
+        res = self.client.post(reverse('api-device-config-push-all'), {'force': True}, format='json')
+        self.assertEqual(res.data['circuit_open'], [])
+        self.assertEqual(len(res.data['results']), 2)
+
+    @mock.patch('socket.create_connection')
+    @mock.patch('urllib.request.urlopen')
+    def test_single_device_actions_bypass_open_circuit(self, mock_urlopen, mock_conn):
+        mock_urlopen.return_value = DummyResp()
+        res = self.client.post(reverse('api-device-instance-push-config'), {'device_id': self.down.id}, format='json')
+        self.assertEqual(res.status_code, 200)
+        self.down.refresh_from_db()
+        self.assertEqual(self.down.circuit_state, DeviceInstance.Circuit.CLOSED)
+
+        DeviceInstance.objects.filter(pk=self.down.pk).update(
+            circuit_state=DeviceInstance.Circuit.OPEN, circuit_opened_at=timezone.now(),
+        )
+        res = self.client.post(reverse('api-device-instance-provision', args=[self.down.id]), {}, format='json')
+        self.assertEqual(res.status_code, 200)
+        res = self.client.post(
+            reverse('api-device-instance-control'), {'device_id': self.down.id, 'action': 'reboot'}, format='json',
+        )
+        self.assertEqual(res.status_code, 200)
@@ -178,3 +178,65 @@ class DevicePushClaimTests(TestCase):
         self.client.login(username='user', password='pass')
         res2 = self.client.get(url)
         self.assertEqual(res2.status_code, 200)
+
+
+class ConfigVersionTrackingTests(TestCase):
+    def setUp(self):
+        from core import config_cache
+        config_cache.invalidate()
+        self.client = Client()
+        self.admin = User.objects.create_superuser(username='admin', password='pass')
+        self.config = DeviceConfig.objects.create(id=1, api_host='http://example:8000', ssid='XX')
+        self.fresh = DeviceInstance.objects.create(ip='10.0.1.1', config_version=self.config.version)
+        self.stale = DeviceInstance.objects.create(ip='10.0.1.2', config_version=self.config.version - 1)
+        self.unknown = DeviceInstance.objects.create(ip='10.0.1.3')
+
+    def test_heartbeat_reports_config_version(self):
+        url = reverse('api-device-instances')
+        res = self.client.post(url, json.dumps({'ip': '10.0.1.3', 'config_version': self.config.version}), content_type='application/json')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()['config_version'], self.config.version)
+        # Heartbeats from firmware that does not report a version keep the pushed value
+        self.client.post(url, json.dumps({'ip': '10.0.1.3'}), content_type='application/json')
+        self.unknown.refresh_from_db()
+        self.assertEqual(self.unknown.config_version, self.config.version)
+
+    @mock.patch('core.views.push_config_to_target')
+    def test_push_all_stale_only(self, mock_push):
+        mock_push.return_value = (True, {'code': 200, 'body': '{}'}, 200)
+        self.client.login(username='admin', password='pass')
+        res = self.client.post(reverse('api-device-config-push-all'), json.dumps({'stale_only': True}), content_type='application/json')
+        self.assertEqual(res.status_code, 200)
+        pushed = {r['ip'] for r in res.json()['results']}
+        self.assertEqual(pushed, {'10.0.1.2', '10.0.1.3'})
+        self.assertEqual(res.json()['skipped'], 1)
+
+    @mock.patch('core.views.push_config_to_target')
+    def test_push_all_parses_boolean_strings(self, mock_push):
+        mock_push.return_value = (True, {'code': 200, 'body': '{}'}, 200)
+        self.client.login(username='admin', password='pass')
+        url = reverse('api-device-config-push-all')
+        res = self.client.post(url, json.dumps({'stale_only': 'false'}), content_type='application/json')
+        self.assertEqual(res.json()['skipped'], 0)
+        self.assertEqual(len(res.json()['results']), DeviceInstance.objects.count())
+        res = self.client.post(url, {'stale_only': 'true'})
+        self.assertEqual(res.json()['skipped'], 1)
+        res = self.client.post(url, json.dumps({'force': 'maybe'}), content_type='application/json')
+        self.assertEqual(res.status_code, 400)
+
+    @mock.patch('socket.create_connection')
+    @mock.patch('urllib.request.urlopen')
+    def test_successful_push_records_version(self, mock_urlopen, mock_conn):
+        class DummyResp:
+            def read(self): return b'{"status":"ok"}'
+            def getcode(self): return 200
+            def __enter__(self): return self
+            def __exit__(self, exc_type, exc, tb): return False
+        mock_urlopen.return_value = DummyResp()
+        self.client.login(username='admin', password='pass')
+        res = self.client.post(reverse('api-device-instance-push-config'), json.dumps({'device_id': self.stale.id}), content_type='application/json')
+        self.assertEqual(res.status_code, 200)
+        self.stale.refresh_from_db()
+        self.assertEqual(self.stale.config_version, self.config.version)
+        body = json.loads(mock_urlopen.call_args_list[-1][0][0].data)
+        self.assertEqual(body['config_version'], self.config.version)
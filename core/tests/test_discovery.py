@@ -0,0 +1,88 @@
+import json
+import socket
+import threading
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core import discovery
+from core.models import DeviceInstance
+from core.views import ScanDevicesView
+
+
+def announcement(**fields):
+    return json.dumps({'type': 'rfid-reader', **fields}).encode('utf-8')
+
+
+class AnnouncementTests(TestCase):
+    def test_parse_announcement(self):
+        self.assertEqual(
+            discovery.parse_announcement(announcement(firmware='1.4.0', pairing_code='A1B2', extra='x')),
+            {'firmware': '1.4.0'},
+        )
+        # What the firmware's serializeJson produces for an SSID with quotes and backslashes
+        self.assertEqual(
+            discovery.parse_announcement(json.dumps({'type': 'rfid-reader', 'ssid': 'Lab "5G" \\ B'}).encode()),
+            {'ssid': 'Lab "5G" \\ B'},
+        )
+        self.assertIsNone(discovery.parse_announcement(b'not json'))
+        self.assertIsNone(discovery.parse_announcement(json.dumps({'type': 'printer'}).encode()))
+        self.assertIsNone(discovery.parse_announcement(announcement(ssid='x' * 2000)))
+
+    def test_handle_records_the_sender(self):
+        listener = discovery.Listener(port=0)
+        self.assertTrue(listener.handle(announcement(firmware='1.4.0', ssid='lab'), '10.0.0.70'))
+        device = DeviceInstance.objects.get(ip='10.0.0.70')
+        self.assertEqual((device.firmware, device.ssid), ('1.4.0', 'lab'))
+        self.assertIsNotNone(device.announced_at)
+
+    def test_unchanged_announcements_are_throttled(self):
+        listener = discovery.Listener(port=0)
+        self.assertTrue(listener.handle(announcement(firmware='1.4.0'), '10.0.0.70'))
+        with self.assertNumQueries(0):
+            self.assertFalse(listener.handle(announcement(firmware='1.4.0'), '10.0.0.70'))
+        # A firmware update is written straight away
+        self.assertTrue(listener.handle(announcement(firmware='1.5.0'), '10.0.0.70'))
+        self.assertEqual(DeviceInstance.objects.get(ip='10.0.0.70').firmware, '1.5.0')
+
+    def test_scan_prefers_announced_devices(self):
+        discovery.ingest('10.0.0.70', {'firmware': '1.4.0'})
+        discovery.ingest('10.0.0.71', {}, now=timezone.now() - timedelta(hours=1))
+        with patch.object(ScanDevicesView, 'probe') as probe:
+            res = APIClient().get(reverse('api-device-instances-scan'))
+        probe.assert_not_called()
+        self.assertEqual(res.data['source'], 'announcements')
+        self.assertEqual([d['ip'] for d in res.data['devices']], ['10.0.0.70'])
+        self.assertEqual(res.data['devices'][0]['firmware'], '1.4.0')
+
+    @patch.object(ScanDevicesView, 'get_local_ip', return_value='192.168.1.100')
+    @patch.object(ScanDevicesView, 'probe', side_effect=lambda ip: {'ip': ip, 'ok': ip.endswith('.42')})
+    def test_sweep_on_request(self, probe, get_local_ip):
+        discovery.ingest('10.0.0.70', {'firmware': '1.4.0'})
+        res = APIClient().get(reverse('api-device-instances-scan'), {'sweep': '1'})
+        self.assertEqual(res.data['source'], 'sweep')
+        self.assertEqual([d['ip'] for d in res.data['devices']], ['192.168.1.42'])
+
+
+@override_settings(DEVICE_DISCOVERY_MIN_INTERVAL=0)
+class ListenerSocketTests(TransactionTestCase):
+    def test_announcement_over_udp(self):
+        listener = discovery.Listener('127.0.0.1', 0)
+        listener.bind()
+        thread = threading.Thread(target=listener.serve_forever, daemon=True)
+        thread.start()
+        try:
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sender:
+                sender.sendto(announcement(firmware='2.0.0'), ('127.0.0.1', listener.port))
+            deadline = time.monotonic() + 5
+            while time.monotonic() < deadline and not DeviceInstance.objects.filter(ip='127.0.0.1').exists():
+                time.sleep(0.05)
+        finally:
+            listener.stop()
+            thread.join(timeout=5)
+        self.assertEqual(DeviceInstance.objects.get(ip='127.0.0.1').firmware, '2.0.0')
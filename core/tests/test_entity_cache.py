@@ -0,0 +1,89 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core import entity_cache, metrics
+from core.models import Borrower, BorrowTransaction, Item
+
+
+class EntityCacheTests(TestCase):
+    def setUp(self):
+        entity_cache.clear()
+        metrics.reset()
+        self.borrower = Borrower.objects.create(name='Ana', rfid_uid='AABBCCDD', email='ana@example.com')
+        self.item = Item.objects.create(name='Laptop', qr_code='ITEM-0001')
+
+    def warm(self, call):
+        # Entries are stored when the reading transaction commits
+        with self.captureOnCommitCallbacks(execute=True):
+            return call()
+
+    @override_settings(REQUEST_METRICS=True)
+    def test_hit_costs_no_queries(self):
+        self.warm(lambda: entity_cache.borrower_by_uid('AABBCCDD'))
+        with self.assertNumQueries(0):
+            borrower = entity_cache.borrower_by_uid(' AABBCCDD ')
+        self.assertEqual(borrower.pk, self.borrower.pk)
+        self.assertEqual(borrower.email, 'ana@example.com')
+        self.assertFalse(borrower._state.adding)
+        rendered = metrics.render()
+        self.assertIn('rfid_entity_cache_lookups_total{entity="borrower",result="hit"} 1', rendered)
+        self.assertIn('rfid_entity_cache_lookups_total{entity="borrower",result="miss"} 1', rendered)
+
+    def test_uncommitted_reads_are_not_cached(self):
+        entity_cache.item_by_qr('ITEM-0001')
+        with self.assertNumQueries(1):
+            entity_cache.item_by_qr('ITEM-0001')
+
+    def test_save_and_delete_invalidate(self):
+        self.warm(lambda: entity_cache.item_by_qr('ITEM-0001'))
+        self.item.name = 'Laptop 2'
+        self.item.save()
+        self.assertEqual(self.warm(lambda: entity_cache.item_by_qr('ITEM-0001')).name, 'Laptop 2')
+
+        self.item.qr_code = 'ITEM-0002'
+        self.item.save()
+        with self.assertRaises(Item.DoesNotExist):
+            entity_cache.item_by_qr('ITEM-0001')
+
+        self.warm(lambda: entity_cache.borrower_by_uid('AABBCCDD'))
+        self.borrower.delete()
+        with self.assertRaises(Borrower.DoesNotExist):
+            entity_cache.borrower_by_uid('AABBCCDD')
+
+    def test_unknown_code_is_cached_until_registered(self):
+        with self.assertRaises(Borrower.DoesNotExist):
+            self.warm(lambda: entity_cache.borrower_by_uid('11223344'))
+        with self.assertNumQueries(0), self.assertRaises(Borrower.DoesNotExist):
+            entity_cache.borrower_by_uid('11223344')
+        Borrower.objects.create(name='Ben', rfid_uid='11223344')
+        self.assertEqual(entity_cache.borrower_by_uid('11223344').name, 'Ben')
+
+    def test_iexact_lookups_are_cached_separately(self):
+        self.warm(lambda: entity_cache.item_by_qr('item-0001', iexact=True))
+        with self.assertNumQueries(0):
+            self.assertEqual(entity_cache.item_by_qr('Item-0001', iexact=True).pk, self.item.pk)
+        with self.assertRaises(Item.DoesNotExist):
+            entity_cache.item_by_qr('item-0001')
+
+    @override_settings(ENTITY_CACHE_SIZE=1)
+    def test_least_recently_used_entry_is_evicted(self):
+        self.warm(lambda: entity_cache.borrower_by_uid('AABBCCDD'))
+        self.warm(lambda: entity_cache.item_by_qr('ITEM-0001'))
+        with self.assertNumQueries(1):
+            entity_cache.borrower_by_uid('AABBCCDD')
+
+    def test_borrow_skips_resolution_queries_when_warm(self):
+        client = APIClient()
+        url = reverse('api-borrow')
+        other = Item.objects.create(name='Tablet', qr_code='ITEM-0003')
+        with self.captureOnCommitCallbacks(execute=True):
+            res = client.post(url, {'borrower_rfid': 'AABBCCDD', 'item_qr': 'ITEM-0001'}, format='json')
+        self.assertEqual(res.status_code, 201)
+        self.warm(lambda: entity_cache.item_by_qr('ITEM-0003'))
+        # Open-loan check, insert and version bump (in a savepoint) and the serializer's open-loan count
+        with self.assertNumQueries(6):
+            res = client.post(url, {'borrower_rfid': 'AABBCCDD', 'item_qr': 'ITEM-0003'}, format='json')
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(res.data['item']['id'], other.pk)
+        self.assertEqual(BorrowTransaction.objects.filter(borrower=self.borrower).count(), 2)
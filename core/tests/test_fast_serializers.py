@@ -0,0 +1,122 @@
+import json
+import os
+import time
+from datetime import datetime, timezone as dt_timezone
+from unittest import skipUnless
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+from core.fast_serializers import ValuesSerializer, borrower_list, item_list
+from core.models import Borrower, BorrowTransaction, Item
+from core.serializers import BorrowerSerializer, BorrowTransactionSerializer, ItemSerializer
+
+
+def rendered(data) -> bytes:
+    return JSONRenderer().render(data)
+
+
+class FastSerializerEquivalenceTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.borrowers = [
+            Borrower.objects.create(name=f'Borrower {i}', rfid_uid=f'UID{i:04d}', email='' if i % 3 else f'b{i}@example.com')
+            for i in range(12)
+        ]
+        cls.items = [
+            Item.objects.create(name=f'Item {i}', qr_code=f'QR-{i:04d}', description='' if i % 2 else 'Desc', is_active=i % 4 != 0)
+            for i in range(12)
+        ]
+        for i in range(8):
+            tx = BorrowTransaction.objects.create(borrower=cls.borrowers[i % 3], item=cls.items[i])
+            if i % 2:
+                tx.status = BorrowTransaction.Status.RETURNED
+                tx.save()
+
+    def assertSameOutput(self, fast, slow):
+        self.assertEqual(rendered(fast), rendered(slow))
+        self.assertEqual([list(row) for row in fast], [list(row) for row in slow])
+
+    def test_borrowers_match_model_serializer(self):
+        for queryset in (Borrower.objects.all(), Borrower.objects.filter(name__icontains='1'), Borrower.objects.none()):
+            self.assertSameOutput(borrower_list.data(queryset), BorrowerSerializer(queryset, many=True).data)
+
+    def test_items_match_model_serializer(self):
+        for queryset in (Item.objects.all(), Item.objects.filter(is_active=False), Item.objects.order_by('-name')):
+            self.assertSameOutput(item_list.data(queryset), ItemSerializer(queryset, many=True).data)
+
+    def test_list_endpoints_use_same_representation(self):
+        res = self.client.get(reverse('api-borrowers'))
+        self.assertEqual(json.loads(res.content), json.loads(rendered(BorrowerSerializer(Borrower.objects.all(), many=True).data)))
+        res = self.client.get(reverse('api-items'), {'q': 'Item 1'})
+        queryset = Item.objects.filter(name__icontains='Item 1')
+        self.assertEqual(json.loads(res.content), json.loads(rendered(ItemSerializer(queryset, many=True).data)))
+
+    def test_datetimes_without_microseconds_and_in_other_timezones(self):
+        Item.objects.filter(pk=self.items[0].pk).update(created_at=datetime(2026, 1, 2, 3, 4, 5, tzinfo=dt_timezone.utc))
+        queryset = Item.objects.order_by('pk')
+        self.assertSameOutput(item_list.data(queryset), ItemSerializer(queryset, many=True).data)
+        self.assertEqual(item_list.data(queryset)[0]['created_at'], '2026-01-02T03:04:05Z')
+        with override_settings(TIME_ZONE='Asia/Manila'):
+            self.assertSameOutput(item_list.data(queryset), ItemSerializer(queryset, many=True).data)
+
+    def test_borrower_list_is_one_query(self):
+        with self.assertNumQueries(1):
+            borrower_list.data(Borrower.objects.all())
+
+    def test_annotation_order_is_preserved(self):
+        class Reordered(serializers.ModelSerializer):
+            tag = serializers.SerializerMethodField()
+
+            class Meta:
+                model = Item
+                fields = ['tag', 'id', 'created_at']
+
+        from django.db.models import Value, CharField
+        fast = ValuesSerializer(Reordered, annotations={'tag': Value('x', output_field=CharField())})
+        self.assertEqual(list(fast.data(Item.objects.all())[0]), ['tag', 'id', 'created_at'])
+
+    def test_nested_fields_need_annotations(self):
+        with self.assertRaises(ImproperlyConfigured):
+            ValuesSerializer(BorrowTransactionSerializer)
+
+
+@skipUnless(os.environ.get('RFID_BENCHMARK') == '1', 'set RFID_BENCHMARK=1 to time list serialization')
+class FastSerializerSpeedTests(TestCase):
+    """10k-row lists against ModelSerializer: both must be at least 5x faster.
+
+    Borrowers also drop a query per row; items rely on skipping the per-row instance,
+    field walk and (on SQLite) datetime parse/format round trip.
+    """
+
+    N = 10000
+
+    @classmethod
+    def setUpTestData(cls):
+        Borrower.objects.bulk_create(
+            Borrower(name=f'Borrower {i:05d}', rfid_uid=f'S{i:07d}', email=f'b{i}@example.com') for i in range(cls.N)
+        )
+        Item.objects.bulk_create(Item(name=f'Item {i:05d}', qr_code=f'QR-S{i:07d}') for i in range(cls.N))
+
+    def best_of(self, call, rounds=5):
+        timings = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            call()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    def assertFaster(self, fast_serializer, serializer_class, queryset, min_speedup):
+        slow = self.best_of(lambda: serializer_class(queryset.all(), many=True).data)
+        fast = self.best_of(lambda: fast_serializer.data(queryset.all()))
+        print(f'\n{serializer_class.__name__}: {slow * 1000:.1f} ms -> {fast * 1000:.1f} ms ({slow / fast:.1f}x)')
+        self.assertGreaterEqual(slow / fast, min_speedup)
+
+    def test_borrower_list(self):
+        self.assertFaster(borrower_list, BorrowerSerializer, Borrower.objects.all(), 5)
+
+    def test_item_list(self):
+        self.assertFaster(item_list, ItemSerializer, Item.objects.all(), 5)
@@ -0,0 +1,109 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core import idempotency
+from core.models import Borrower, BorrowTransaction, IdempotencyKey, Item, RFIDScan
+
+
+class IdempotencyKeyTests(TestCase):
+    def setUp(self):
+        self.borrower = Borrower.objects.create(name='Ana', rfid_uid='A1B2C3D4')
+        self.item = Item.objects.create(name='Projector', qr_code='ITEM-IDEMP')
+        self.client = APIClient()
+        self.body = {'borrower_rfid': 'A1B2C3D4', 'item_qr': 'ITEM-IDEMP'}
+
+    def post(self, name, body, key):
+        return self.client.post(reverse(name), body, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retried_borrow_replays_original_response(self):
+        first = self.post('api-borrow', self.body, 'k-1')
+        self.assertEqual(first.status_code, 201)
+        retry = self.post('api-borrow', self.body, 'k-1')
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(BorrowTransaction.objects.count(), 1)
+        # Without the key the duplicate is still rejected
+        self.assertEqual(self.client.post(reverse('api-borrow'), self.body, format='json').status_code, 409)
+
+    def test_replay_costs_one_query(self):
+        self.post('api-scan-id', {'borrower_rfid': 'A1B2C3D4'}, 'scan-7')
+        with self.assertNumQueries(1):
+            res = self.post('api-scan-id', {'borrower_rfid': 'A1B2C3D4'}, 'scan-7')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(RFIDScan.objects.count(), 1)
+
+    def test_rfid_scan_retry_does_not_duplicate(self):
+        for _ in range(3):
+            self.post('api-rfid-scans', {'uid': 'DEADBEEF'}, 'raw-1')
+        self.assertEqual(RFIDScan.objects.filter(uid='DEADBEEF').count(), 1)
+
+    def test_return_retry_replays(self):
+        BorrowTransaction.objects.create(borrower=self.borrower, item=self.item)
+        self.assertEqual(self.post('api-return', {'item_qr': 'ITEM-IDEMP'}, 'r-1').status_code, 200)
+        self.assertEqual(self.post('api-return', {'item_qr': 'ITEM-IDEMP'}, 'r-1').status_code, 200)
+
+    def test_key_reused_with_different_body(self):
+        self.post('api-rfid-scans', {'uid': 'AAAA0001'}, 'dup')
+        res = self.post('api-rfid-scans', {'uid': 'AAAA0002'}, 'dup')
+        self.assertEqual(res.status_code, 422)
+        # Formatting and key order are not part of the request
+        url = reverse('api-rfid-scans')
+        res = self.client.post(url, b'{"name": "Ana",  "uid": "AAAA0003"}', content_type='application/json',
+                               HTTP_IDEMPOTENCY_KEY='fmt')
+        self.assertEqual(res.status_code, 201)
+        res = self.client.post(url, b'{"uid":"AAAA0003","name":"Ana"}', content_type='application/json',
+                               HTTP_IDEMPOTENCY_KEY='fmt')
+        self.assertEqual(res['Idempotent-Replayed'], 'true')
+        res = self.client.post(url, b'{"uid":"AAAA0003","name":"Ben"}', content_type='application/json',
+                               HTTP_IDEMPOTENCY_KEY='fmt')
+        self.assertEqual(res.status_code, 422)
+
+    def test_keys_are_scoped_per_endpoint_and_caller(self):
+        self.post('api-rfid-scans', {'uid': 'AAAA0001'}, 'same')
+        self.assertEqual(self.post('api-scan-id', {'borrower_rfid': 'A1B2C3D4'}, 'same').status_code, 200)
+        other = APIClient(REMOTE_ADDR='10.1.1.1')
+        res = other.post(reverse('api-rfid-scans'), {'uid': 'AAAA0009'}, format='json', HTTP_IDEMPOTENCY_KEY='same')
+        self.assertEqual(res.status_code, 201)
+
+    def test_in_flight_repeat_gets_conflict(self):
+        body = b'{"uid":"AAAA0001"}'
+        IdempotencyKey.objects.create(
+            scope='RFIDScanView:ip:127.0.0.1', key='busy', fingerprint=idempotency._fingerprint({'uid': 'AAAA0001'}),
+        )
+        res = self.client.post(reverse('api-rfid-scans'), body, content_type='application/json', HTTP_IDEMPOTENCY_KEY='busy')
+        self.assertEqual(res.status_code, 409)
+        self.assertFalse(RFIDScan.objects.exists())
+
+    def test_abandoned_claim_is_reclaimed(self):
+        body = b'{"uid":"AAAA0001"}'
+        IdempotencyKey.objects.create(
+            scope='RFIDScanView:ip:127.0.0.1', key='crashed', fingerprint=idempotency._fingerprint({'uid': 'AAAA0001'}),
+        )
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(minutes=5))
+        res = self.client.post(reverse('api-rfid-scans'), body, content_type='application/json', HTTP_IDEMPOTENCY_KEY='crashed')
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(IdempotencyKey.objects.get(key='crashed').status_code, 201)
+
+    def test_validation_errors_are_not_stored(self):
+        self.assertEqual(self.post('api-borrow', {}, 'bad').status_code, 400)
+        self.assertFalse(IdempotencyKey.objects.filter(key='bad').exists())
+
+    def test_expired_keys_are_replaced(self):
+        self.post('api-rfid-scans', {'uid': 'AAAA0001'}, 'old')
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(days=2))
+        self.post('api-rfid-scans', {'uid': 'AAAA0001'}, 'old')
+        self.assertEqual(RFIDScan.objects.filter(uid='AAAA0001').count(), 2)
+        self.assertEqual(IdempotencyKey.objects.count(), 1)
+
+    def test_expired_keys_are_purged_periodically(self):
+        self.post('api-rfid-scans', {'uid': 'AAAA0001'}, 'old')
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(days=2))
+        with mock.patch.object(idempotency, 'PURGE_EVERY', 1):
+            self.post('api-rfid-scans', {'uid': 'AAAA0002'}, 'new')
+        self.assertEqual(list(IdempotencyKey.objects.values_list('key', flat=True)), ['new'])
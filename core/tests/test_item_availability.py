@@ -0,0 +1,47 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.models import Borrower, BorrowTransaction, Item
+
+
+class ItemAvailabilityTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('api-items-availability')
+        self.ana = Borrower.objects.create(name='Ana', rfid_uid='AABBCCDD')
+        self.laptop = Item.objects.create(name='Laptop', qr_code='ITEM-1')
+        self.tablet = Item.objects.create(name='Tablet', qr_code='ITEM-2')
+        old = BorrowTransaction.objects.create(borrower=self.ana, item=self.tablet)
+        old.status = BorrowTransaction.Status.RETURNED
+        old.save()
+        self.loan = BorrowTransaction.objects.create(borrower=self.ana, item=self.laptop)
+
+    def test_reports_borrower_and_unknown_codes_in_request_order(self):
+        res = self.client.post(self.url, {'qr_codes': ['ITEM-2', ' ITEM-1', 'NOPE', 'ITEM-2']}, format='json')
+        self.assertEqual(res.status_code, 200)
+        results = res.data['results']
+        self.assertEqual([r['qr_code'] for r in results], ['ITEM-2', 'ITEM-1', 'NOPE'])
+        self.assertTrue(results[0]['available'])
+        self.assertIsNone(results[0]['transaction'])
+        self.assertFalse(results[1]['available'])
+        self.assertEqual(results[1]['transaction']['id'], self.loan.id)
+        self.assertEqual(results[1]['transaction']['borrower'], {'id': self.ana.id, 'name': 'Ana', 'rfid_uid': 'AABBCCDD'})
+        self.assertEqual(results[2], {'qr_code': 'NOPE', 'found': False})
+        self.assertEqual((res.data['available'], res.data['borrowed'], res.data['unknown']), (1, 1, 1))
+
+    def test_shelf_audit_is_one_query(self):
+        Item.objects.bulk_create(Item(name=f'Item {i}', qr_code=f'AUDIT-{i}') for i in range(300))
+        codes = [f'AUDIT-{i}' for i in range(300)]
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.post(self.url, {'qr_codes': codes}, format='json')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data['available'], 300)
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+    def test_validates_payload(self):
+        self.assertEqual(self.client.post(self.url, {'qr_codes': []}, format='json').status_code, 400)
+        res = self.client.post(self.url, {'qr_codes': ['X'] * 501}, format='json')
+        self.assertEqual(res.status_code, 400)
@@ -0,0 +1,105 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core import debounce, entity_cache
+from core.models import Borrower, BorrowTransaction, DeviceInstance, Item, KioskSession, RFIDScan
+
+
+class KioskSessionTests(TestCase):
+    def setUp(self):
+        entity_cache.clear()
+        debounce.clear()
+        self.device = DeviceInstance.objects.create(ip='10.0.0.70', api_token='kiosk-a')
+        self.other = DeviceInstance.objects.create(ip='10.0.0.71', api_token='kiosk-b')
+        self.client = APIClient(HTTP_X_DEVICE_TOKEN='kiosk-a')
+        self.ana = Borrower.objects.create(name='Ana', rfid_uid='AABBCCDD')
+        self.laptop = Item.objects.create(name='Laptop', qr_code='ITEM-1')
+        self.tablet = Item.objects.create(name='Tablet', qr_code='ITEM-2')
+
+    def tap(self, uid='AABBCCDD', client=None, **extra):
+        return (client or self.client).post(reverse('api-kiosk-tap'), {'uid': uid, **extra}, format='json')
+
+    def scan(self, qr, client=None):
+        return (client or self.client).post(reverse('api-kiosk-scan'), {'item_qr': qr}, format='json')
+
+    def test_tap_then_scans_borrow_for_the_session_borrower(self):
+        res = self.tap()
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data['session']['borrower']['name'], 'Ana')
+        self.assertEqual(res.data['session']['action'], 'borrow')
+        self.assertEqual(res.data['open_loans'], 0)
+        self.assertEqual(RFIDScan.objects.get().device, self.device)
+
+        res = self.scan('ITEM-1')
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(res.data['result'], 'borrowed')
+        self.assertEqual(res.data['item']['name'], 'Laptop')
+        self.assertEqual(res.data['transaction']['borrower_id'], self.ana.id)
+        self.assertEqual(res.data['open_loans'], 1)
+
+        self.assertEqual(self.scan('ITEM-2').data['open_loans'], 2)
+        self.assertEqual(self.scan('ITEM-2').status_code, 409)
+
+    def test_return_session_only_closes_own_loans(self):
+        ben = Borrower.objects.create(name='Ben', rfid_uid='11223344')
+        BorrowTransaction.objects.create(borrower=self.ana, item=self.laptop)
+        BorrowTransaction.objects.create(borrower=ben, item=self.tablet)
+        self.tap(action='return')
+
+        res = self.scan('ITEM-2')
+        self.assertEqual(res.status_code, 404)
+        res = self.scan('ITEM-1')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data['result'], 'returned')
+        self.assertEqual(res.data['open_loans'], 0)
+        self.assertEqual(BorrowTransaction.objects.filter(status=BorrowTransaction.Status.OPEN).count(), 1)
+
+    def test_sessions_are_per_device_and_expire(self):
+        self.tap()
+        other = APIClient(HTTP_X_DEVICE_TOKEN='kiosk-b')
+        self.assertEqual(self.scan('ITEM-1', client=other).status_code, 409)
+
+        KioskSession.objects.filter(device=self.device).update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(self.scan('ITEM-1').status_code, 409)
+
+    def test_unregistered_tap_closes_session(self):
+        self.tap()
+        res = self.tap(uid='99999999')
+        self.assertEqual(res.status_code, 404)
+        self.assertEqual(res.data['uid'], '99999999')
+        self.assertEqual(self.client.get(reverse('api-kiosk-session')).status_code, 204)
+
+    def test_session_endpoint_and_end(self):
+        self.tap()
+        res = self.client.get(reverse('api-kiosk-session'))
+        self.assertEqual(res.status_code, 200)
+        self.assertGreater(res.data['session']['expires_in'], 0)
+        self.assertEqual(self.client.delete(reverse('api-kiosk-session')).status_code, 204)
+        self.assertEqual(self.scan('ITEM-1').status_code, 409)
+
+    def test_requires_device_token(self):
+        self.assertEqual(self.tap(client=APIClient()).status_code, 401)
+        self.assertEqual(self.tap(client=APIClient(HTTP_X_DEVICE_TOKEN='bad')).status_code, 401)
+
+    def test_held_card_does_not_replay_an_ended_session(self):
+        self.assertEqual(self.tap().status_code, 200)
+        self.client.delete(reverse('api-kiosk-session'))
+        res = self.tap()
+        self.assertNotIn('X-Debounced', res)
+        self.assertEqual(self.scan('ITEM-1').status_code, 201)
+
+    @override_settings(KIOSK_SESSION_TTL=0)
+    def test_tap_is_not_replayed_past_its_session(self):
+        self.tap()
+        self.assertNotIn('X-Debounced', self.tap())
+        self.assertEqual(RFIDScan.objects.count(), 2)
+
+    def test_other_action_is_a_new_tap(self):
+        self.tap()
+        res = self.tap(action='return')
+        self.assertNotIn('X-Debounced', res)
+        self.assertEqual(res.data['session']['action'], 'return')
@@ -0,0 +1,134 @@
+import re
+import socket
+import time
+import urllib.error
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import metrics
+from core.models import Borrower
+from core.views import push_command_to_target, push_config_to_target
+
+
+@override_settings(REQUEST_METRICS=True, METRICS_TOKEN='')
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        metrics.reset()
+        Borrower.objects.create(name='Ana', rfid_uid='AABBCCDD')
+
+    def test_server_timing_header(self):
+        res = self.client.get(reverse('api-borrowers'), {'q': 'AABBCCDD'})
+        self.assertEqual(res.status_code, 200)
+        timing = res['Server-Timing']
+        for part in ('total;dur=', 'db;dur=', 'device;dur=', 'app;dur='):
+            self.assertIn(part, timing)
+        self.assertRegex(timing, r'desc="[1-9]\d* queries"')
+
+    def test_metrics_endpoint_exposes_route_histograms(self):
+        self.client.get(reverse('api-borrowers'), {'q': 'x'})
+        self.client.get(reverse('api-borrowers-slash'), {'q': 'x'})
+        self.client.force_login(User.objects.create_user('admin', password='x', is_staff=True))
+        res = self.client.get(reverse('api-metrics'))
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = res.content.decode()
+        self.assertIn('# TYPE rfid_http_request_duration_seconds histogram', body)
+        # Slash and no-slash routes share one label set
+        self.assertIn('rfid_http_request_duration_seconds_count{method="GET",route="api/borrowers",status="200"} 2', body)
+        self.assertIn('rfid_http_request_queries_bucket{route="api/borrowers",le="+Inf"} 2', body)
+
+    def test_device_calls_are_attributed(self):
+        user = User.objects.create_user('admin', password='x', is_staff=True)
+        self.client.force_login(user)
+        reply = mock.MagicMock()
+        reply.__enter__.return_value.read.return_value = b'{"status":"ok"}'
+        reply.__enter__.return_value.getcode.return_value = 200
+
+        def slow_urlopen(*args, **kwargs):
+            time.sleep(0.02)
+            return reply
+
+        with mock.patch('urllib.request.urlopen', side_effect=slow_urlopen):
+            res = self.client.post(
+                reverse('api-device-instance-control'), {'ip': '10.0.0.9', 'action': 'stopap'},
+                content_type='application/json',
+            )
+        self.assertEqual(res.status_code, 200)
+        device_ms = float(re.search(r'device;dur=([\d.]+)', res['Server-Timing']).group(1))
+        self.assertGreaterEqual(device_ms, 20)
+
+    def test_metrics_without_token_are_staff_only(self):
+        url = reverse('api-metrics')
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.force_login(User.objects.create_user('user', password='x'))
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+    @override_settings(METRICS_TOKEN='scrape')
+    def test_metrics_token_required(self):
+        url = reverse('api-metrics')
+        self.assertEqual(self.client.get(url).status_code, 401)
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION='Bearer scrape').status_code, 200)
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION='Bearer scrapé').status_code, 401)
+
+
+class RequestMetricsDisabledTests(TestCase):
+    @override_settings(REQUEST_METRICS=False)
+    def test_disabled_by_default(self):
+        res = self.client.get(reverse('api-ping'))
+        self.assertNotIn('Server-Timing', res)
+        self.assertEqual(self.client.get(reverse('api-metrics')).status_code, 404)
+
+    @override_settings(REQUEST_METRICS=False)
+    @mock.patch('urllib.request.urlopen', side_effect=socket.timeout())
+    def test_device_calls_are_not_recorded(self, mock_urlopen):
+        metrics.reset()
+        push_command_to_target('10.0.0.9', 'stopap')
+        self.assertNotIn('10.0.0.9', metrics.render())
+
+
+@override_settings(REQUEST_METRICS=True)
+class DeviceCallMetricsTests(TestCase):
+    def setUp(self):
+        metrics.reset()
+        self.reply = mock.MagicMock()
+        self.reply.__enter__.return_value.read.return_value = b'{"status":"ok"}'
+        self.reply.__enter__.return_value.getcode.return_value = 200
+
+    @mock.patch('socket.create_connection')
+    @mock.patch('urllib.request.urlopen')
+    def test_push_config_records_spans_and_outcome(self, mock_urlopen, mock_conn):
+        # GET probe resets, first POST times out, second succeeds
+        mock_urlopen.side_effect = [ConnectionResetError(), socket.timeout(), self.reply]
+        with mock.patch('time.sleep'), self.assertLogs('core.device_calls', 'INFO') as logs:
+            ok, _, _ = push_config_to_target('10.0.0.7', retries=2)
+        self.assertTrue(ok)
+        trace = logs.records[-1].device_trace
+        self.assertEqual(
+            [(s['step'], s['outcome']) for s in trace['spans']],
+            [('tcp_connect', 'ok'), ('probe', 'reset'), ('post', 'timeout'), ('post', 'ok')],
+        )
+        self.assertEqual(trace['spans'][-1]['attempt'], 2)
+        body = metrics.render()
+        self.assertIn('rfid_device_operations_total{op="push_config",outcome="ok",target="10.0.0.7"} 1', body)
+        self.assertIn('rfid_device_retries_total{op="push_config",target="10.0.0.7"} 1', body)
+        self.assertIn('rfid_device_span_seconds_count{outcome="timeout",step="post",target="10.0.0.7"} 1', body)
+
+    @mock.patch('urllib.request.urlopen')
+    def test_winning_fallback_is_counted(self, mock_urlopen):
+        unknown = urllib.error.HTTPError('http://10.0.0.8/control', 400, 'Bad Request', {}, None)
+        mock_urlopen.side_effect = [unknown, self.reply]
+        ok, detail, _ = push_command_to_target('10.0.0.8', 'reboot')
+        self.assertTrue(ok)
+        body = metrics.render()
+        self.assertIn(f'rfid_device_fallback_total{{fallback="{detail["fallback"]}",op="command",target="10.0.0.8"}} 1', body)
+        self.assertIn('rfid_device_span_seconds_count{outcome="http_400",step="post",target="10.0.0.8"} 1', body)
+
+    @mock.patch('urllib.request.urlopen', side_effect=socket.timeout())
+    def test_failed_command_counts_as_error(self, mock_urlopen):
+        ok, _, code = push_command_to_target('10.0.0.9', 'stopap')
+        self.assertFalse(ok)
+        self.assertEqual(code, 504)
+        self.assertIn('rfid_device_operations_total{op="command",outcome="error",target="10.0.0.9"} 1', metrics.render())
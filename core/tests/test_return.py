@@ -0,0 +1,93 @@
+import threading
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core import entity_cache
+from core.models import Borrower, BorrowTransaction, Item
+from core.views import close_open_loan
+
+
+class ReturnTests(TestCase):
+    def setUp(self):
+        entity_cache.clear()
+        self.client = APIClient()
+        self.url = reverse('api-return')
+        self.borrower = Borrower.objects.create(name='Ana', rfid_uid='AABBCCDD')
+        self.item = Item.objects.create(name='Laptop', qr_code='ITEM-1')
+        self.tx = BorrowTransaction.objects.create(borrower=self.borrower, item=self.item)
+
+    def test_return_by_qr_code(self):
+        # Item lookup, the conditional UPDATE and its version bump, one joined fetch and the
+        # borrower's open-loan count
+        with self.assertNumQueries(5):
+            res = self.client.post(self.url, {'item_qr': 'item-1'}, format='json')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data['id'], self.tx.id)
+        self.assertEqual(res.data['status'], BorrowTransaction.Status.RETURNED)
+        self.assertEqual(res.data['item']['qr_code'], 'ITEM-1')
+        self.assertEqual(res.data['borrower']['open_transactions_count'], 0)
+        self.tx.refresh_from_db()
+        self.assertEqual(self.tx.status, BorrowTransaction.Status.RETURNED)
+        self.assertIsNotNone(self.tx.returned_at)
+
+    def test_return_by_transaction_id_twice(self):
+        res = self.client.post(self.url, {'transaction_id': self.tx.id}, format='json')
+        self.assertEqual(res.status_code, 200)
+        res = self.client.post(self.url, {'transaction_id': self.tx.id}, format='json')
+        self.assertEqual(res.status_code, 404)
+
+    def test_unknown_item_is_not_found(self):
+        res = self.client.post(self.url, {'item_qr': 'ITEM-404'}, format='json')
+        self.assertEqual(res.status_code, 404)
+        self.assertEqual(res.data['detail'], 'Open transaction not found')
+
+    def test_compact_return_reads_nothing_back(self):
+        # The conditional UPDATE and the version bump
+        with self.assertNumQueries(2):
+            res = self.client.post(self.url, {'transaction_id': self.tx.id}, format='json', HTTP_X_DEVICE_TOKEN='t')
+        self.assertEqual(res.json(), {
+            'id': self.tx.id, 'status': 'RETURNED', 'borrower_id': self.borrower.id, 'item_id': self.item.id,
+        })
+
+
+    def test_other_backends_close_loans_without_update_returning(self):
+        # e.g. MariaDB: INSERT ... RETURNING works, UPDATE ... RETURNING does not
+        with mock.patch.object(connection, 'vendor', 'mysql'), CaptureQueriesContext(connection) as ctx:
+            row = close_open_loan(item_id=self.item.id)
+        self.assertEqual((row['id'], row['borrower_id']), (self.tx.id, self.borrower.id))
+        self.assertFalse(any('RETURNING' in q['sql'] for q in ctx.captured_queries))
+        self.assertIsNone(close_open_loan(item_id=self.item.id))
+
+
+class ConcurrentReturnTests(TransactionTestCase):
+    THREADS = 6
+
+    def test_exactly_one_concurrent_return_succeeds(self):
+        borrower = Borrower.objects.create(name='Ana', rfid_uid='AABBCCDD')
+        item = Item.objects.create(name='Laptop', qr_code='ITEM-1')
+        BorrowTransaction.objects.create(borrower=borrower, item=item)
+
+        barrier = threading.Barrier(self.THREADS)
+        results = []
+
+        def worker():
+            try:
+                barrier.wait()
+                results.append(close_open_loan(item_id=item.id))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(self.THREADS)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(results), self.THREADS)
+        self.assertEqual(sum(r is not None for r in results), 1)
+        self.assertEqual(BorrowTransaction.objects.filter(status=BorrowTransaction.Status.RETURNED).count(), 1)
@@ -0,0 +1,106 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.models import DeviceInstance, RFIDScan
+
+
+class ScanBatchUploadTests(TestCase):
+    def setUp(self):
+        self.device = DeviceInstance.objects.create(ip='10.0.0.70', api_token='batchtoken')
+        self.client = APIClient()
+        self.client.credentials(HTTP_X_DEVICE_TOKEN='batchtoken')
+        self.url = reverse('api-rfid-scans-batch')
+
+    def batch(self, *seqs):
+        return {'scans': [{'seq': s, 'uid': f'AABB{s:04X}', 'age_ms': 1000 * s} for s in seqs]}
+
+    def test_batch_inserts_in_order_with_scan_times(self):
+        res = self.client.post(self.url, self.batch(1, 2, 3), format='json')
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(res.data, {'accepted': 3, 'duplicates': 0, 'last_seq': 3})
+        scans = list(RFIDScan.objects.filter(device=self.device).order_by('seq'))
+        self.assertEqual([s.uid for s in scans], ['AABB0001', 'AABB0002', 'AABB0003'])
+        # Older scans (larger age) have earlier scan times
+        self.assertLess(scans[2].scanned_at, scans[0].scanned_at)
+        self.device.refresh_from_db()
+        self.assertEqual(self.device.last_wifi_event, 'scan_batch')
+
+    def test_resent_batch_is_deduplicated(self):
+        self.client.post(self.url, self.batch(1, 2), format='json')
+        res = self.client.post(self.url, self.batch(1, 2, 3, 3), format='json')
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(res.data, {'accepted': 1, 'duplicates': 2, 'last_seq': 3})
+        res = self.client.post(self.url, self.batch(2, 3), format='json')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(RFIDScan.objects.filter(device=self.device).count(), 3)
+
+    def test_resent_batch_larger_than_retention(self):
+        seqs = range(1, 301)
+        res = self.client.post(self.url, self.batch(*seqs), format='json')
+        self.assertEqual(res.data['accepted'], 300)
+        self.assertEqual(RFIDScan.objects.filter(device=self.device).count(), 300)
+        # Another reader's scans trim this device's batch down to the retention
+        other = DeviceInstance.objects.create(ip='10.0.0.72', api_token='othertoken')
+        APIClient(HTTP_X_DEVICE_TOKEN='othertoken').post(reverse('api-rfid-scans'), {'uid': 'X'}, format='json')
+        self.assertLess(RFIDScan.objects.filter(device=self.device).count(), 300)
+        res = self.client.post(self.url, self.batch(*seqs), format='json')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data, {'accepted': 0, 'duplicates': 300, 'last_seq': 300})
+        res = self.client.post(self.url, self.batch(300, 301), format='json')
+        self.assertEqual(res.data, {'accepted': 1, 'duplicates': 1, 'last_seq': 301})
+        self.assertEqual(RFIDScan.objects.filter(device=other).count(), 1)
+
+    def test_new_epoch_restarts_the_counter(self):
+        self.client.post(self.url, {'epoch': 'boot-1', **self.batch(1, 2, 3)}, format='json')
+        # Rebooted with the counter kept in RAM: seq starts again at 1
+        res = self.client.post(self.url, {'epoch': 'boot-2', 'scans': [{'seq': 1, 'uid': 'NEW1'}]}, format='json')
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(res.data, {'accepted': 1, 'duplicates': 0, 'last_seq': 1})
+        res = self.client.post(self.url, {'epoch': 'boot-2', 'scans': [{'seq': 1, 'uid': 'NEW1'}]}, format='json')
+        self.assertEqual(res.data['duplicates'], 1)
+        self.assertEqual(RFIDScan.objects.filter(device=self.device).count(), 4)
+        self.assertEqual(RFIDScan.objects.get(device=self.device, seq=1).uid, 'NEW1')
+
+    def test_counter_reset_without_epoch_is_refused(self):
+        self.client.post(self.url, self.batch(1, 2, 3), format='json')
+        res = self.client.post(self.url, {'scans': [{'seq': 1, 'uid': 'NEW1'}, {'seq': 2, 'uid': 'NEW2'}]}, format='json')
+        self.assertEqual(res.status_code, 409)
+        self.assertEqual(res.data['last_seq'], 3)
+        self.assertFalse(RFIDScan.objects.filter(uid='NEW1').exists())
+        # Renumbered after last_seq, the scans are stored
+        res = self.client.post(self.url, {'scans': [{'seq': 4, 'uid': 'NEW1'}, {'seq': 5, 'uid': 'NEW2'}]}, format='json')
+        self.assertEqual(res.data['accepted'], 2)
+
+    def test_sequences_are_per_device(self):
+        DeviceInstance.objects.create(ip='10.0.0.71', api_token='othertoken')
+        self.client.post(self.url, self.batch(1), format='json')
+        other = APIClient()
+        other.credentials(HTTP_X_DEVICE_TOKEN='othertoken')
+        res = other.post(self.url, self.batch(1), format='json')
+        self.assertEqual(res.data['accepted'], 1)
+
+    def test_explicit_scan_time(self):
+        when = datetime(2026, 1, 2, 3, 4, 5, tzinfo=dt_timezone.utc)
+        self.client.post(self.url, {'scans': [{'seq': 9, 'uid': 'X1', 'scanned_at': when.isoformat()}]}, format='json')
+        self.assertEqual(RFIDScan.objects.get(seq=9).scanned_at, when)
+
+    def test_requires_device_token(self):
+        self.assertEqual(APIClient().post(self.url, self.batch(1), format='json').status_code, 401)
+        bad = APIClient()
+        bad.credentials(HTTP_X_DEVICE_TOKEN='nope')
+        self.assertEqual(bad.post(self.url, self.batch(1), format='json').status_code, 401)
+
+    def test_rejects_invalid_batches(self):
+        self.assertEqual(self.client.post(self.url, {'scans': []}, format='json').status_code, 400)
+        self.assertEqual(self.client.post(self.url, {'scans': [{'uid': 'X'}]}, format='json').status_code, 400)
+        self.assertEqual(self.client.post(self.url, self.batch(*range(501)), format='json').status_code, 400)
+        self.assertFalse(RFIDScan.objects.exists())
+
+    def test_query_count_does_not_grow_with_batch_size(self):
+        # token lookup, savepoint, locked high-water read, one INSERT, device update and its
+        # version bump, release, trim
+        with self.assertNumQueries(8):
+            self.client.post(self.url, self.batch(*range(50)), format='json')
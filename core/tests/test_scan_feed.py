@@ -0,0 +1,73 @@
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core import debounce
+from core.models import DeviceInstance, RFIDScan
+
+
+class StationScanFeedTests(TestCase):
+    def setUp(self):
+        debounce.clear()
+        self.a = DeviceInstance.objects.create(ip='10.0.0.80', api_token='station-a')
+        self.b = DeviceInstance.objects.create(ip='10.0.0.81', api_token='station-b')
+        self.reader_a = APIClient(HTTP_X_DEVICE_TOKEN='station-a')
+        self.reader_b = APIClient(HTTP_X_DEVICE_TOKEN='station-b')
+
+    def post_scan(self, client, uid):
+        res = client.post(reverse('api-rfid-scans'), {'uid': uid}, format='json')
+        self.assertEqual(res.status_code, 201)
+        return res
+
+    def test_scans_are_attributed_to_the_reporting_device(self):
+        self.post_scan(self.reader_a, 'A1')
+        self.post_scan(APIClient(), 'ANON')
+        self.reader_b.post(reverse('api-scan-id'), {'borrower_rfid': 'B1'}, format='json')
+        self.assertEqual(
+            dict(RFIDScan.objects.values_list('uid', 'device_id')),
+            {'A1': self.a.id, 'ANON': None, 'B1': self.b.id},
+        )
+
+    def test_latest_scan_per_device(self):
+        self.post_scan(self.reader_a, 'A1')
+        self.post_scan(self.reader_b, 'B1')
+        res = self.client.get(reverse('api-rfid-scans'), {'device': self.a.id})
+        self.assertEqual(res.json()['uid'], 'A1')
+        self.assertEqual(res.json()['device'], self.a.id)
+        self.assertEqual(self.client.get(reverse('api-rfid-scans')).json()['uid'], 'B1')
+        self.assertEqual(self.client.get(reverse('api-rfid-scans'), {'device': 'x'}).status_code, 400)
+
+    def test_feed_returns_only_newer_scans_of_the_station(self):
+        first = self.post_scan(self.reader_a, 'A1').json()['id']
+        self.post_scan(self.reader_b, 'B1')
+        self.post_scan(self.reader_a, 'A2')
+        url = reverse('api-device-scans', args=[self.a.id])
+        self.assertEqual([s['uid'] for s in self.client.get(url).json()], ['A2', 'A1'])
+        self.assertEqual([s['uid'] for s in self.client.get(url, {'after': first}).json()], ['A2'])
+        self.assertEqual(len(self.client.get(url, {'limit': 1}).json()), 1)
+        self.assertEqual(self.client.get(reverse('api-device-scans', args=[999])).status_code, 404)
+
+    def test_feed_pages_through_a_backlog_with_after(self):
+        first = self.post_scan(self.reader_a, 'START').json()['id']
+        RFIDScan.objects.bulk_create([RFIDScan(uid=f'U{i:02d}', device=self.a) for i in range(30)])
+        url = reverse('api-device-scans', args=[self.a.id])
+        seen, after = [], first
+        for _ in range(4):
+            page = self.client.get(url, {'after': after, 'limit': 10}).json()
+            if not page:
+                break
+            self.assertEqual([s['id'] for s in page], sorted((s['id'] for s in page), reverse=True))
+            seen += [s['uid'] for s in reversed(page)]
+            after = page[0]['id']
+        self.assertEqual(seen, [f'U{i:02d}' for i in range(30)])
+
+    def test_latest_lookup_uses_device_index(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('plan check is SQLite specific')
+        sql, params = RFIDScan.objects.filter(device_id=self.a.id).order_by('-created_at')[:1].query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+        self.assertIn('core_rfidscan_device_recent', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
@@ -0,0 +1,105 @@
+import importlib
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core import search
+from core.models import Borrower, Item
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.ana = Borrower.objects.create(name='Ana Reyes', rfid_uid='AABBCCDD')
+        cls.ben = Borrower.objects.create(name='Ben Santos', rfid_uid='11223344')
+        cls.anabel = Borrower.objects.create(name='Anabel Cruz', rfid_uid='A1B2C3D4')
+        Item.objects.bulk_create([
+            Item(name='Laptop Dell', qr_code='ITEM-00AA'),
+            Item(name='Projector', qr_code='ITEM-00BB'),
+        ])
+
+    def names(self, spec, q, **kwargs):
+        return sorted(row.name for row in search.search(spec, q, **kwargs))
+
+    def test_matches_case_insensitive_substrings(self):
+        self.assertEqual(self.names(search.BORROWERS, 'aab'), ['Ana Reyes'])
+        self.assertEqual(self.names(search.BORROWERS, 'ANTOS'), ['Ben Santos'])
+        self.assertEqual(self.names(search.BORROWERS, 'ana'), ['Ana Reyes', 'Anabel Cruz'])
+        self.assertEqual(self.names(search.ITEMS, 'item-00'), ['Laptop Dell', 'Projector'])
+        self.assertEqual(self.names(search.ITEMS, 'nothing'), [])
+
+    def test_index_is_used_and_kept_in_sync(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('FTS5 index is SQLite only')
+        with CaptureQueriesContext(connection) as ctx:
+            list(search.search(search.BORROWERS, 'Reyes'))
+        self.assertIn('core_borrower_fts MATCH', ctx.captured_queries[0]['sql'])
+
+        Borrower.objects.filter(pk=self.ben.pk).update(name='Benjamin Reyes')
+        self.assertEqual(self.names(search.BORROWERS, 'Reyes'), ['Ana Reyes', 'Benjamin Reyes'])
+        self.ben.refresh_from_db()
+        self.ben.delete()
+        self.assertEqual(self.names(search.BORROWERS, 'Reyes'), ['Ana Reyes'])
+
+    def test_short_queries_fall_back_to_like(self):
+        self.assertEqual(self.names(search.BORROWERS, 'be'), ['Anabel Cruz', 'Ben Santos'])
+
+    def test_prefix_mode(self):
+        self.assertEqual(self.names(search.BORROWERS, 'ana', prefix=True), ['Ana Reyes', 'Anabel Cruz'])
+        self.assertEqual(self.names(search.BORROWERS, 'bel', prefix=True), [])
+        self.assertEqual(self.names(search.BORROWERS, 'a1b', prefix=True), ['Anabel Cruz'])
+
+    def test_exact_code_ranks_first(self):
+        results = list(search.search(search.BORROWERS, 'Ana Reyes'))
+        self.assertEqual(results[0].pk, self.ana.pk)
+
+    @override_settings(SEARCH_MAX_RESULTS=1)
+    def test_limit_is_capped(self):
+        self.assertEqual(len(search.search(search.BORROWERS, 'ana', limit=50)), 1)
+
+    def test_api_search_parameters(self):
+        res = self.client.get(reverse('api-borrowers'), {'q': 'ana', 'limit': 1})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(res.json()), 1)
+        self.assertIn('open_transactions_count', res.json()[0])
+
+        res = self.client.get(reverse('api-borrowers'), {'q': 'aabbccdd'})
+        self.assertEqual([b['rfid_uid'] for b in res.json()], ['AABBCCDD'])
+
+        res = self.client.get(reverse('api-items'), {'q': 'proj', 'mode': 'prefix'})
+        self.assertEqual([i['name'] for i in res.json()], ['Projector'])
+
+        res = self.client.get(reverse('api-items'), {'q': 'proj', 'limit': 'x'})
+        self.assertEqual(res.status_code, 400)
+        res = self.client.get(reverse('api-items'), {'q': 'proj', 'limit': -1})
+        self.assertEqual(res.status_code, 400)
+
+    def test_index_lookup_does_not_count_against_searches(self):
+        search.clear()
+        with self.assertNumQueries(1 if connection.vendor == 'sqlite' else 0):
+            search.warm()
+        with self.assertNumQueries(1):
+            list(search.search(search.BORROWERS, 'Reyes'))
+
+    def test_migration_probes_for_the_trigram_tokenizer(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('FTS5 index is SQLite only')
+        migration = importlib.import_module('core.migrations.0013_search_indexes')
+        self.assertTrue(migration._fts5_trigram_available(connection))
+        self.assertNotIn('core_trigram_probe', connection.introspection.table_names())
+
+    def test_lost_triggers_are_restored(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('FTS5 index is SQLite only')
+        # What SQLite's table rebuild in a later migration leaves behind
+        with connection.cursor() as cursor:
+            for suffix in ('ai', 'ad', 'au'):
+                cursor.execute(f'DROP TRIGGER core_borrower_fts_{suffix}')
+        Borrower.objects.create(name='Cy Reyes', rfid_uid='55667788')
+        with self.assertLogs('core.search', 'WARNING'):
+            search.warm()
+        self.assertEqual(self.names(search.BORROWERS, 'Reyes'), ['Ana Reyes', 'Cy Reyes'])
+        Borrower.objects.create(name='Di Reyes', rfid_uid='99887766')
+        self.assertEqual(self.names(search.BORROWERS, 'Reyes'), ['Ana Reyes', 'Cy Reyes', 'Di Reyes'])
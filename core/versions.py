@@ -0,0 +1,108 @@
+"""Per-table write counters for conditional GETs on list endpoints.
+
+Every save/delete of a tracked model bumps its table's TableVersion row (see
+core.signals); writes that bypass signals (``update()``, raw SQL) call ``bump``
+themselves. A list endpoint reads the counters of the tables its payload depends on
+(one query) and derives an ETag and Last-Modified from them before touching its own
+queryset, so an unchanged poll costs that query and a 304. Last-Modified is left out
+while the newest change is less than a second old. Searches (``?q=``) are
+one-off lookups and skip all of this.
+
+The bump runs in the writer's transaction, so a reader never sees a new version
+before the data behind it.
+"""
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime
+from typing import NamedTuple
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import Borrower, BorrowTransaction, DeviceInstance, Item, TableVersion
+
+TRACKED_MODELS = (Borrower, Item, BorrowTransaction, DeviceInstance)
+
+# Tables each list payload is built from (borrowers include their open loan count)
+BORROWER_TABLES = (Borrower._meta.db_table, BorrowTransaction._meta.db_table)
+ITEM_TABLES = (Item._meta.db_table,)
+DEVICE_TABLES = (DeviceInstance._meta.db_table,)
+
+
+class Validators(NamedTuple):
+    etag: str
+    last_modified: datetime | None
+
+
+def bump(*tables: str) -> None:
+    now = timezone.now()
+    for table in tables:
+        if TableVersion.objects.filter(table=table).update(version=F("version") + 1, changed_at=now):
+            continue
+        try:
+            with transaction.atomic():
+                TableVersion.objects.create(table=table, version=1, changed_at=now)
+        except IntegrityError:
+            # Created concurrently by another writer
+            TableVersion.objects.filter(table=table).update(version=F("version") + 1, changed_at=now)
+
+
+def validators(request, tables, variant: str = "") -> Validators:
+    """ETag and Last-Modified for a representation of ``tables``.
+
+    The ETag also covers the request path and query string, and ``variant`` (anything
+    else the representation depends on, e.g. the compact profile).
+    """
+    rows = {
+        table: (version, changed_at)
+        for table, version, changed_at in TableVersion.objects.filter(table__in=tables)
+        .values_list("table", "version", "changed_at")
+    }
+    counters = ".".join(str(rows.get(table, (0, None))[0]) for table in tables)
+    key = hashlib.sha256(f"{request.get_full_path()}|{variant}".encode("utf-8")).hexdigest()[:12]
+    changed = [changed_at for _, changed_at in rows.values()]
+    last_modified = max(changed) if changed else None
+    # HTTP dates have one-second precision: a later write in the same second would
+    # look unmodified to If-Modified-Since, so no date is given until that second is over
+    if last_modified is not None and int(last_modified.timestamp()) >= int(timezone.now().timestamp()):
+        last_modified = None
+    return Validators(f'W/"{counters}-{key}"', last_modified)
+
+
+def etag_matches(request, etag: str) -> bool:
+    """True if the request's If-None-Match header matches `etag` (weak comparison)."""
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    wanted = etag[2:] if etag.startswith("W/") else etag
+    return any((t[2:] if t.startswith("W/") else t) == wanted for t in parse_etags(header))
+
+
+def not_modified(request, current: Validators) -> bool:
+    # If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2)
+    if request.headers.get("If-None-Match"):
+        return etag_matches(request, current.etag)
+    since = parse_http_date_safe(request.headers.get("If-Modified-Since") or "")
+    if since is None or current.last_modified is None:
+        return False
+    return int(current.last_modified.timestamp()) <= since
+
+
+def apply(response, current: Validators | None):
+    if current is None:
+        return response
+    response["ETag"] = current.etag
+    if current.last_modified is not None:
+        response["Last-Modified"] = http_date(current.last_modified.timestamp())
+    return response
+
+
+def not_modified_response(current: Validators) -> Response:
+    return apply(Response(status=status.HTTP_304_NOT_MODIFIED), current)
@@ -1,13 +1,17 @@
 from __future__ import annotations
 
+import hmac
 import json
+import time
 import uuid
+from datetime import timedelta
 from io import BytesIO
 
-from django.db import transaction
-from django.db.models import Q
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import FilteredRelation, Q
 from django.db.models.deletion import ProtectedError
-from django.http import HttpResponse
+from django.http import Http404, HttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
 from django.contrib import messages
@@ -22,6 +26,7 @@ import logging
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.fields import DateTimeField
 from rest_framework.permissions import IsAuthenticated
 import concurrent.futures
 import socket
@@ -30,7 +35,7 @@ import urllib.error
 from typing import List, Dict
 
 from .models import Borrower, Item, BorrowTransaction, RFIDScan
-from .models import DeviceConfig, DeviceInstance
+from .models import DeviceConfig, DeviceInstance, KioskSession
 from .serializers import (
     BorrowerSerializer,
     ItemSerializer,
@@ -42,16 +47,77 @@ from .serializers import (
     ItemRegistrationSerializer,
     RFIDScanSerializer,
     RFIDScanCreateSerializer,
+    RFIDScanBatchSerializer,
+    ItemAvailabilitySerializer,
+    KioskTapSerializer,
+    KioskScanSerializer,
+    PushConfigAllSerializer,
     DeviceConfigSerializer,
     DeviceConfigForDeviceSerializer,
     DeviceInstanceSerializer,
 )
 from .models import DeviceConfig
 from .auth import DeviceTokenAuthentication
-from rest_framework.exceptions import AuthenticationFailed
+from . import allowlist, compact, config_cache, debounce, discovery, entity_cache, fast_serializers, health, kiosk, metrics, search, versions
+from .compact import DeviceResponseMixin
+from .idempotency import idempotent
+from .versions import etag_matches
+from rest_framework.exceptions import AuthenticationFailed, ValidationError
 
+# Device list ETags roll over at least this often; "health" decays between heartbeats
+DEVICE_HEALTH_ETAG_SECONDS = 30
 
-class BorrowCreateView(APIView):
+
+SCAN_RETENTION = 200
+
+
+def trim_scans(keep: int = SCAN_RETENTION) -> None:
+    """Keep the RFIDScan table small (retain the most recent ``keep`` entries, default 200)."""
+    excess_ids = list(
+        RFIDScan.objects.order_by("-created_at").values_list("id", flat=True)[keep:]
+    )
+    if excess_ids:
+        RFIDScan.objects.filter(id__in=excess_ids).delete()
+
+
+def device_from_token(request):
+    """(device, None) for a valid X-Device-Token, otherwise (None, 401 response)."""
+    try:
+        res = DeviceTokenAuthentication().authenticate(request)
+    except AuthenticationFailed as e:
+        return None, Response({"detail": str(e.detail)}, status=status.HTTP_401_UNAUTHORIZED)
+    if not res:
+        return None, Response({"detail": "X-Device-Token required"}, status=status.HTTP_401_UNAUTHORIZED)
+    return res[0], None
+
+
+def device_or_none(request):
+    """The device for a valid X-Device-Token, else None (for endpoints that allow anonymous use)."""
+    try:
+        res = DeviceTokenAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+    return res[0] if res else None
+
+
+def start_loan(borrower, item) -> BorrowTransaction | None:
+    """Open a loan of ``item`` to ``borrower``; None if the item is already out."""
+    # If item exists but is inactive, reactivate it
+    if not item.is_active:
+        item.is_active = True
+        item.save(update_fields=["is_active"])
+
+    # Ensure item is not currently out
+    if BorrowTransaction.objects.filter(item=item, status=BorrowTransaction.Status.OPEN).exists():
+        return None
+
+    # Create new transaction
+    with transaction.atomic():
+        return BorrowTransaction.objects.create(borrower=borrower, item=item)
+
+
+class BorrowCreateView(DeviceResponseMixin, APIView):
+    @idempotent
     def post(self, request):
         serializer = BorrowCreateSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -59,33 +125,75 @@ class BorrowCreateView(APIView):
         item_qr = serializer.validated_data["item_qr"].strip()
 
         try:
-            borrower = Borrower.objects.get(rfid_uid=borrower_rfid)
+            borrower = entity_cache.borrower_by_uid(borrower_rfid)
         except Borrower.DoesNotExist:
             return Response({"detail": "Borrower not registered. Please register first."}, status=status.HTTP_404_NOT_FOUND)
 
         # Item must be registered - no auto-creation
         try:
-            item = Item.objects.get(qr_code=item_qr)
+            item = entity_cache.item_by_qr(item_qr)
         except Item.DoesNotExist:
             return Response({"detail": "Item not registered. Please register the item first."}, status=status.HTTP_404_NOT_FOUND)
         
-        # If item exists but is inactive, reactivate it
-        if not item.is_active:
-            item.is_active = True
-            item.save(update_fields=["is_active"])
-
-        # Ensure item is not currently out
-        if BorrowTransaction.objects.filter(item=item, status=BorrowTransaction.Status.OPEN).exists():
+        tx = start_loan(borrower, item)
+        if tx is None:
             return Response({"detail": "Item already borrowed"}, status=status.HTTP_409_CONFLICT)
 
-        # Create new transaction
-        with transaction.atomic():
-            tx = BorrowTransaction.objects.create(borrower=borrower, item=item)
-
+        if self.compact:
+            return Response(compact.transaction_payload(tx), status=status.HTTP_201_CREATED)
         return Response(BorrowTransactionSerializer(tx).data, status=status.HTTP_201_CREATED)
 
 
-class ReturnView(APIView):
+def close_open_loan(**match) -> dict | None:
+    """Mark the OPEN transaction matching ``match`` (e.g. ``id=`` or ``item_id=``) RETURNED.
+
+    The status check is part of the UPDATE, so of two concurrent returns exactly one
+    changes the row; the other gets None. Returns the updated row's id, borrower_id,
+    item_id and returned_at, read back with RETURNING where the backend supports it.
+    """
+    returned_at = timezone.now()
+    open_status, returned = BorrowTransaction.Status.OPEN, BorrowTransaction.Status.RETURNED
+    # UPDATE ... RETURNING: PostgreSQL, and SQLite from 3.35 (the release that added
+    # INSERT ... RETURNING). The features flag alone is not enough: MariaDB has
+    # INSERT ... RETURNING but no UPDATE ... RETURNING.
+    if connection.vendor == "postgresql" or (
+        connection.vendor == "sqlite" and connection.features.can_return_columns_from_insert
+    ):
+        qn = connection.ops.quote_name
+        meta = BorrowTransaction._meta
+        where = " AND ".join(f"{qn(meta.get_field(column).column)} = %s" for column in match)
+        sql = (
+            f"UPDATE {qn(meta.db_table)} SET {qn('status')} = %s, {qn('returned_at')} = %s "
+            f"WHERE {where} AND {qn('status')} = %s "
+            f"RETURNING {qn('id')}, {qn('borrower_id')}, {qn('item_id')}"
+        )
+        params = [returned, connection.ops.adapt_datetimefield_value(returned_at), *match.values(), open_status]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+        if row is None:
+            return None
+        tx_id, borrower_id, item_id = row
+    else:
+        with transaction.atomic():
+            row = (
+                BorrowTransaction.objects.select_for_update()
+                .filter(status=open_status, **match)
+                .values("id", "borrower_id", "item_id")
+                .first()
+            )
+            if row is None or not BorrowTransaction.objects.filter(id=row["id"], status=open_status).update(
+                status=returned, returned_at=returned_at,
+            ):
+                return None
+        tx_id, borrower_id, item_id = row["id"], row["borrower_id"], row["item_id"]
+    # No post_save signal for either UPDATE
+    versions.bump(BorrowTransaction._meta.db_table)
+    return {"id": tx_id, "borrower_id": borrower_id, "item_id": item_id, "returned_at": returned_at}
+
+
+class ReturnView(DeviceResponseMixin, APIView):
+    @idempotent
     def post(self, request):
         serializer = ReturnSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -96,37 +204,55 @@ class ReturnView(APIView):
                 item_qr = None
         transaction_id = serializer.validated_data.get("transaction_id")
 
+        closed = None
         try:
             if transaction_id:
-                tx = BorrowTransaction.objects.get(id=transaction_id, status=BorrowTransaction.Status.OPEN)
+                closed = close_open_loan(id=transaction_id)
             elif item_qr:
-                item = Item.objects.get(qr_code__iexact=item_qr)
-                tx = BorrowTransaction.objects.get(item=item, status=BorrowTransaction.Status.OPEN)
-            else:
-                raise BorrowTransaction.DoesNotExist
-        except (BorrowTransaction.DoesNotExist, Item.DoesNotExist):
+                closed = close_open_loan(item_id=entity_cache.item_by_qr(item_qr, iexact=True).pk)
+        except Item.DoesNotExist:
+            pass
+        if closed is None:
             return Response({"detail": "Open transaction not found"}, status=status.HTTP_404_NOT_FOUND)
 
-        tx.status = BorrowTransaction.Status.RETURNED
-        tx.returned_at = timezone.now()
-        tx.save(update_fields=["status", "returned_at"])
-
+        if self.compact:
+            return Response(compact.transaction_payload(BorrowTransaction(status=BorrowTransaction.Status.RETURNED, **closed)))
+        tx = BorrowTransaction.objects.select_related("borrower", "item").get(id=closed["id"])
         return Response(BorrowTransactionSerializer(tx).data)
 
 
-class BorrowerView(APIView):
+def search_queryset(request, spec):
+    """Apply ?q=, ?mode=prefix and ?limit= (see core.search); None without a query."""
+    q = (request.GET.get("q") or "").strip()
+    if not q:
+        return None
+    limit = request.GET.get("limit")
+    try:
+        limit = int(limit) if limit else None
+    except ValueError:
+        raise ValidationError({"limit": "A valid integer is required."})
+    if limit is not None and limit < 0:
+        raise ValidationError({"limit": "Ensure this value is greater than or equal to 0."})
+    return search.search(spec, q, prefix=request.GET.get("mode") == "prefix", limit=limit)
+
+
+class BorrowerView(DeviceResponseMixin, APIView):
     def get(self, request):
-        q = request.GET.get("q")
-        queryset = Borrower.objects.all()
-        if q:
-            # Case-insensitive search for both name and RFID UID
-            q_upper = q.strip().upper()
-            queryset = queryset.filter(
-                Q(name__icontains=q) | 
-                Q(rfid_uid__iexact=q) |  # Exact match (case-insensitive)
-                Q(rfid_uid__icontains=q_upper)  # Also try uppercase version
-            )
-        return Response(BorrowerSerializer(queryset, many=True).data)
+        # Case-insensitive search over name and RFID UID; readers look up a UID this way
+        queryset = search_queryset(request, search.BORROWERS)
+        current = None
+        if queryset is None:
+            # Polls of the full list; searches are one-off and stay at a single query
+            current = versions.validators(request, versions.BORROWER_TABLES, variant=f"compact={self.compact}")
+            if versions.not_modified(request, current):
+                return versions.not_modified_response(current)
+            queryset = Borrower.objects.all()
+        if self.compact:
+            # Readers only check for "rfid_uid"; skip the per-borrower open loan count
+            data = [compact.borrower_payload(b) for b in queryset.only("id", "rfid_uid", "name")]
+        else:
+            data = fast_serializers.borrower_list.data(queryset)
+        return versions.apply(Response(data), current)
 
     def post(self, request):
         serializer = BorrowerSerializer(data=request.data)
@@ -135,6 +261,27 @@ class BorrowerView(APIView):
         return Response(BorrowerSerializer(borrower).data, status=status.HTTP_201_CREATED)
 
 
+class RFIDAllowListView(APIView):
+    """GET: registered RFID UIDs for reader-side card checks (see core.allowlist).
+
+    ?kind=list|bloom, and ?since=<version> for a list delta. (DRF reserves ?format=.)
+    """
+    def get(self, request):
+        fmt = request.GET.get("kind") or "list"
+        if fmt not in allowlist.FORMATS:
+            raise ValidationError({"kind": f"Expected one of: {', '.join(allowlist.FORMATS)}."})
+        since = request.GET.get("since")
+        try:
+            since = int(since) if since else None
+        except ValueError:
+            raise ValidationError({"since": "A valid integer is required."})
+        version, oldest = allowlist.bounds()
+        etag = allowlist.etag(version, fmt, since)
+        if etag_matches(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        return Response(allowlist.payload(fmt, version, oldest, since), headers={"ETag": etag})
+
+
 class BorrowerDetailView(APIView):
     """Admin-only borrower management (edit/delete)."""
 
@@ -185,11 +332,14 @@ class BorrowerDetailView(APIView):
 
 class ItemView(APIView):
     def get(self, request):
-        q = request.GET.get("q")
-        queryset = Item.objects.all()
-        if q:
-            queryset = queryset.filter(Q(name__icontains=q) | Q(qr_code__icontains=q))
-        return Response(ItemSerializer(queryset, many=True).data)
+        queryset = search_queryset(request, search.ITEMS)
+        current = None
+        if queryset is None:
+            current = versions.validators(request, versions.ITEM_TABLES)
+            if versions.not_modified(request, current):
+                return versions.not_modified_response(current)
+            queryset = Item.objects.all()
+        return versions.apply(Response(fast_serializers.item_list.data(queryset)), current)
 
     def post(self, request):
         serializer = ItemSerializer(data=request.data)
@@ -198,6 +348,70 @@ class ItemView(APIView):
         return Response(ItemSerializer(item).data, status=status.HTTP_201_CREATED)
 
 
+class ItemAvailabilityView(APIView):
+    """Whether each of a list of items is out, and who has it, in one query.
+
+    The open-loan join probes an index per item (core_tx_open_item_idx covers it
+    on PostgreSQL). Results follow the request order; unknown codes are reported
+    with ``found: false``.
+    """
+
+    def post(self, request):
+        serializer = ItemAvailabilitySerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        codes = list(dict.fromkeys(code.strip() for code in serializer.validated_data["qr_codes"]))
+
+        rows = (
+            Item.objects.filter(qr_code__in=codes)
+            .annotate(open_loan=FilteredRelation(
+                "transactions", condition=Q(transactions__status=BorrowTransaction.Status.OPEN),
+            ))
+            .order_by()
+            .values(
+                "id", "qr_code", "name", "is_active",
+                "open_loan__id", "open_loan__borrowed_at",
+                "open_loan__borrower_id", "open_loan__borrower__name", "open_loan__borrower__rfid_uid",
+            )
+        )
+        by_code = {}
+        for row in rows:
+            by_code.setdefault(row["qr_code"], row)
+
+        borrowed_at = DateTimeField().to_representation
+        results = []
+        for code in codes:
+            row = by_code.get(code)
+            if row is None:
+                results.append({"qr_code": code, "found": False})
+                continue
+            loan = None
+            if row["open_loan__id"] is not None:
+                loan = {
+                    "id": row["open_loan__id"],
+                    "borrowed_at": borrowed_at(row["open_loan__borrowed_at"]),
+                    "borrower": {
+                        "id": row["open_loan__borrower_id"],
+                        "name": row["open_loan__borrower__name"],
+                        "rfid_uid": row["open_loan__borrower__rfid_uid"],
+                    },
+                }
+            results.append({
+                "qr_code": code,
+                "found": True,
+                "item_id": row["id"],
+                "name": row["name"],
+                "is_active": row["is_active"],
+                "available": loan is None,
+                "transaction": loan,
+            })
+        return Response({
+            "results": results,
+            "available": sum(1 for r in results if r.get("available")),
+            "borrowed": sum(1 for r in results if r["found"] and not r["available"]),
+            "unknown": sum(1 for r in results if not r["found"]),
+        })
+
+
 class ItemDetailView(APIView):
     """Admin-only item management (edit/delete)."""
 
@@ -243,14 +457,20 @@ class BorrowTransactionDetailView(APIView):
 
         borrower_rfid = data.get("borrower_rfid")
         if isinstance(borrower_rfid, str) and borrower_rfid.strip():
-            borrower = get_object_or_404(Borrower, rfid_uid__iexact=borrower_rfid.strip())
+            try:
+                borrower = entity_cache.borrower_by_uid(borrower_rfid, iexact=True)
+            except Borrower.DoesNotExist:
+                raise Http404("No Borrower matches the given query.")
             if borrower != tx.borrower:
                 tx.borrower = borrower
                 updated_fields.append("borrower")
 
         item_qr = data.get("item_qr")
         if isinstance(item_qr, str) and item_qr.strip():
-            item = get_object_or_404(Item, qr_code__iexact=item_qr.strip())
+            try:
+                item = entity_cache.item_by_qr(item_qr, iexact=True)
+            except Item.DoesNotExist:
+                raise Http404("No Item matches the given query.")
             if item != tx.item:
                 tx.item = item
                 updated_fields.append("item")
@@ -285,8 +505,10 @@ class BorrowTransactionDetailView(APIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class ScanIdView(APIView):
+class ScanIdView(DeviceResponseMixin, APIView):
     """Create borrower from RFID scan and immediately create open transaction (log book entry)"""
+    @debounce.suppress_repeats("borrower_rfid")
+    @idempotent
     def post(self, request):
         serializer = ScanIdSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -295,92 +517,311 @@ class ScanIdView(APIView):
         email = serializer.validated_data.get("email", "").strip()
 
         # Record scan for UI use (registration assist)
-        RFIDScan.objects.create(uid=borrower_rfid, name=name, email=email)
-        # Keep the table small (retain most recent 200 entries)
-        excess_ids = list(
-            RFIDScan.objects.order_by("-created_at").values_list("id", flat=True)[200:]
-        )
-        if excess_ids:
-            RFIDScan.objects.filter(id__in=excess_ids).delete()
+        RFIDScan.objects.create(uid=borrower_rfid, name=name, email=email, device=device_or_none(request))
+        trim_scans()
 
         # Require borrower to exist (no auto-registration)
         try:
-            borrower = Borrower.objects.get(rfid_uid=borrower_rfid)
+            borrower = entity_cache.borrower_by_uid(borrower_rfid)
         except Borrower.DoesNotExist:
             return Response(
                 {"detail": "Borrower not registered. Please register first."},
                 status=status.HTTP_404_NOT_FOUND,
             )
 
+        if self.compact:
+            return Response(compact.borrower_payload(borrower), status=status.HTTP_200_OK)
         return Response(BorrowerSerializer(borrower).data, status=status.HTTP_200_OK)
 
 
-class RFIDScanView(APIView):
-    """Log raw RFID scans and fetch the most recent scan."""
+class RFIDScanView(DeviceResponseMixin, APIView):
+    """Log raw RFID scans and fetch the most recent scan (``?device=<id>``: of one reader)."""
 
     def get(self, request):
-        scan = RFIDScan.objects.order_by("-created_at").first()
+        scans = RFIDScan.objects.order_by("-created_at")
+        device_id = request.GET.get("device")
+        if device_id:
+            if not device_id.isdigit():
+                return Response({"device": "A valid integer is required."}, status=status.HTTP_400_BAD_REQUEST)
+            scans = scans.filter(device_id=int(device_id))
+        scan = scans.first()
         if not scan:
             return Response({}, status=status.HTTP_204_NO_CONTENT)
         return Response(RFIDScanSerializer(scan).data)
 
+    @debounce.suppress_repeats("uid")
+    @idempotent
     def post(self, request):
         # Allow unauthenticated scans for development/local use
         # In production, you could add authentication here
-        
+        device = device_or_none(request)
+
         serializer = RFIDScanCreateSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        scan = RFIDScan.objects.create(**serializer.validated_data)
+        scan = RFIDScan.objects.create(device=device, **serializer.validated_data)
 
         # Update device telemetry if authenticated
+        if device is not None:
+            device.server_reachable = True
+            device.last_wifi_event = 'scan_post'
+            device.save(update_fields=["server_reachable", "last_wifi_event", "last_seen"])
+
+        trim_scans()
+
+        if self.compact:
+            return Response(compact.scan_payload(scan), status=status.HTTP_201_CREATED)
+        return Response(RFIDScanSerializer(scan).data, status=status.HTTP_201_CREATED)
+
+
+class DeviceScanFeedView(APIView):
+    """A reader's own scans, newest first, for the kiosk UI next to it.
+
+    GET ?limit=<n> returns the newest ``limit`` scans (default 20, max 200), read from
+    the (device, created_at) index. With ?after=<scan id> it returns the ``limit``
+    scans that follow ``after``, still newest first, so a poller that passes the
+    first (highest) id back as ``after`` sees every scan even when more than
+    ``limit`` arrived between polls.
+    """
+    MAX_LIMIT = 200
+
+    def get(self, request, device_id: int):
         try:
-            auth = DeviceTokenAuthentication()
-            res = auth.authenticate(request)
-            if res:
-                device, _ = res
-                device.server_reachable = True
-                device.last_wifi_event = 'scan_post'
-                device.save(update_fields=["server_reachable", "last_wifi_event", "last_seen"])
-        except:
-            # No authentication, but that's okay for scans
-            pass
+            after = int(request.GET.get("after") or 0)
+            limit = min(max(int(request.GET.get("limit") or 20), 1), self.MAX_LIMIT)
+        except ValueError:
+            return Response({"detail": "after and limit must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+        if not DeviceInstance.objects.filter(id=device_id).exists():
+            return Response({"detail": "Device not found."}, status=status.HTTP_404_NOT_FOUND)
+        scans = RFIDScan.objects.filter(device_id=device_id)
+        if after:
+            scans = list(scans.filter(id__gt=after).order_by("id")[:limit])[::-1]
+        else:
+            scans = scans.order_by("-created_at")[:limit]
+        return Response(RFIDScanSerializer(scans, many=True).data)
+
+
+class RFIDScanBatchView(APIView):
+    """Upload scans a reader buffered while offline, in one request and one transaction.
+
+    POST (X-Device-Token required)
+    { epoch?, scans: [{ seq, uid, name?, email?, scanned_at? | age_ms? }, ...] }
+    ``seq`` is the reader's own increasing counter. The device's highest stored seq is
+    kept on the DeviceInstance, and scans at or below it are skipped, so a reader can
+    resend a whole batch after a timeout even once older scans have been trimmed. Every
+    scan up to the response's ``last_seq`` is stored and can be dropped from the
+    reader's queue.
+
+    A reader whose counter can restart sends an ``epoch`` that changes with it (e.g. a
+    random id per boot); a new epoch starts the high-water mark over. Without one, a
+    skipped seq whose stored scan has a different UID shows the counter went back, and
+    the batch is refused with 409 and the stored ``last_seq`` so the reader can number
+    its queue after it.
+    """
+    def post(self, request):
+        device, error = device_from_token(request)
+        if error:
+            return error
+
+        serializer = RFIDScanBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        now = timezone.now()
+        scans = {}
+        for entry in serializer.validated_data["scans"]:
+            # First occurrence wins if a batch repeats a sequence number
+            if entry["seq"] in scans:
+                continue
+            scanned_at = entry.get("scanned_at")
+            if scanned_at is None and entry.get("age_ms") is not None:
+                scanned_at = now - timedelta(milliseconds=entry["age_ms"])
+            scans[entry["seq"]] = RFIDScan(
+                device=device,
+                seq=entry["seq"],
+                uid=entry["uid"].strip(),
+                name=entry.get("name", ""),
+                email=entry.get("email", ""),
+                scanned_at=scanned_at or now,
+            )
 
-        excess_ids = list(
-            RFIDScan.objects.order_by("-created_at").values_list("id", flat=True)[200:]
+        epoch = serializer.validated_data.get("epoch")
+        with transaction.atomic():
+            # Row lock: a concurrent retry of the same batch waits and then skips it all
+            high_water, stored_epoch = (
+                DeviceInstance.objects.select_for_update().filter(pk=device.pk)
+                .values_list("last_scan_seq", "scan_epoch").get()
+            )
+            if epoch is not None and epoch != stored_epoch:
+                if high_water is not None:
+                    # Old seqs would collide with the restarted counter's
+                    RFIDScan.objects.filter(device=device, seq__isnull=False).update(seq=None)
+                high_water, device.scan_epoch = None, epoch
+            skipped = {seq for seq in scans if high_water is not None and seq <= high_water}
+            if skipped and epoch is None:
+                stored = RFIDScan.objects.filter(device=device, seq__in=skipped).values_list("seq", "uid")
+                if any(scans[seq].uid != uid for seq, uid in stored):
+                    return Response(
+                        {"detail": "Sequence numbers went back; renumber scans after last_seq.",
+                         "last_seq": high_water},
+                        status=status.HTTP_409_CONFLICT,
+                    )
+            new = [scan for seq, scan in scans.items() if seq not in skipped]
+            RFIDScan.objects.bulk_create(new, ignore_conflicts=True)
+            device.server_reachable = True
+            device.last_wifi_event = 'scan_batch'
+            device.last_scan_seq = max([high_water or 0, *scans])
+            device.save(update_fields=[
+                "server_reachable", "last_wifi_event", "last_scan_seq", "scan_epoch", "last_seen",
+            ])
+
+        # Never trim rows of the batch just stored
+        trim_scans(keep=max(SCAN_RETENTION, len(new)))
+
+        return Response(
+            {"accepted": len(new), "duplicates": len(skipped), "last_seq": max(scans)},
+            status=status.HTTP_201_CREATED if new else status.HTTP_200_OK,
         )
-        if excess_ids:
-            RFIDScan.objects.filter(id__in=excess_ids).delete()
 
-        return Response(RFIDScanSerializer(scan).data, status=status.HTTP_201_CREATED)
+
+class KioskTapView(APIView):
+    """Card tap at a kiosk reader: log the scan, select the borrower, open a session.
+
+    POST (X-Device-Token required) { uid, name?, email?, action?: "borrow" | "return" }
+    Replaces the borrower lookup, rfid-scans and scan-id calls of a tap; QR scans then
+    go to KioskScanView.
+    """
+    @debounce.suppress_repeats("uid", "action", lifetime=kiosk.tap_lifetime)
+    @idempotent
+    def post(self, request):
+        device, error = device_from_token(request)
+        if error:
+            return error
+        serializer = KioskTapSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        uid = serializer.validated_data["uid"].strip()
+        name = serializer.validated_data.get("name", "").strip() or f"RFID {uid}"
+        email = serializer.validated_data.get("email", "").strip()
+
+        # Same registration-assist record as /api/scan-id, attributed to the reader
+        RFIDScan.objects.create(uid=uid, name=name, email=email, device=device)
+        trim_scans()
+
+        try:
+            borrower = entity_cache.borrower_by_uid(uid)
+        except Borrower.DoesNotExist:
+            kiosk.close(device)
+            return Response(
+                {"detail": "Borrower not registered. Please register first.", "uid": uid},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        session = kiosk.open_session(device, borrower, serializer.validated_data["action"])
+        open_loans = BorrowTransaction.objects.filter(borrower=borrower, status=BorrowTransaction.Status.OPEN).count()
+        return Response({"session": kiosk.session_payload(session), "open_loans": open_loans})
 
 
-class DeviceConfigView(APIView):
+class KioskScanView(APIView):
+    """QR scan at a kiosk reader: borrow or return the item for the session's borrower.
+
+    POST (X-Device-Token required) { item_qr }
+    The response carries the transaction, item, borrower and session state the display
+    needs. A return only closes a loan held by the session's borrower.
+    """
+    @idempotent
+    def post(self, request):
+        device, error = device_from_token(request)
+        if error:
+            return error
+        serializer = KioskScanSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        now = timezone.now()
+        session = kiosk.active_session(device, now)
+        if session is None:
+            return Response({"detail": "No active kiosk session. Tap a card first."}, status=status.HTTP_409_CONFLICT)
+
+        try:
+            item = entity_cache.item_by_qr(serializer.validated_data["item_qr"].strip())
+        except Item.DoesNotExist:
+            return Response({"detail": "Item not registered. Please register the item first."}, status=status.HTTP_404_NOT_FOUND)
+
+        borrower = session.borrower
+        if session.action == KioskSession.Action.RETURN:
+            closed = close_open_loan(item_id=item.pk, borrower_id=borrower.pk)
+            if closed is None:
+                return Response({"detail": "Open transaction not found"}, status=status.HTTP_404_NOT_FOUND)
+            tx = BorrowTransaction(status=BorrowTransaction.Status.RETURNED, **closed)
+            result, code = "returned", status.HTTP_200_OK
+        else:
+            tx = start_loan(borrower, item)
+            if tx is None:
+                return Response({"detail": "Item already borrowed"}, status=status.HTTP_409_CONFLICT)
+            result, code = "borrowed", status.HTTP_201_CREATED
+
+        kiosk.extend(session, now)
+        open_loans = BorrowTransaction.objects.filter(borrower=borrower, status=BorrowTransaction.Status.OPEN).count()
+        return Response({
+            "result": result,
+            "transaction": compact.transaction_payload(tx),
+            "item": {"id": item.id, "name": item.name, "qr_code": item.qr_code},
+            "open_loans": open_loans,
+            "session": kiosk.session_payload(session, now),
+        }, status=code)
+
+
+class KioskSessionView(APIView):
+    """GET the reader's active kiosk session (204 if none); DELETE ends it."""
+
+    def get(self, request):
+        device, error = device_from_token(request)
+        if error:
+            return error
+        session = kiosk.active_session(device)
+        if session is None:
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        return Response({"session": kiosk.session_payload(session)})
+
+    def delete(self, request):
+        device, error = device_from_token(request)
+        if error:
+            return error
+        kiosk.close(device)
+        # A held card must not bring the ended session back from the debounce window
+        debounce.forget(request.headers["X-Device-Token"])
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class DeviceConfigView(DeviceResponseMixin, APIView):
     """Get / update the device (ESP32) configuration used by the web app.
 
-    GET: returns current DeviceConfig (creates empty one if missing)
+    GET: returns current DeviceConfig (creates empty one if missing). Responses carry an
+         ETag derived from the config version; a matching If-None-Match gets a bare 304.
     POST: updates values (admin only)
     """
     def get(self, request):
-        obj, _ = DeviceConfig.objects.get_or_create(id=1)
         # If a device authenticates using X-Device-Token, return plaintext password + ssid
+        device = None
         try:
             auth = DeviceTokenAuthentication()
             res = auth.authenticate(request)
             if res:
                 device, _ = res
-                serializer = DeviceConfigForDeviceSerializer(obj)
-                return Response(serializer.data)
         except AuthenticationFailed:
             # Invalid token -> treat as anonymous (do not reveal password)
             pass
 
-        return Response(DeviceConfigSerializer(obj).data)
+        etag = config_cache.etag(for_device=device is not None)
+        headers = {'ETag': etag, 'Vary': 'X-Device-Token'}
+        if etag_matches(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        if device is not None:
+            return Response(config_cache.get_device_payload(), headers=headers)
+        return Response(DeviceConfigSerializer(config_cache.get_config()).data, headers=headers)
 
     def post(self, request):
         if not request.user.is_staff:
             return Response({"detail": "Admin access required."}, status=status.HTTP_403_FORBIDDEN)
 
-        obj, _ = DeviceConfig.objects.get_or_create(id=1)
+        # Fresh instance: the cached config is shared and must not be mutated
+        obj = DeviceConfig.objects.filter(id=1).first() or DeviceConfig(id=1)
         serializer = DeviceConfigSerializer(obj, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
         serializer.save()
@@ -394,8 +835,13 @@ class DeviceInstanceView(APIView):
     GET: returns list of registered devices (recent first).
     """
     def get(self, request):
+        bucket = int(time.time() // DEVICE_HEALTH_ETAG_SECONDS)
+        current = versions.validators(request, versions.DEVICE_TABLES, variant=f"health={bucket}")
+        if versions.not_modified(request, current):
+            return versions.not_modified_response(current)
         devices = DeviceInstance.objects.all()[:50]
-        return Response(DeviceInstanceSerializer(devices, many=True, context={'request': request}).data)
+        data = DeviceInstanceSerializer(devices, many=True, context={'request': request}).data
+        return versions.apply(Response(data), current)
 
     def post(self, request):
         data = request.data or {}
@@ -403,19 +849,27 @@ class DeviceInstanceView(APIView):
         if not ip:
             return Response({"detail": "IP required"}, status=status.HTTP_400_BAD_REQUEST)
 
-        obj, _ = DeviceInstance.objects.update_or_create(
-            ip=ip,
-            defaults={
-                'ssid': data.get('ssid', '')[:128],
-                'api_host': data.get('api_host', '')[:256],
-                'firmware': data.get('firmware', '')[:64],
-                'pairing_code': data.get('pairing_code', '')[:32],
-                'last_wifi_event': data.get('wifi_event', '')[:64],
-                'last_rssi': data.get('rssi'),
-                'last_disconnect_reason': data.get('disconnect_reason', '')[:128],
-                'server_reachable': bool(data.get('server_reachable', False)),
-            }
-        )
+        defaults = {
+            'ssid': data.get('ssid', '')[:128],
+            'api_host': data.get('api_host', '')[:256],
+            'firmware': data.get('firmware', '')[:64],
+            'pairing_code': data.get('pairing_code', '')[:32],
+            'last_wifi_event': data.get('wifi_event', '')[:64],
+            'last_rssi': data.get('rssi'),
+            'last_disconnect_reason': data.get('disconnect_reason', '')[:128],
+            'server_reachable': bool(data.get('server_reachable', False)),
+        }
+        # Firmware that tracks applied config reports it; older firmware omits the key
+        try:
+            if data.get('config_version') is not None:
+                defaults['config_version'] = max(int(data.get('config_version')), 0)
+        except (TypeError, ValueError):
+            pass
+        obj, _ = DeviceInstance.objects.update_or_create(ip=ip, defaults=defaults)
+        # A heartbeat half-opens a tripped circuit; healthy devices need no extra write
+        changed = health.heartbeat_changes(obj, defaults['server_reachable'])
+        if changed:
+            obj.save(update_fields=changed)
         return Response(DeviceInstanceSerializer(obj, context={'request': request}).data, status=status.HTTP_200_OK)
 
 
@@ -460,6 +914,26 @@ class PingView(APIView):
         return Response({"status": "ok"}, status=status.HTTP_200_OK)
 
 
+class MetricsView(APIView):
+    """Prometheus scrape endpoint for the request metrics (404 unless REQUEST_METRICS).
+
+    Labels include routes and device IPs: scrapers send "Authorization: Bearer
+    <METRICS_TOKEN>"; without a METRICS_TOKEN only staff users may read them.
+    """
+    def get(self, request):
+        if not getattr(settings, 'REQUEST_METRICS', False):
+            return Response({"detail": "Metrics are disabled."}, status=status.HTTP_404_NOT_FOUND)
+        token = getattr(settings, 'METRICS_TOKEN', '')
+        if token:
+            # Bytes: compare_digest rejects non-ASCII str
+            supplied = request.headers.get('Authorization', '').encode('utf-8')
+            if not hmac.compare_digest(supplied, f'Bearer {token}'.encode('utf-8')):
+                return Response({"detail": "Invalid metrics token."}, status=status.HTTP_401_UNAUTHORIZED)
+        elif not request.user.is_staff:
+            return Response({"detail": "Admin access required."}, status=status.HTTP_403_FORBIDDEN)
+        return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
 class ClaimDeviceView(APIView):
     """Allow an authenticated user to claim a device by providing the pairing code."""
     permission_classes = [IsAuthenticated]
@@ -498,17 +972,23 @@ class DeviceInstanceTokenView(APIView):
         return Response({"api_token": token})
 
 
+def _target_address(target: str) -> tuple[str, int]:
+    """Split a device address ("10.0.0.5" or "10.0.0.5:8080") into (host, port); port defaults to 80."""
+    host, sep, port = str(target).rpartition(':')
+    if sep and port.isdigit() and ':' not in host:
+        return host, int(port)
+    return str(target), 80
+
+
+@health.circuit_breaker
+@metrics.device_operation("push_config")
 def push_config_to_target(target_ip, retries: int = 3, reboot_on_reset: bool = False):
     """Helper that posts the canonical DeviceConfig to the target device ip and returns a tuple (ok_bool, response_or_detail, http_code).
 
     Performs a lightweight TCP probe to ensure the device is reachable quickly, increases the POST timeout, and retries transient errors.
+    On success the pushed config version is recorded on the matching DeviceInstance.
     """
-    obj, _ = DeviceConfig.objects.get_or_create(id=1)
-    payload = {
-        'ssid': obj.ssid or '',
-        'password': obj.get_password() or '',
-        'api_host': obj.api_host or ''
-    }
+    payload = config_cache.get_device_payload()
     import urllib.request, json, urllib.error, socket, time, errno
     url = f"http://{target_ip}/apply-config"
     data = json.dumps(payload).encode('utf-8')
@@ -516,8 +996,9 @@ def push_config_to_target(target_ip, retries: int = 3, reboot_on_reset: bool = F
 
     # Quick TCP-level probe to fail fast if device is offline/unreachable
     try:
-        sock = socket.create_connection((target_ip, 80), timeout=3)
-        sock.close()
+        with metrics.device_span('tcp_connect', target_ip):
+            sock = socket.create_connection(_target_address(target_ip), timeout=3)
+            sock.close()
     except Exception as e:
         logging.warning("Push to %s TCP connect failed: %s", target_ip, e)
         return False, f"TCP connect failed: {e}", 502
@@ -525,7 +1006,7 @@ def push_config_to_target(target_ip, retries: int = 3, reboot_on_reset: bool = F
     # Lightweight HTTP GET probe before POST to detect flaky HTTP servers
     try:
         probe_req = urllib.request.Request(f'http://{target_ip}/', method='GET')
-        with urllib.request.urlopen(probe_req, timeout=2) as _:
+        with metrics.device_span('probe', target_ip), urllib.request.urlopen(probe_req, timeout=2) as _:
             logging.debug('Pre-POST GET probe to %s succeeded', target_ip)
     except Exception as e:
         # Not fatal; log and continue. Some devices may only accept POST or briefly reset when Wi-Fi changes.
@@ -536,8 +1017,10 @@ def push_config_to_target(target_ip, retries: int = 3, reboot_on_reset: bool = F
         attempt += 1
         try:
             # Increase timeout a bit for noisy networks
-            with urllib.request.urlopen(req, timeout=20) as r:
+            with metrics.device_span('post', target_ip, attempt=attempt), urllib.request.urlopen(req, timeout=20) as r:
                 resp_body = r.read().decode('utf-8')
+                if DeviceInstance.objects.filter(ip=target_ip).update(config_version=payload['config_version']):
+                    versions.bump(DeviceInstance._meta.db_table)
                 return True, {'code': r.getcode(), 'body': resp_body}, r.getcode()
         except socket.timeout as e:
             logging.warning("Push to %s timed out (attempt %d/%d): %s", target_ip, attempt, retries + 1, e)
@@ -587,12 +1070,15 @@ def push_config_to_target(target_ip, retries: int = 3, reboot_on_reset: bool = F
 
         # Retry logic for transient errors (timeout/temporary URLError)
         if attempt <= retries and code in (504, 502):
+            metrics.inc("rfid_device_retries_total", 1, "Retried device calls", op="push_config", target=str(target_ip))
             time.sleep(0.8 * attempt)  # small backoff
             continue
 
         return False, detail, code
 
 
+@health.circuit_breaker
+@metrics.device_operation("command")
 def push_command_to_target(target_ip, action: str, payload: dict = None, timeout: int = 10):
     """POST a control command to the target device at /control. Returns (ok, detail, code)."""
     import urllib.request, urllib.error, json, socket
@@ -603,7 +1089,7 @@ def push_command_to_target(target_ip, action: str, payload: dict = None, timeout
     data = json.dumps(body).encode('utf-8')
     req = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'}, method='POST')
     try:
-        with urllib.request.urlopen(req, timeout=timeout) as r:
+        with metrics.device_span('post', target_ip, action=action), urllib.request.urlopen(req, timeout=timeout) as r:
             resp_body = r.read().decode('utf-8')
             return True, {'code': r.getcode(), 'body': resp_body}, r.getcode()
     except socket.timeout:
@@ -640,7 +1126,7 @@ def push_command_to_target(target_ip, action: str, payload: dict = None, timeout
                         req_fb = urllib.request.Request(url_fb, method='GET')
                     else:
                         req_fb = urllib.request.Request(url_fb, data=body_fb, headers={'Content-Type': ctype}, method='POST')
-                    with urllib.request.urlopen(req_fb, timeout=timeout) as r2:
+                    with metrics.device_span('fallback', target_ip, fallback=label), urllib.request.urlopen(req_fb, timeout=timeout) as r2:
                         resp_body = r2.read().decode('utf-8', errors='ignore')
                         logging.info('Fallback %s to %s succeeded: %s', label, target_ip, r2.getcode())
                         return True, {'code': r2.getcode(), 'body': resp_body, 'fallback': label}, r2.getcode()
@@ -679,7 +1165,7 @@ def push_command_to_target(target_ip, action: str, payload: dict = None, timeout
                                 req_fb = urllib.request.Request(url_fb, method='GET')
                             else:
                                 req_fb = urllib.request.Request(url_fb, data=body_fb, headers={'Content-Type': ctype}, method='POST')
-                            with urllib.request.urlopen(req_fb, timeout=timeout) as r2:
+                            with metrics.device_span('fallback', target_ip, fallback=label), urllib.request.urlopen(req_fb, timeout=timeout) as r2:
                                 resp_body = r2.read().decode('utf-8', errors='ignore')
                                 logging.info('Fallback %s to %s succeeded: %s', label, target_ip, r2.getcode())
                                 return True, {'code': r2.getcode(), 'body': resp_body, 'fallback': label}, r2.getcode()
@@ -715,7 +1201,8 @@ class PushDeviceConfigView(APIView):
             target_ip = ip
 
         reboot_on_reset = bool(request.data.get('reboot_on_reset', False))
-        ok, resp, code = push_config_to_target(target_ip, reboot_on_reset=reboot_on_reset)
+        # An explicit per-device action always tries the device, open circuit or not
+        ok, resp, code = push_config_to_target(target_ip, reboot_on_reset=reboot_on_reset, force=True)
         if ok:
             return Response({"status": "ok", "code": resp.get('code'), "body": resp.get('body'), "reboot_attempted": reboot_on_reset})
         # include reboot flag for diagnosis
@@ -739,7 +1226,7 @@ class ProvisionDeviceView(APIView):
             return Response({"detail": "Only device owner or admin can provision."}, status=status.HTTP_403_FORBIDDEN)
 
         reboot_on_reset = bool(request.data.get('reboot_on_reset', False))
-        ok, resp, code = push_config_to_target(device.ip, reboot_on_reset=reboot_on_reset)
+        ok, resp, code = push_config_to_target(device.ip, reboot_on_reset=reboot_on_reset, force=True)
         if ok:
             return Response({"status": "ok", "code": resp.get('code'), "body": resp.get('body'), "reboot_attempted": reboot_on_reset})
         return Response({"status": "error", "detail": resp, "reboot_attempted": reboot_on_reset}, status=code)
@@ -769,29 +1256,52 @@ class DeviceControlView(APIView):
                 return Response({"detail": "Admin access required for raw IP commands."}, status=status.HTTP_403_FORBIDDEN)
             target_ip = ip
 
-        ok, resp, code = push_command_to_target(target_ip, action, payload=request.data.get('payload'))
+        ok, resp, code = push_command_to_target(target_ip, action, payload=request.data.get('payload'), force=True)
         if ok:
             return Response({"status": "ok", "code": resp.get('code'), "body": resp.get('body')})
         return Response({"status": "error", "detail": resp}, status=code)
 
 
 class PushDeviceConfigAllView(APIView):
-    """Admin-only: push current DeviceConfig to all discovered devices."""
+    """Admin-only: push current DeviceConfig to all discovered devices.
+
+    POST { stale_only: true } only pushes to devices whose applied config_version
+    differs from the current DeviceConfig version. Devices with an open circuit
+    (core.health) are skipped and listed in ``circuit_open`` unless { force: true }.
+    """
     def post(self, request):
         if not request.user.is_staff:
             return Response({"detail": "Admin access required."}, status=status.HTTP_403_FORBIDDEN)
+        serializer = PushConfigAllSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        stale_only = serializer.validated_data['stale_only']
+        force = serializer.validated_data['force']
+        version = config_cache.current_version()
         devices = DeviceInstance.objects.all()
+        skipped = 0
+        if stale_only:
+            # NULL config_version (never pushed) counts as stale
+            skipped = devices.filter(config_version=version).count()
+            devices = devices.exclude(config_version=version)
+        devices = list(devices)
+        circuit_open = []
+        if not force:
+            now = timezone.now()
+            circuit_open = [d.id for d in devices if not health.allows_call(d, now)]
+            devices = [d for d in devices if d.id not in circuit_open]
         results = []
         for d in devices:
-            ok, resp, code = push_config_to_target(d.ip)
+            ok, resp, code = push_config_to_target(d.ip, force=force)
             results.append({ 'device_id': d.id, 'ip': d.ip, 'ok': ok, 'detail': resp })
-        return Response({ 'results': results })
+        return Response({ 'results': results, 'config_version': version, 'skipped': skipped, 'circuit_open': circuit_open })
 
 
 class ScanDevicesView(APIView):
-    """Quick LAN scan to discover ESP devices on the local /24 network.
+    """Discover ESP devices on the local network.
 
-    GET: returns a list of discovered devices (ip, probe_code, body_snippet)
+    GET: returns the devices that recently announced themselves over UDP (core.discovery);
+    when none have, or with ?sweep=1, a quick scan of the local /24 instead
+    (ip, probe_code, body_snippet). "source" says which answered.
     """
     def get_local_ip(self) -> str:
         """Return a likely outbound local IP (doesn't require internet access)."""
@@ -813,9 +1323,10 @@ class ScanDevicesView(APIView):
         """Probe a single IP for an HTTP response on port 80. Returns dict with info on success."""
         result = {'ip': ip, 'ok': False, 'code': None, 'body': None}
         try:
-            # Quick TCP probe
-            sock = socket.create_connection((ip, 80), timeout=0.6)
-            sock.close()
+            # Quick TCP probe; unused addresses are not labelled per IP
+            with metrics.device_span('scan_tcp'):
+                sock = socket.create_connection((ip, 80), timeout=0.6)
+                sock.close()
         except Exception as e:
             return result
 
@@ -823,7 +1334,7 @@ class ScanDevicesView(APIView):
         for path in ('/', '/info', '/device-info'):
             try:
                 req = urllib.request.Request(f'http://{ip}{path}', method='GET')
-                with urllib.request.urlopen(req, timeout=1.2) as r:
+                with metrics.device_span('scan_http', ip, path=path), urllib.request.urlopen(req, timeout=1.2) as r:
                     body = r.read(1024).decode('utf-8', errors='ignore')
                     result.update({'ok': True, 'code': r.getcode(), 'body': body[:512]})
                     return result
@@ -834,7 +1345,22 @@ class ScanDevicesView(APIView):
         result['ok'] = True
         return result
 
+    def announced_devices(self) -> List[Dict]:
+        return [
+            {
+                'ip': d.ip, 'ok': True, 'code': None, 'body': None,
+                'firmware': d.firmware, 'pairing_code': d.pairing_code,
+                'announced_at': DateTimeField().to_representation(d.announced_at),
+            }
+            for d in discovery.announced().only('ip', 'firmware', 'pairing_code', 'announced_at')
+        ]
+
     def get(self, request):
+        if request.GET.get('sweep') not in ('1', 'true'):
+            devices = self.announced_devices()
+            if devices:
+                return Response({'devices': devices, 'source': 'announcements'})
+
         # Determine local /24 to scan
         local_ip = self.get_local_ip()
         parts = local_ip.split('.')
@@ -845,7 +1371,7 @@ class ScanDevicesView(APIView):
 
         results: List[Dict] = []
         # Parallelize probes
-        with concurrent.futures.ThreadPoolExecutor(max_workers=40) as ex:
+        with metrics.device_call(), concurrent.futures.ThreadPoolExecutor(max_workers=40) as ex:
             futures = {ex.submit(self.probe, ip): ip for ip in candidates}
             for fut in concurrent.futures.as_completed(futures, timeout=30):
                 try:
@@ -855,7 +1381,7 @@ class ScanDevicesView(APIView):
                 except Exception:
                     continue
 
-        return Response({'devices': results})
+        return Response({'devices': results, 'source': 'sweep'})
 
 
 class BorrowerRegistrationView(APIView):
@@ -1009,11 +1535,12 @@ class ItemQRCodeView(APIView):
 
 @login_required
 def dashboard(request):
-    # Show all transactions as a log book (most recent first)
-    all_transactions = BorrowTransaction.objects.all()[:100]
+    # Show all transactions as a log book (most recent first); the templates show borrower and item names
+    transactions = BorrowTransaction.objects.select_related("borrower", "item")
+    all_transactions = transactions.all()[:100]
     context = {
-        "open_transactions": BorrowTransaction.objects.filter(status=BorrowTransaction.Status.OPEN)[:50],
-        "recent_returns": BorrowTransaction.objects.filter(status=BorrowTransaction.Status.RETURNED)[:50],
+        "open_transactions": transactions.filter(status=BorrowTransaction.Status.OPEN)[:50],
+        "recent_returns": transactions.filter(status=BorrowTransaction.Status.RETURNED)[:50],
         "all_transactions": all_transactions,  # Log book - all transactions
         "borrower_count": Borrower.objects.count(),
         "item_count": Item.objects.count(),
@@ -1,165 +0,0 @@
-from pathlib import Path
-import os
-
-
-BASE_DIR = Path(__file__).resolve().parent.parent
-
-SECRET_KEY = os.environ.get("DJANGO_SECRET_KEY", "dev-insecure-secret-key-change-me")
-
-DEBUG = True
-
-ALLOWED_HOSTS: list[str] = ["*"]
-
-
-INSTALLED_APPS = [
-    "django.contrib.admin",
-    "django.contrib.auth",
-    "django.contrib.contenttypes",
-    "django.contrib.sessions",
-    "django.contrib.messages",
-    "django.contrib.staticfiles",
-    # Third-party
-    "rest_framework",
-    "corsheaders",
-    "django_extensions",  # For runserver_plus with SSL support
-    # Local
-    "core",
-]
-
-MIDDLEWARE = [
-    "django.middleware.security.SecurityMiddleware",
-    "django.contrib.sessions.middleware.SessionMiddleware",
-    "corsheaders.middleware.CorsMiddleware",
-    "django.middleware.common.CommonMiddleware",
-    "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
-    "django.contrib.messages.middleware.MessageMiddleware",
-    "django.middleware.clickjacking.XFrameOptionsMiddleware",
-]
-
-ROOT_URLCONF = "rfid_borrowing.urls"
-
-TEMPLATES = [
-    {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
-        "DIRS": [BASE_DIR / "templates"],
-        "APP_DIRS": True,
-        "OPTIONS": {
-            "context_processors": [
-                "django.template.context_processors.debug",
-                "django.template.context_processors.request",
-                "django.contrib.auth.context_processors.auth",
-                "django.contrib.messages.context_processors.messages",
-            ],
-        },
-    },
-]
-
-WSGI_APPLICATION = "rfid_borrowing.wsgi.application"
-ASGI_APPLICATION = "rfid_borrowing.asgi.application"
-
-
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
-    }
-}
-
-
-AUTH_PASSWORD_VALIDATORS = [
-    {
-        "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
-    },
-    {
-        "NAME": "django.contrib.auth.password_validation.MinimumLengthValidator",
-    },
-    {
-        "NAME": "django.contrib.auth.password_validation.CommonPasswordValidator",
-    },
-    {
-        "NAME": "django.contrib.auth.password_validation.NumericPasswordValidator",
-    },
-]
-
-
-LANGUAGE_CODE = "en-us"
-TIME_ZONE = "UTC"
-USE_I18N = True
-USE_TZ = True
-
-
-STATIC_URL = "/static/"
-STATICFILES_DIRS = [BASE_DIR / "static"]
-STATIC_ROOT = BASE_DIR / "staticfiles"
-
-
-DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
-
-
-REST_FRAMEWORK = {
-    "DEFAULT_RENDERER_CLASSES": [
-        "rest_framework.renderers.JSONRenderer",
-        "rest_framework.renderers.BrowsableAPIRenderer",
-    ],
-}
-
-
-CORS_ALLOW_ALL_ORIGINS = True
-
-
-CSRF_TRUSTED_ORIGINS: list[str] = [
-    "https://localhost",
-    "https://localhost:8443",
-    "https://127.0.0.1",
-    "https://127.0.0.1:8443",
-    "https://192.168.1.63",
-    "https://192.168.1.63:8443",
-]
-
-LAN_IP = os.environ.get("LAN_IP")
-if LAN_IP:
-    CSRF_TRUSTED_ORIGINS.extend(
-        [
-            f"http://{LAN_IP}",
-            f"https://{LAN_IP}",
-            f"https://{LAN_IP}:8443",
-        ]
-    )
-
-
-LOGIN_URL = "core:login"
-LOGIN_REDIRECT_URL = "core:dashboard"
-LOGOUT_REDIRECT_URL = "core:login"
-
-# Try to auto-add the machine's LAN IP (useful for mobile access like https://<LAN_IP>:8443)
-try:
-    import socket
-    def _get_local_ip() -> str | None:
-        try:
-            # Preferred method: discover outbound interface IP
-            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            s.connect(("8.8.8.8", 80))
-            ip = s.getsockname()[0]
-            s.close()
-            return ip
-        except Exception:
-            try:
-                return socket.gethostbyname(socket.gethostname())
-            except Exception:
-                return None
-
-    _ip = _get_local_ip()
-    if _ip:
-        CSRF_TRUSTED_ORIGINS.extend(
-            [
-                f"http://{_ip}",
-                f"https://{_ip}",
-                f"https://{_ip}:8443",
-            ]
-        )
-except Exception:
-    # Best-effort only; safe to ignore failures in dev
-    pass
-
-
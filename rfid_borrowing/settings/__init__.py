@@ -0,0 +1,20 @@
+"""Settings package; DJANGO_ENV selects the profile.
+
+    DJANGO_ENV=dev   (default) DEBUG, browsable API, django_extensions, LAN IP discovery
+    DJANGO_ENV=prod  JSON-only API, cached templates, trimmed middleware, no import-time network calls
+
+DJANGO_SETTINGS_MODULE stays "rfid_borrowing.settings"; a profile module can also be
+selected directly (e.g. "rfid_borrowing.settings.prod").
+"""
+import os
+
+_env = os.environ.get("DJANGO_ENV", "dev").strip().lower()
+
+if _env in ("prod", "production"):
+    from .prod import *  # noqa: F401,F403
+elif _env in ("dev", "development", ""):
+    from .dev import *  # noqa: F401,F403
+else:
+    from django.core.exceptions import ImproperlyConfigured
+
+    raise ImproperlyConfigured(f"Unknown DJANGO_ENV {_env!r}; expected 'dev' or 'prod'")
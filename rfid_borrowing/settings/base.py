@@ -0,0 +1,239 @@
+"""Settings shared by every profile. See rfid_borrowing/settings/__init__.py."""
+from pathlib import Path
+import os
+
+import django
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+SECRET_KEY = os.environ.get("DJANGO_SECRET_KEY", "dev-insecure-secret-key-change-me")
+
+DEBUG = False
+
+# Fernet keys used to encrypt device secrets (core.crypto). The first key encrypts;
+# the others are still accepted for decryption so keys can be rotated.
+FERNET_KEYS = [k.strip() for k in os.environ.get("FERNET_KEYS", "").split(",") if k.strip()]
+FERNET_KEY = os.environ.get("FERNET_KEY")
+
+# Seconds another worker process may serve a cached DeviceConfig (core.config_cache)
+DEVICE_CONFIG_CACHE_TTL = int(os.environ.get("DEVICE_CONFIG_CACHE_TTL", "60"))
+
+# UID/QR resolution cache (core.entity_cache): entries kept, and seconds another worker
+# may serve a cached row or a cached "not registered"
+ENTITY_CACHE_SIZE = int(os.environ.get("ENTITY_CACHE_SIZE", "4096"))
+ENTITY_CACHE_TTL = int(os.environ.get("ENTITY_CACHE_TTL", "300"))
+ENTITY_CACHE_MISS_TTL = int(os.environ.get("ENTITY_CACHE_MISS_TTL", "5"))
+
+# Seconds within which an identical tap from the same reader is answered from memory
+# (core.debounce); 0 disables
+SCAN_DEBOUNCE_SECONDS = float(os.environ.get("SCAN_DEBOUNCE_SECONDS", "2"))
+
+# Seconds a kiosk session (core.kiosk) stays open after a card tap or QR scan
+KIOSK_SESSION_TTL = int(os.environ.get("KIOSK_SESSION_TTL", "60"))
+
+# Most rows a borrower/item search returns (core.search); ?limit= can ask for fewer
+SEARCH_MAX_RESULTS = int(os.environ.get("SEARCH_MAX_RESULTS", "100"))
+
+# Reader allow-list (core.allowlist): changes kept for delta sync (older readers get a
+# full snapshot) and the Bloom filter's target false-positive rate
+ALLOWLIST_CHANGELOG_SIZE = int(os.environ.get("ALLOWLIST_CHANGELOG_SIZE", "10000"))
+ALLOWLIST_BLOOM_FP_RATE = float(os.environ.get("ALLOWLIST_BLOOM_FP_RATE", "0.01"))
+
+# Device circuit breaker (core.health): consecutive network failures before pushes skip a
+# device, seconds before a trial call is allowed without a heartbeat, and heartbeat
+# silence after which a device's health score starts halving
+DEVICE_CIRCUIT_FAILURES = int(os.environ.get("DEVICE_CIRCUIT_FAILURES", "3"))
+DEVICE_CIRCUIT_COOLDOWN = int(os.environ.get("DEVICE_CIRCUIT_COOLDOWN", "900"))
+DEVICE_OFFLINE_AFTER = int(os.environ.get("DEVICE_OFFLINE_AFTER", "300"))
+
+# Passive device discovery (core.discovery): UDP port readers announce themselves on,
+# seconds an announcement keeps a device in the discovered set, and minimum seconds
+# between database writes for an unchanged announcement
+DEVICE_DISCOVERY_PORT = int(os.environ.get("DEVICE_DISCOVERY_PORT", "41234"))
+DEVICE_DISCOVERY_MAX_AGE = int(os.environ.get("DEVICE_DISCOVERY_MAX_AGE", "600"))
+DEVICE_DISCOVERY_MIN_INTERVAL = int(os.environ.get("DEVICE_DISCOVERY_MIN_INTERVAL", "60"))
+
+# Seconds a stored Idempotency-Key response is replayed (core.idempotency)
+IDEMPOTENCY_TTL = int(os.environ.get("IDEMPOTENCY_TTL", str(24 * 3600)))
+# Seconds after which a key whose first request never stored a response is reclaimed
+IDEMPOTENCY_PROCESSING_TIMEOUT = int(os.environ.get("IDEMPOTENCY_PROCESSING_TIMEOUT", "60"))
+
+ALLOWED_HOSTS: list[str] = ["*"]
+
+
+INSTALLED_APPS = [
+    "django.contrib.admin",
+    "django.contrib.auth",
+    "django.contrib.contenttypes",
+    "django.contrib.sessions",
+    "django.contrib.messages",
+    "django.contrib.staticfiles",
+    # Third-party
+    "rest_framework",
+    "corsheaders",
+    # Local
+    "core",
+]
+
+MIDDLEWARE = [
+    # Outermost so its timings cover every other middleware; inert unless REQUEST_METRICS
+    "core.middleware.RequestMetricsMiddleware",
+    "django.middleware.security.SecurityMiddleware",
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "corsheaders.middleware.CorsMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "django.middleware.csrf.CsrfViewMiddleware",
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "django.contrib.messages.middleware.MessageMiddleware",
+    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+]
+
+ROOT_URLCONF = "rfid_borrowing.urls"
+
+TEMPLATES = [
+    {
+        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "DIRS": [BASE_DIR / "templates"],
+        "APP_DIRS": True,
+        "OPTIONS": {
+            "context_processors": [
+                "django.template.context_processors.debug",
+                "django.template.context_processors.request",
+                "django.contrib.auth.context_processors.auth",
+                "django.contrib.messages.context_processors.messages",
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = "rfid_borrowing.wsgi.application"
+ASGI_APPLICATION = "rfid_borrowing.asgi.application"
+
+
+# Database profile, selected with DB_ENGINE:
+#   sqlite   (default) - single file, tuned for concurrent scan/heartbeat writes
+#   postgres           - persistent connections, optional psycopg pool / PgBouncer
+DB_ENGINE = os.environ.get("DB_ENGINE", "sqlite").lower()
+
+if DB_ENGINE in ("postgres", "postgresql"):
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.environ.get("DB_NAME", "rfid_borrowing"),
+            "USER": os.environ.get("DB_USER", ""),
+            "PASSWORD": os.environ.get("DB_PASSWORD", ""),
+            "HOST": os.environ.get("DB_HOST", ""),
+            "PORT": os.environ.get("DB_PORT", ""),
+            "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", "60")),
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {},
+        }
+    }
+    if os.environ.get("DB_POOL_MAX_SIZE"):
+        # Built-in psycopg connection pool (Django 5.1+, psycopg[pool]); replaces CONN_MAX_AGE
+        DATABASES["default"]["CONN_MAX_AGE"] = 0
+        DATABASES["default"]["OPTIONS"]["pool"] = {
+            "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", "2")),
+            "max_size": int(os.environ.get("DB_POOL_MAX_SIZE")),
+        }
+    if os.environ.get("DB_PGBOUNCER") == "1":
+        # Transaction-pooling PgBouncer cannot hold server-side cursors across statements
+        DATABASES["default"]["DISABLE_SERVER_SIDE_CURSORS"] = True
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.environ.get("DB_PATH") or BASE_DIR / "db.sqlite3",
+            "OPTIONS": {
+                # Busy timeout (seconds): wait for the write lock instead of raising "database is locked"
+                "timeout": float(os.environ.get("DB_BUSY_TIMEOUT", "20")),
+            },
+        }
+    }
+    if django.VERSION >= (5, 1):
+        # Take the write lock when the transaction starts, so a read-then-write
+        # transaction never fails on a lock upgrade without honouring the busy timeout
+        DATABASES["default"]["OPTIONS"]["transaction_mode"] = "IMMEDIATE"
+
+# PRAGMAs applied to every new SQLite connection (core.signals); set SQLITE_TUNING=0 to disable
+SQLITE_PRAGMAS: dict[str, str] = {}
+if os.environ.get("SQLITE_TUNING", "1") != "0":
+    SQLITE_PRAGMAS = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": os.environ.get("SQLITE_MMAP_SIZE", str(128 * 1024 * 1024)),
+        "cache_size": "-20000",
+        "temp_store": "MEMORY",
+    }
+
+# Per-request timing (Server-Timing header) and the /api/metrics endpoint.
+# METRICS_TOKEN, when set, is required as "Authorization: Bearer <token>" to scrape;
+# without it only logged-in staff can read /api/metrics.
+REQUEST_METRICS = os.environ.get("REQUEST_METRICS") == "1"
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.MinimumLengthValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.CommonPasswordValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.NumericPasswordValidator",
+    },
+]
+
+
+LANGUAGE_CODE = "en-us"
+TIME_ZONE = "UTC"
+USE_I18N = True
+USE_TZ = True
+
+
+STATIC_URL = "/static/"
+STATICFILES_DIRS = [BASE_DIR / "static"]
+STATIC_ROOT = BASE_DIR / "staticfiles"
+
+
+DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+
+REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": [
+        "rest_framework.renderers.JSONRenderer",
+    ],
+}
+
+
+CORS_ALLOW_ALL_ORIGINS = True
+
+
+CSRF_TRUSTED_ORIGINS: list[str] = [
+    "https://localhost",
+    "https://localhost:8443",
+    "https://127.0.0.1",
+    "https://127.0.0.1:8443",
+    "https://192.168.1.63",
+    "https://192.168.1.63:8443",
+]
+
+LAN_IP = os.environ.get("LAN_IP")
+if LAN_IP:
+    CSRF_TRUSTED_ORIGINS.extend(
+        [
+            f"http://{LAN_IP}",
+            f"https://{LAN_IP}",
+            f"https://{LAN_IP}:8443",
+        ]
+    )
+
+
+LOGIN_URL = "core:login"
+LOGIN_REDIRECT_URL = "core:dashboard"
+LOGOUT_REDIRECT_URL = "core:login"
@@ -0,0 +1,49 @@
+"""Development profile: debugging aids on, LAN IP auto-added to CSRF origins."""
+from .base import *  # noqa: F401,F403
+from .base import CSRF_TRUSTED_ORIGINS, INSTALLED_APPS, REST_FRAMEWORK
+
+
+DEBUG = True
+
+INSTALLED_APPS = INSTALLED_APPS[:-1] + [
+    "django_extensions",  # For runserver_plus with SSL support
+    INSTALLED_APPS[-1],
+]
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    "DEFAULT_RENDERER_CLASSES": [
+        "rest_framework.renderers.JSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+}
+
+# Try to auto-add the machine's LAN IP (useful for mobile access like https://<LAN_IP>:8443)
+try:
+    import socket
+    def _get_local_ip() -> str | None:
+        try:
+            # Preferred method: discover outbound interface IP
+            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            s.connect(("8.8.8.8", 80))
+            ip = s.getsockname()[0]
+            s.close()
+            return ip
+        except Exception:
+            try:
+                return socket.gethostbyname(socket.gethostname())
+            except Exception:
+                return None
+
+    _ip = _get_local_ip()
+    if _ip:
+        CSRF_TRUSTED_ORIGINS.extend(
+            [
+                f"http://{_ip}",
+                f"https://{_ip}",
+                f"https://{_ip}:8443",
+            ]
+        )
+except Exception:
+    # Best-effort only; safe to ignore failures in dev
+    pass
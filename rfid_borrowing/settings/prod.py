@@ -0,0 +1,52 @@
+"""Production profile.
+
+DEBUG is off (no per-request SQL capture), the API renders JSON only, templates are
+compiled once by the cached loader, and nothing here touches the network at import
+time: set LAN_IP / DJANGO_ALLOWED_HOSTS explicitly instead of relying on discovery.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .base import *  # noqa: F401,F403
+from .base import MIDDLEWARE, REST_FRAMEWORK, SECRET_KEY, TEMPLATES
+
+
+DEBUG = False
+
+if SECRET_KEY.startswith("dev-insecure"):
+    raise ImproperlyConfigured("Set DJANGO_SECRET_KEY for the prod settings profile")
+
+ALLOWED_HOSTS = [h.strip() for h in os.environ.get("DJANGO_ALLOWED_HOSTS", "*").split(",") if h.strip()]
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    "DEFAULT_RENDERER_CLASSES": ["rest_framework.renderers.JSONRenderer"],
+}
+
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        "APP_DIRS": False,
+        "OPTIONS": {
+            **TEMPLATES[0]["OPTIONS"],
+            "loaders": [
+                (
+                    "django.template.loaders.cached.Loader",
+                    [
+                        "django.template.loaders.filesystem.Loader",
+                        "django.template.loaders.app_directories.Loader",
+                    ],
+                ),
+            ],
+        },
+    },
+]
+
+# The web UI is served same-origin and ESP32 readers do not send CORS preflights, so
+# the CORS middleware only runs when cross-origin browser clients are configured.
+CORS_ALLOW_ALL_ORIGINS = False
+CORS_ALLOWED_ORIGINS = [o.strip() for o in os.environ.get("CORS_ALLOWED_ORIGINS", "").split(",") if o.strip()]
+CORS_URLS_REGEX = r"^/api/.*$"
+if not CORS_ALLOWED_ORIGINS:
+    MIDDLEWARE = [m for m in MIDDLEWARE if m != "corsheaders.middleware.CorsMiddleware"]
@@ -0,0 +1,99 @@
+"""Benchmark push_config_to_target / push_command_to_target against emulated devices.
+
+Starts a tools/device_emulator.py fleet in a background event loop, then calls the
+real push helpers from core.views concurrently (as PushDeviceConfigAllView would for
+the whole fleet when --workers 1) and reports outcome counts and latency percentiles.
+
+Accepts the emulator's fleet flags, e.g.
+
+    python tools/bench_push.py --devices 100 --workers 20 --latency-ms 40 --reset-rate 0.1
+    python tools/bench_push.py --devices 50 --host 127.0.0.1 --base-port 9000 --mode command --action reboot
+
+Uses a throwaway SQLite database unless DB_PATH is set.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import concurrent.futures
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'tools'))
+
+import device_emulator  # noqa: E402
+
+
+def setup_django():
+    if not os.environ.get('DB_PATH'):
+        fd, path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(fd)
+        os.environ['DB_PATH'] = path
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'rfid_borrowing.settings')
+    import django
+    from django.core.management import call_command
+    django.setup()
+    call_command('migrate', verbosity=0)
+    from core.models import DeviceConfig
+    cfg, _ = DeviceConfig.objects.get_or_create(id=1)
+    cfg.ssid, cfg.api_host = 'BENCH-NET', 'http://127.0.0.1:8000'
+    cfg.set_password('bench-password')
+    cfg.save()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mode', choices=('config', 'command'), default='config')
+    parser.add_argument('--action', default='disconnect', help='control action for --mode command')
+    parser.add_argument('--workers', type=int, default=1, help='concurrent pushes')
+    parser.add_argument('--retries', type=int, default=3)
+    args, rest = parser.parse_known_args()
+    fleet = device_emulator.fleet_from_args(device_emulator.parse_args(rest))
+
+    setup_django()
+    from core.views import push_command_to_target, push_config_to_target
+
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    asyncio.run_coroutine_threadsafe(fleet.start(), loop).result()
+
+    def push(device):
+        t0 = time.perf_counter()
+        if args.mode == 'config':
+            ok, detail, code = push_config_to_target(device.target, retries=args.retries)
+        else:
+            ok, detail, code = push_command_to_target(device.target, args.action)
+        fallback = detail.get('fallback') if ok and isinstance(detail, dict) else None
+        return time.perf_counter() - t0, ok, code, fallback
+
+    started = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=args.workers) as ex:
+        results = list(ex.map(push, fleet.devices))
+    wall = time.perf_counter() - started
+    asyncio.run_coroutine_threadsafe(fleet.stop(), loop).result()
+
+    lat = sorted(r[0] for r in results)
+    outcomes = Counter(('ok' if r[1] else 'fail', r[2]) for r in results)
+    fallbacks = Counter(r[3] for r in results if r[3])
+
+    def pct(p):
+        return lat[min(len(lat) - 1, int(len(lat) * p))] * 1000
+
+    print(f'{args.mode} push to {len(results)} devices, {args.workers} worker(s): {wall:.2f}s wall')
+    print(f'latency ms  p50 {pct(0.5):.1f}  p95 {pct(0.95):.1f}  p99 {pct(0.99):.1f}  max {lat[-1] * 1000:.1f}')
+    for (result, code), n in sorted(outcomes.items(), key=str):
+        print(f'  {result:<4} {code}: {n}')
+    for label, n in fallbacks.most_common():
+        print(f'  fallback "{label}": {n}')
+    print('device-side requests:', dict(fleet.summary()))
+
+
+if __name__ == '__main__':
+    main()
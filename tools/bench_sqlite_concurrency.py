@@ -0,0 +1,157 @@
+"""Concurrency benchmark: default SQLite journal vs the tuned WAL profile.
+
+Simulates what a busy server does: several threads insert RFID scans and trim the
+scan table (like ScanIdView), while others upsert device heartbeats (like
+DeviceInstanceView.post: SELECT then UPDATE/INSERT in one transaction) and readers
+list recent scans. Each profile runs against a fresh temporary database file.
+
+    python tools/bench_sqlite_concurrency.py [--threads 16] [--seconds 5]
+
+Profiles:
+  default - rollback journal, deferred transactions, Python's 5s busy timeout
+  tuned   - mirrors rfid_borrowing.settings: WAL, synchronous=NORMAL, mmap,
+            20s busy timeout and BEGIN IMMEDIATE for write transactions
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+PROFILES = {
+    "default": {
+        "timeout": 5.0,
+        "begin": "BEGIN",
+        "pragmas": {},
+    },
+    "tuned": {
+        "timeout": 20.0,
+        "begin": "BEGIN IMMEDIATE",
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "mmap_size": str(128 * 1024 * 1024),
+            "cache_size": "-20000",
+            "temp_store": "MEMORY",
+        },
+    },
+}
+
+SCHEMA = """
+CREATE TABLE scan (id INTEGER PRIMARY KEY AUTOINCREMENT, uid TEXT, name TEXT, created_at REAL);
+CREATE INDEX scan_created ON scan(created_at);
+CREATE TABLE device (id INTEGER PRIMARY KEY AUTOINCREMENT, ip TEXT, rssi INTEGER, last_seen REAL);
+CREATE INDEX device_ip ON device(ip);
+"""
+
+
+def connect(path: str, profile: dict) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=profile["timeout"], isolation_level=None, check_same_thread=False)
+    for name, value in profile["pragmas"].items():
+        conn.execute(f"PRAGMA {name}={value}")
+    return conn
+
+
+def scan_writer(conn, profile, stats):
+    conn.execute(profile["begin"])
+    conn.execute("INSERT INTO scan (uid, name, created_at) VALUES (?, ?, ?)",
+                 (f"{random.getrandbits(32):08X}", "bench", time.time()))
+    conn.execute("DELETE FROM scan WHERE id IN (SELECT id FROM scan ORDER BY created_at DESC LIMIT -1 OFFSET 200)")
+    conn.execute("COMMIT")
+
+
+def heartbeat_writer(conn, profile, stats):
+    ip = f"10.0.0.{random.randint(1, 50)}"
+    conn.execute(profile["begin"])
+    row = conn.execute("SELECT id FROM device WHERE ip = ?", (ip,)).fetchone()
+    if row:
+        conn.execute("UPDATE device SET rssi = ?, last_seen = ? WHERE id = ?", (-random.randint(30, 90), time.time(), row[0]))
+    else:
+        conn.execute("INSERT INTO device (ip, rssi, last_seen) VALUES (?, ?, ?)", (ip, -60, time.time()))
+    conn.execute("COMMIT")
+
+
+def reader(conn, profile, stats):
+    conn.execute("SELECT id, uid, name FROM scan ORDER BY created_at DESC LIMIT 20").fetchall()
+
+
+def worker(path, profile, op, deadline, stats, lock):
+    conn = connect(path, profile)
+    ok = errors = 0
+    latencies = []
+    while time.monotonic() < deadline:
+        t0 = time.perf_counter()
+        try:
+            op(conn, profile, stats)
+            ok += 1
+            latencies.append(time.perf_counter() - t0)
+        except sqlite3.OperationalError as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            if "locked" not in str(e) and "busy" not in str(e):
+                raise
+            errors += 1
+    conn.close()
+    with lock:
+        stats["ok"] += ok
+        stats["locked"] += errors
+        stats["latencies"].extend(latencies)
+
+
+def run(name: str, threads: int, seconds: float) -> dict:
+    profile = PROFILES[name]
+    fd, path = tempfile.mkstemp(suffix=".sqlite3")
+    os.close(fd)
+    try:
+        setup = connect(path, profile)
+        setup.executescript(SCHEMA)
+        setup.close()
+
+        stats = {"ok": 0, "locked": 0, "latencies": []}
+        lock = threading.Lock()
+        ops = [scan_writer, heartbeat_writer, reader]
+        deadline = time.monotonic() + seconds
+        pool = [
+            threading.Thread(target=worker, args=(path, profile, ops[i % len(ops)], deadline, stats, lock))
+            for i in range(threads)
+        ]
+        for t in pool:
+            t.start()
+        for t in pool:
+            t.join()
+    finally:
+        for suffix in ("", "-wal", "-shm", "-journal"):
+            try:
+                os.remove(path + suffix)
+            except OSError:
+                pass
+
+    lat = sorted(stats["latencies"]) or [0.0]
+    return {
+        "profile": name,
+        "ops_per_s": stats["ok"] / seconds,
+        "locked_errors": stats["locked"],
+        "p50_ms": lat[len(lat) // 2] * 1000,
+        "p99_ms": lat[min(len(lat) - 1, int(len(lat) * 0.99))] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--profile", choices=sorted(PROFILES), action="append")
+    args = parser.parse_args()
+
+    print(f"{'profile':<8} {'ops/s':>10} {'locked':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for name in args.profile or ["default", "tuned"]:
+        r = run(name, args.threads, args.seconds)
+        print(f"{r['profile']:<8} {r['ops_per_s']:>10.0f} {r['locked_errors']:>8} {r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""Asyncio emulator for many ESP32 readers' local HTTP endpoints.
+
+Replaces the single-threaded tools/test_apply_server.py when benchmarking
+push_config_to_target / push_command_to_target. One event loop serves every
+virtual device, each on its own loopback address (127.0.2.1, 127.0.2.2, ... on
+port 80, as the server dials) or on consecutive ports of one address.
+
+Endpoints follow ESP32_RFID_Borrowing.ino:
+  GET  /  and  /health              200 {"status":"ok"}
+  POST /apply-config                200 {"status":"ok","token_set":false}; 400 on bad JSON
+  POST /control                     disconnect/startap/stopap -> 200; anything else -> 400 Unknown action
+  POST|GET /reboot, /startap        only with the "fallback" firmware profile (the stock sketch has no such routes)
+
+Firmware profiles (--firmware):
+  tapborrow  stock sketch behaviour (default)
+  fallback   also serves /reboot and /startap, and accepts reboot on /control
+  example    ESP32_examples sketch: only /apply-config, everything else 404
+
+Per-device behaviour is configurable with flags applied to the whole fleet, or a
+JSON file (--profile-file) with a list of overrides, e.g.
+  [{"latency_ms": 800}, {"reset_rate": 0.5}, {"http_error_rate": 1.0, "firmware": "example"}]
+where entry i applies to device i. Keys: latency_ms, jitter_ms, reset_rate,
+http_error_rate, hang_rate, firmware.
+
+    python tools/device_emulator.py --devices 200 --latency-ms 50 --reset-rate 0.05
+    python tools/device_emulator.py --devices 20 --host 127.0.0.1 --base-port 9000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import socket
+import struct
+from collections import Counter
+
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}
+CONTROL_ACTIONS = ('disconnect', 'startap', 'stopap')
+
+
+class DeviceProfile:
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, reset_rate: float = 0.0,
+                 http_error_rate: float = 0.0, hang_rate: float = 0.0, firmware: str = 'tapborrow'):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.reset_rate = reset_rate
+        self.http_error_rate = http_error_rate
+        self.hang_rate = hang_rate
+        self.firmware = firmware
+
+    def updated(self, overrides: dict) -> 'DeviceProfile':
+        values = dict(vars(self))
+        values.update(overrides)
+        return DeviceProfile(**values)
+
+
+class EmulatedDevice:
+    """State and request handling for one virtual reader."""
+
+    def __init__(self, host: str, port: int, profile: DeviceProfile):
+        self.host = host
+        self.port = port
+        self.profile = profile
+        self.config: dict = {}
+        self.counts: Counter = Counter()
+        self.server: asyncio.AbstractServer | None = None
+
+    @property
+    def target(self) -> str:
+        """Address as stored in DeviceInstance.ip / passed to the push helpers."""
+        return self.host if self.port == 80 else f"{self.host}:{self.port}"
+
+    def route(self, method: str, path: str, body: bytes) -> tuple[int, dict]:
+        fw = self.profile.firmware
+        path = path.split('?', 1)[0]
+        if method == 'GET' and path in ('/', '/health') and fw != 'example':
+            return 200, {'status': 'ok'}
+        if path == '/apply-config':
+            if method != 'POST':
+                return 405, {'detail': 'Method not allowed'}
+            try:
+                cfg = json.loads(body or b'')
+            except ValueError:
+                return 400, {'error': 'Invalid JSON'}
+            if not isinstance(cfg, dict):
+                return 400, {'error': 'Invalid JSON'}
+            self.config.update(cfg)
+            return 200, {'status': 'ok', 'token_set': False}
+        if fw == 'example':
+            return 404, {'detail': 'Not found'}
+        if path == '/control' and method == 'POST':
+            text = body.decode('utf-8', errors='ignore').strip()
+            try:
+                doc = json.loads(text)
+                action = doc.get('action', '') if isinstance(doc, dict) else ''
+            except ValueError:
+                # Firmware falls back to treating the raw body as the action
+                action = text.strip('"')
+            allowed = CONTROL_ACTIONS + (('reboot',) if fw == 'fallback' else ())
+            if action in allowed:
+                return 200, {'status': 'ok', 'action': action}
+            return 400, {'detail': 'Unknown action'}
+        if fw == 'fallback' and path in ('/reboot', '/startap') and method in ('GET', 'POST'):
+            return 200, {'status': 'ok', 'action': path.lstrip('/')}
+        return 404, {'detail': 'Not found'}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        profile = self.profile
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+            lines = head.decode('latin-1').split('\r\n')
+            method, path, _ = lines[0].split(' ', 2)
+            headers = {}
+            for line in lines[1:]:
+                if ':' in line:
+                    k, v = line.split(':', 1)
+                    headers[k.strip().lower()] = v.strip()
+            length = int(headers.get('content-length', 0) or 0)
+            body = await reader.readexactly(length) if length else b''
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError, ConnectionError):
+            writer.close()
+            return
+
+        self.counts[f'{method} {path}'] += 1
+        delay = profile.latency_ms + random.uniform(0, profile.jitter_ms)
+        if delay:
+            await asyncio.sleep(delay / 1000.0)
+
+        roll = random.random()
+        if roll < profile.hang_rate:
+            # Accept but never answer, so the client hits its timeout
+            self.counts['hang'] += 1
+            await asyncio.sleep(3600)
+            return
+        roll -= profile.hang_rate
+        if roll < profile.reset_rate:
+            # SO_LINGER 0 + close sends RST: the client sees ConnectionResetError
+            self.counts['reset'] += 1
+            sock = writer.get_extra_info('socket')
+            if sock is not None:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+            writer.transport.abort()
+            return
+        roll -= profile.reset_rate
+        if roll < profile.http_error_rate:
+            code, payload = 500, {'detail': 'Injected error'}
+        else:
+            code, payload = self.route(method, path, body)
+
+        data = json.dumps(payload).encode('utf-8')
+        writer.write(
+            f'HTTP/1.1 {code} {STATUS_TEXT.get(code, "")}\r\n'
+            f'Content-Type: application/json\r\nContent-Length: {len(data)}\r\n'
+            f'Access-Control-Allow-Origin: *\r\nConnection: close\r\n\r\n'.encode('latin-1') + data
+        )
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        writer.close()
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, self.host, self.port, reuse_address=True)
+
+
+class Fleet:
+    """A set of emulated devices served by one event loop."""
+
+    def __init__(self, devices: list[EmulatedDevice]):
+        self.devices = devices
+
+    @classmethod
+    def build(cls, count: int, base: DeviceProfile, overrides: list[dict] | None = None,
+              host: str | None = None, base_ip: str = '127.0.2.', base_port: int = 80) -> 'Fleet':
+        overrides = overrides or []
+        devices = []
+        for i in range(count):
+            profile = base.updated(overrides[i]) if i < len(overrides) else base
+            if host:
+                devices.append(EmulatedDevice(host, base_port + i, profile))
+            else:
+                devices.append(EmulatedDevice(f'{base_ip}{i + 1}', base_port, profile))
+        return cls(devices)
+
+    async def start(self):
+        await asyncio.gather(*(d.start() for d in self.devices))
+
+    async def stop(self):
+        for d in self.devices:
+            if d.server:
+                d.server.close()
+                await d.server.wait_closed()
+
+    def summary(self) -> Counter:
+        total: Counter = Counter()
+        for d in self.devices:
+            total.update(d.counts)
+        return total
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--devices', type=int, default=10)
+    parser.add_argument('--host', help='bind every device to this address on consecutive ports')
+    parser.add_argument('--base-ip', default='127.0.2.', help='prefix for per-device loopback addresses')
+    parser.add_argument('--base-port', type=int, default=80)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--reset-rate', type=float, default=0.0, help='share of requests answered with a TCP reset')
+    parser.add_argument('--http-error-rate', type=float, default=0.0, help='share of requests answered with HTTP 500')
+    parser.add_argument('--hang-rate', type=float, default=0.0, help='share of requests never answered')
+    parser.add_argument('--firmware', choices=('tapborrow', 'fallback', 'example'), default='tapborrow')
+    parser.add_argument('--profile-file', help='JSON list of per-device overrides')
+    return parser.parse_args(argv)
+
+
+def fleet_from_args(args) -> Fleet:
+    base = DeviceProfile(args.latency_ms, args.jitter_ms, args.reset_rate, args.http_error_rate,
+                         args.hang_rate, args.firmware)
+    overrides = None
+    if args.profile_file:
+        with open(args.profile_file, encoding='utf-8') as fh:
+            overrides = json.load(fh)
+    return Fleet.build(args.devices, base, overrides, host=args.host, base_ip=args.base_ip, base_port=args.base_port)
+
+
+async def _serve(fleet: Fleet):
+    await fleet.start()
+    first, last = fleet.devices[0].target, fleet.devices[-1].target
+    print(f'Emulating {len(fleet.devices)} devices ({first} .. {last}); Ctrl+C to stop')
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await fleet.stop()
+
+
+def main():
+    fleet = fleet_from_args(parse_args())
+    try:
+        asyncio.run(_serve(fleet))
+    except KeyboardInterrupt:
+        pass
+    for key, n in sorted(fleet.summary().items()):
+        print(f'{key:<32} {n}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,302 @@
+"""Simulate a fleet of ESP32 RFID readers against a running server.
+
+Each virtual reader follows the firmware's request pattern
+(ESP32_RFID_Borrowing.ino):
+
+  boot       GET  /api/device-config            (fetchDeviceConfigFromServer)
+  heartbeat  POST /api/device-instances         every --heartbeat seconds
+  card tap   GET  /api/borrowers?q=<uid>        (checkBorrower)
+             POST /api/rfid-scans               (logRegistrationScan)
+             POST /api/scan-id                  (logBorrowTap, registered cards only)
+             POST /api/borrow                   (postBorrow, FORCED_ITEM_QR set)
+  return     POST /api/return                   (a share of taps return a borrowed item)
+
+Every reader also runs a tiny HTTP server answering /apply-config, /control and
+/health, so server-side pushes can be exercised while the load runs. Readers bind
+consecutive loopback addresses (127.0.1.1, 127.0.1.2, ...) on --device-port and
+announce that address in their heartbeats; port 80 needs root on Linux and matches
+what push_config_to_target dials.
+
+Each request opens a fresh connection, like the firmware's HTTPClient. At the end a
+table of per-endpoint latency percentiles and error counts is printed.
+
+    python tools/fleet_sim.py --server http://127.0.0.1:8000 --devices 20 --duration 60
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import string
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class Stats:
+    """Thread-safe per-endpoint latency and error collector."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.codes = defaultdict(lambda: defaultdict(int))
+
+    def record(self, endpoint: str, seconds: float, code: int | None, error: bool):
+        with self._lock:
+            self.latencies[endpoint].append(seconds)
+            self.codes[endpoint][code] += 1
+            if error:
+                self.errors[endpoint] += 1
+
+    def report(self, duration: float) -> str:
+        def pct(values, p):
+            return values[min(len(values) - 1, int(len(values) * p))] * 1000
+
+        lines = [f"{'endpoint':<28} {'count':>7} {'rps':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}  codes"]
+        for endpoint in sorted(self.latencies):
+            values = sorted(self.latencies[endpoint])
+            codes = ' '.join(f"{c}:{n}" for c, n in sorted(self.codes[endpoint].items(), key=lambda kv: str(kv[0])))
+            lines.append(
+                f"{endpoint:<28} {len(values):>7} {len(values) / duration:>7.1f} {pct(values, 0.50):>8.1f} "
+                f"{pct(values, 0.95):>8.1f} {pct(values, 0.99):>8.1f} {self.errors[endpoint]:>7}  {codes}"
+            )
+        return '\n'.join(lines)
+
+
+def request(stats: Stats, server: str, method: str, path: str, body: dict | None = None,
+            endpoint: str | None = None, token: str = '', ok_codes=(200, 201, 204),
+            timeout: float = 10.0):
+    """Issue one request and record it; returns (code, parsed_json_or_None)."""
+    endpoint = endpoint or f"{method} {path.split('?')[0]}"
+    data = json.dumps(body).encode('utf-8') if body is not None else None
+    req = urllib.request.Request(server + path, data=data, method=method)
+    if data is not None:
+        req.add_header('Content-Type', 'application/json')
+    if token:
+        req.add_header('X-Device-Token', token)
+    t0 = time.perf_counter()
+    code, payload = None, None
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as r:
+            code = r.getcode()
+            raw = r.read()
+    except urllib.error.HTTPError as e:
+        code = e.code
+        raw = e.read()
+    except Exception:
+        stats.record(endpoint, time.perf_counter() - t0, None, True)
+        return None, None
+    stats.record(endpoint, time.perf_counter() - t0, code, code not in ok_codes)
+    try:
+        payload = json.loads(raw) if raw else None
+    except ValueError:
+        payload = None
+    return code, payload
+
+
+class DeviceHandler(BaseHTTPRequestHandler):
+    """Answers the firmware's local endpoints; counts what the server pushed."""
+
+    def _reply(self, code: int, body: dict):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path in ('/', '/health'):
+            self._reply(200, {'status': 'ok'})
+        else:
+            self._reply(404, {'detail': 'Not found'})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0) or 0)
+        body = self.rfile.read(length) if length else b''
+        device = self.server.device
+        if self.path == '/apply-config':
+            try:
+                cfg = json.loads(body or b'{}')
+            except ValueError:
+                return self._reply(400, {'error': 'Invalid JSON'})
+            device.applied.append(cfg)
+            if 'config_version' in cfg:
+                device.config_version = cfg['config_version']
+            return self._reply(200, {'status': 'ok', 'token_set': False})
+        if self.path == '/control':
+            try:
+                action = json.loads(body or b'{}').get('action', '')
+            except ValueError:
+                action = body.decode('utf-8', errors='ignore').strip()
+            device.controls.append(action)
+            if action in ('disconnect', 'startap', 'stopap'):
+                return self._reply(200, {'status': 'ok', 'action': action})
+            # Same as the firmware: reboot is not a /control action
+            return self._reply(400, {'detail': 'Unknown action'})
+        self._reply(404, {'detail': 'Not found'})
+
+    def log_message(self, format, *args):
+        pass
+
+
+class VirtualDevice(threading.Thread):
+    def __init__(self, index: int, args, stats: Stats, cards: list[str], unknown_cards: list[str],
+                 items: list[str], stop: threading.Event):
+        super().__init__(daemon=True, name=f"esp32-{index}")
+        self.args = args
+        self.stats = stats
+        self.cards = cards
+        self.unknown_cards = unknown_cards
+        self.items = items
+        self.stop_event = stop
+        self.ip = f"{args.base_ip}{index + 1}"
+        self.pairing_code = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
+        self.applied: list[dict] = []
+        self.controls: list[str] = []
+        self.config_version = None
+        self.borrowed: list[str] = []
+        self.httpd = None
+
+    def start_server(self):
+        try:
+            self.httpd = ThreadingHTTPServer((self.ip, self.args.device_port), DeviceHandler)
+        except OSError as e:
+            print(f"{self.name}: cannot bind {self.ip}:{self.args.device_port} ({e}); pushes will fail")
+            return
+        self.httpd.device = self
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def heartbeat(self):
+        body = {
+            'ip': self.ip,
+            'ssid': 'SIM-NET',
+            'api_host': self.args.server,
+            'firmware': 'sim-1.0.0',
+            'pairing_code': self.pairing_code,
+            'server_reachable': True,
+            'rssi': -random.randint(40, 80),
+            'wifi_event': 'STA_GOT_IP',
+        }
+        if self.config_version is not None:
+            body['config_version'] = self.config_version
+        request(self.stats, self.args.server, 'POST', '/api/device-instances', body, token=self.args.token)
+
+    def tap(self):
+        server, token = self.args.server, self.args.token
+        if self.unknown_cards and random.random() < self.args.unknown_ratio:
+            uid = random.choice(self.unknown_cards)
+        else:
+            uid = random.choice(self.cards)
+        name = f"RFID {uid}"
+        code, _ = request(self.stats, server, 'GET', f'/api/borrowers?q={uid}', token=token)
+        if code is None or code >= 300:
+            return
+        request(self.stats, server, 'POST', '/api/rfid-scans', {'uid': uid, 'name': name, 'email': ''}, token=token)
+        code, _ = request(self.stats, server, 'POST', '/api/scan-id',
+                          {'borrower_rfid': uid, 'name': name, 'email': ''}, token=token, ok_codes=(200, 404))
+        if code != 200 or not self.items:
+            return
+        if self.borrowed and random.random() < self.args.return_ratio:
+            qr = self.borrowed.pop(random.randrange(len(self.borrowed)))
+            request(self.stats, server, 'POST', '/api/return', {'item_qr': qr}, token=token, ok_codes=(200, 404))
+        elif random.random() < self.args.borrow_ratio:
+            qr = random.choice(self.items)
+            code, _ = request(self.stats, server, 'POST', '/api/borrow', {'borrower_rfid': uid, 'item_qr': qr},
+                              token=token, ok_codes=(201, 409))
+            if code == 201:
+                self.borrowed.append(qr)
+
+    def run(self):
+        args = self.args
+        # Stagger boots like a room of readers powering up
+        if self.stop_event.wait(random.uniform(0, min(args.heartbeat, 2.0))):
+            return
+        request(self.stats, args.server, 'GET', '/api/device-config', token=args.token)
+        self.heartbeat()
+        next_heartbeat = time.monotonic() + args.heartbeat
+        while not self.stop_event.is_set():
+            wait = random.expovariate(1.0 / args.tap_interval)
+            if self.stop_event.wait(min(wait, max(0.0, next_heartbeat - time.monotonic()))):
+                break
+            if time.monotonic() >= next_heartbeat:
+                self.heartbeat()
+                next_heartbeat = time.monotonic() + args.heartbeat
+            else:
+                self.tap()
+        if self.httpd:
+            self.httpd.shutdown()
+
+
+def seed(args, stats: Stats) -> tuple[list[str], list[str]]:
+    """Register borrowers and items through the public API; returns (uids, item_qrs)."""
+    cards = [f"{0x51A00000 + i:08X}" for i in range(args.cards)]
+    items: list[str] = []
+    for uid in cards:
+        request(stats, args.server, 'POST', '/api/register-borrower',
+                {'name': f'Sim Borrower {uid}', 'rfid_uid': uid}, endpoint='seed borrower', ok_codes=(201, 409))
+    for i in range(args.items):
+        code, payload = request(stats, args.server, 'POST', '/api/register-item',
+                                {'name': f'Sim Item {i}'}, endpoint='seed item', ok_codes=(201,))
+        if code == 201 and payload:
+            items.append(payload['qr_code'])
+    return cards, items
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--server', default='http://127.0.0.1:8000', help='API base URL')
+    parser.add_argument('--devices', type=int, default=10, help='number of virtual readers')
+    parser.add_argument('--duration', type=float, default=30.0, help='seconds to run')
+    parser.add_argument('--tap-interval', type=float, default=5.0, help='mean seconds between card taps per reader')
+    parser.add_argument('--heartbeat', type=float, default=60.0, help='seconds between heartbeats (firmware: 60)')
+    parser.add_argument('--cards', type=int, default=50, help='registered cards to seed')
+    parser.add_argument('--items', type=int, default=100, help='items to seed')
+    parser.add_argument('--unknown-ratio', type=float, default=0.1, help='share of taps by unregistered cards')
+    parser.add_argument('--borrow-ratio', type=float, default=0.5, help='share of registered taps that borrow')
+    parser.add_argument('--return-ratio', type=float, default=0.4, help='share of taps that return a borrowed item')
+    parser.add_argument('--token', default='', help='X-Device-Token sent by every reader')
+    parser.add_argument('--base-ip', default='127.0.1.', help='prefix of reader addresses')
+    parser.add_argument('--device-port', type=int, default=80, help='port for /apply-config and /control')
+    parser.add_argument('--no-seed', action='store_true', help='skip registering borrowers and items')
+    args = parser.parse_args()
+    args.server = args.server.rstrip('/')
+
+    seed_stats = Stats()
+    if args.no_seed:
+        cards = [f"{0x51A00000 + i:08X}" for i in range(args.cards)]
+        items: list[str] = []
+    else:
+        cards, items = seed(args, seed_stats)
+    unknown = [f"{0xDEAD0000 + i:08X}" for i in range(max(1, args.cards // 5))]
+
+    stats = Stats()
+    stop = threading.Event()
+    fleet = [VirtualDevice(i, args, stats, cards, unknown, items, stop) for i in range(args.devices)]
+    for d in fleet:
+        d.start_server()
+    started = time.monotonic()
+    for d in fleet:
+        d.start()
+    try:
+        stop.wait(args.duration)
+    except KeyboardInterrupt:
+        pass
+    stop.set()
+    for d in fleet:
+        d.join(timeout=15)
+    elapsed = time.monotonic() - started
+
+    print(f"\n{args.devices} virtual readers for {elapsed:.1f}s against {args.server}\n")
+    print(stats.report(elapsed))
+    pushes = sum(len(d.applied) for d in fleet)
+    controls = sum(len(d.controls) for d in fleet)
+    print(f"\nreceived from server: {pushes} /apply-config, {controls} /control")
+
+
+if __name__ == '__main__':
+    main()